@@ -1,28 +1,57 @@
-"""Step-by-step example: Building a simple Tkinter form in Python.
+"""Registration form built with Tkinter, explained step by step.
 
-This script demonstrates how to construct a graphical form using Tkinter
-one step at a time. Each section is clearly separated so it can be followed
-sequentially while learning how forms are assembled in Python.
+Sections 1 to 8 of this script build a graphical form one step at a time:
+each section is clearly separated so it can be followed sequentially while
+learning how forms are assembled in Python. The later sections extend the
+same form for real use: background submission, live validation, kiosk mode
+with several windows and keyboard-only data entry.
 
 The form collects a first name, last name, e-mail address, age and an optional
 comment. Whenever the user presses the submit button the inputs are validated
 and the data is summarised in a pop-up window.
 
+Everything that does not need a window (the data model, the validation rules,
+batch imports and the stores) lives in ``registrierung.py``, so servers and
+worker processes can use it without loading Tk.
+
 -------------------------
 How to read this example
 -------------------------
 Every function in this file contains detailed comments that explain what the
 code is doing *and why it is done that way*. The idea is to treat the file like
-an interactive tutorial:
+an interactive tutorial. The sections are numbered across both files; the ones
+marked with (R) are in ``registrierung.py``:
 
 1. Import the required modules.
-2. Define a :class:`dataclass` to hold the submitted form data.
+2. Define a :class:`dataclass` to hold the submitted form data and describe
+   the form fields in a schema. (R)
 3. Create the main application window.
 4. Add form fields (labels + entry widgets).
 5. Add a multi-line text widget for free-form comments.
-6. Wire up validation and submission logic.
+6. Wire up validation and submission logic (the rules themselves: R).
 7. Provide feedback to the user after submission.
 8. Run the Tkinter event loop.
+9. Validate large numbers of records without a GUI (batch mode). (R)
+10. Validate whole columns at once with NumPy (optional). (R)
+11. Store many records compactly in memory. (R)
+12. Stream registrations from CSV and JSONL files. (R)
+13. Persist submitted registrations in batches (SQLite). (R)
+14. Process submissions in background threads.
+15. Submit through asyncio-based clients.
+16. Validate fields while the user types (debounced).
+17. Detect duplicate submissions (the index: R).
+18. Measure how long the window takes to appear.
+19. Show very large forms without creating every widget.
+20. Reuse built forms instead of destroying them.
+21. Keep submissions safe while the backend is unreachable. (R)
+22. Exchange registrations in a compact binary format. (R)
+23. Archive registrations for fast random access. (R)
+24. Validate huge imports on all CPU cores. (R)
+25. Send registrations to a web server efficiently. (R)
+26. Run several forms in one process (kiosk mode).
+27. Count submissions and measure latencies. (R)
+28. Show feedback without blocking the form.
+29. Enter records with the keyboard only.
 
 ------------------------
 How to show the form window
@@ -42,32 +71,46 @@ How to show the form window
 from __future__ import annotations
 
 # 1. Import the required modules -------------------------------------------------
-# ``dataclass`` automatically generates an ``__init__`` method and other handy
-# dunder methods so we can focus on the data we want to store.
-from dataclasses import dataclass
-
 # Tkinter bundles its widgets in the main ``tkinter`` module and in the themed
-# widget set ``tkinter.ttk``. Importing from both allows us to combine classic
-# and modern controls. Only the names that we actively use are imported which
-# keeps the namespace tidy and readable.
-from tkinter import END, LEFT, RIGHT, StringVar, Text, Tk, ttk, messagebox
-
-
-# 2. Define a dataclass to hold the submitted form data --------------------------
-@dataclass
-class RegistrationData:
-    """Simple container for the form data.
-
-    Each attribute mirrors a single form input. Because the fields are type
-    annotated, editors can offer auto-completion and static analysis tools can
-    detect type mismatches early.
-    """
-
-    first_name: str
-    last_name: str
-    email: str
-    age: int
-    comments: str
+# widget set ``tkinter.ttk``. We import them *inside* the functions that build
+# or read the GUI rather than up here, and so are other modules that only a few
+# functions need (``asyncio`` and ``concurrent.futures``). Importing this file
+# then stays cheap until a window is actually opened. Python caches imported
+# modules, so repeating the import inside a function costs only a dictionary
+# lookup after the first call.
+import json
+import platform
+import sys
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from functools import partial
+from os import PathLike, environ
+from os.path import exists as path_exists
+from queue import Empty, SimpleQueue
+from threading import Thread
+from time import perf_counter, process_time, time
+from typing import TYPE_CHECKING, Any
+
+# The data model, the validation rules, the stores and the metrics come from
+# the Tk-free half of the program.
+from registrierung import (
+    METRICS,
+    REGISTRATION_SCHEMA,
+    SINK_LATENCY,
+    SUBMIT_ATTEMPTS,
+    SUBMIT_LATENCY,
+    DuplicateIndex,
+    FormSchema,
+    RegistrationData,
+    RegistrationStore,
+    record_validation_failure,
+)
+
+# Static type checkers still need the names for annotations; the block below
+# is only evaluated by them, never when the program runs.
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+    from tkinter import Misc, StringVar, Tk, ttk
 
 
 # 3. Create the main application window -----------------------------------------
@@ -79,6 +122,8 @@ def create_main_window() -> Tk:
     the *foundation* of the application.
     """
 
+    from tkinter import Tk
+
     # ``Tk()`` starts the Tkinter subsystem and gives us the root window. All
     # other widgets (frames, labels, buttons, ...) will be children of this
     # window. Only a single ``Tk`` instance should exist per application.
@@ -100,7 +145,9 @@ def create_main_window() -> Tk:
 
 
 # 4. Add form fields -------------------------------------------------------------
-def build_form_fields(parent: Tk) -> dict[str, StringVar]:
+def build_form_fields(
+    parent: Tk, schema: FormSchema = REGISTRATION_SCHEMA
+) -> dict[str, StringVar]:
     """Create labelled ``Entry`` widgets and return the associated variables.
 
     Parameters
@@ -108,6 +155,9 @@ def build_form_fields(parent: Tk) -> dict[str, StringVar]:
     parent:
         The widget that should contain the form fields. We expect a Tk window,
         but any ``Frame`` would work as well.
+    schema:
+        Describes which fields to create (see section 2). Multi-line fields
+        are skipped here; ``build_comments_field`` takes care of them.
 
     Returns
     -------
@@ -116,15 +166,15 @@ def build_form_fields(parent: Tk) -> dict[str, StringVar]:
         stores the user's input for that row.
     """
 
+    from tkinter import StringVar, ttk
+
     # Mapping of field labels to Tkinter ``StringVar`` instances for data
     # binding. ``StringVar`` acts like a container that keeps track of the
     # entry text. By reading from and writing to the variable we can control the
-    # widgets without touching them directly.
+    # widgets without touching them directly. The dictionary keeps the order of
+    # the schema, which ``parse_form_data`` relies on.
     fields: dict[str, StringVar] = {
-        "Vorname": StringVar(),
-        "Nachname": StringVar(),
-        "E-Mail": StringVar(),
-        "Alter": StringVar(),
+        field.label: StringVar() for field in schema.entry_fields
     }
 
     # ``ttk.Frame`` provides a rectangular container which we use to group the
@@ -161,33 +211,93 @@ def build_form_fields(parent: Tk) -> dict[str, StringVar]:
 
 
 # 5. Add a multi-line text widget ------------------------------------------------
-def build_comments_field(parent: Tk) -> ttk.Frame:
-    """Create a labelled text area for free-form comments."""
+def build_comments_field(
+    parent: Tk, schema: FormSchema = REGISTRATION_SCHEMA
+) -> ttk.Frame:
+    """Create a labelled text area for every multi-line field in ``schema``.
+
+    The text areas are stacked in one frame, which is returned. Its
+    ``text_widgets`` attribute maps each field's label to its ``Text`` widget.
+    """
 
-    # ``LabelFrame`` visually groups widgets and automatically renders a title
-    # (in our case "Kommentare"). This signals that the enclosed widgets belong
-    # together.
-    comments_frame = ttk.LabelFrame(parent, text="Kommentare", padding=12)
+    from tkinter import Text, ttk
+
+    # One plain frame holds all multi-line fields, so the rest of the program
+    # can pass them around as a single object (the "comments frame").
+    comments_frame = ttk.Frame(parent)
     comments_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-    # ``Text`` (from the classic Tk widget set) creates a multi-line text box.
-    # ``wrap='word'`` avoids breaking words when the text reaches the end of the
-    # line, improving readability. ``Text`` lives in ``tkinter`` rather than in
-    # ``tkinter.ttk`` which is why we imported it separately above.
-    comments_widget = Text(comments_frame, width=40, height=6, wrap="word")
-    comments_widget.pack(fill="both", expand=True)
+    text_widgets: dict[str, Text] = {}
+    for field in schema.fields:
+        if field.kind != "multiline":
+            continue
+        # ``LabelFrame`` visually groups widgets and automatically renders a
+        # title (for the registration form "Kommentare"). This signals that the
+        # enclosed widgets belong together.
+        field_frame = ttk.LabelFrame(comments_frame, text=field.label, padding=12)
+        field_frame.pack(fill="both", expand=True, pady=(12 if text_widgets else 0, 0))
+
+        # ``Text`` (from the classic Tk widget set) creates a multi-line text
+        # box. ``wrap='word'`` avoids breaking words when the text reaches the
+        # end of the line, improving readability. ``Text`` lives in ``tkinter``
+        # rather than in ``tkinter.ttk`` which is why we imported it separately.
+        text_widget = Text(field_frame, width=40, height=6, wrap="word")
+        text_widget.pack(fill="both", expand=True)
+        text_widgets[field.label] = text_widget
 
     # ``Text`` widgets do not accept ``textvariable`` like ``Entry`` does. To
-    # make the widget easy to access later on we attach it to the frame. Tkinter
-    # widgets are regular Python objects, so we can store additional attributes
-    # on them. ``type: ignore`` tells static type checkers that we add this
-    # attribute dynamically.
-    comments_frame.text_widget = comments_widget  # type: ignore[attr-defined]
+    # make the widgets easy to access later on we attach them to the frame.
+    # Tkinter widgets are regular Python objects, so we can store additional
+    # attributes on them. ``type: ignore`` tells static type checkers that we
+    # add this attribute dynamically.
+    comments_frame.text_widgets = text_widgets  # type: ignore[attr-defined]
 
     return comments_frame
 
 
-# 6. Wire up validation and submission logic ------------------------------------
+# 6. Wire up validation and submission logic -----------------------------------
+# The rules live in ``registrierung`` (section 6 there). The functions below
+# read the widgets, hand their text to the validator and report the result.
+
+
+def read_form_values(
+    variables: dict[str, StringVar],
+    comments_frame: ttk.Frame | None,
+    schema: FormSchema = REGISTRATION_SCHEMA,
+) -> list[str]:
+    """Return the stripped text of every field in ``schema`` order.
+
+    ``variables`` must come from :func:`build_form_fields` for the same
+    schema, so its values are already in the right order and no label has to
+    be looked up. Multi-line fields are read from the text widgets that
+    :func:`build_comments_field` attached to ``comments_frame``.
+    """
+
+    from tkinter import END
+
+    # ``.get()`` reads the current value from the ``StringVar``. ``strip()``
+    # removes leading/trailing whitespace, which avoids mistakes caused by
+    # accidental spaces.
+    entries = iter([variable.get().strip() for variable in variables.values()])
+
+    # ``get("1.0", END)`` reads all characters from the first row/column (1.0)
+    # of a text widget we stored on the frame earlier up to the special
+    # ``END`` marker. ``strip()`` removes trailing newlines.
+    text_widgets = {}
+    if comments_frame is not None:
+        text_widgets = comments_frame.text_widgets  # type: ignore[attr-defined]
+
+    values = []
+    for field in schema.fields:
+        if field.kind != "multiline":
+            values.append(next(entries))
+        elif field.label in text_widgets:
+            values.append(text_widgets[field.label].get("1.0", END).strip())
+        else:
+            values.append("")
+    return values
+
+
 def parse_form_data(
     variables: dict[str, StringVar],
     comments_frame: ttk.Frame,
@@ -200,128 +310,270 @@ def parse_form_data(
     the user (in this example we use a Tkinter message box).
     """
 
-    # ``.get()`` reads the current value from the ``StringVar``. ``strip()``
-    # removes leading/trailing whitespace, which avoids mistakes caused by
-    # accidental spaces.
-    first_name = variables["Vorname"].get().strip()
-    last_name = variables["Nachname"].get().strip()
-    email = variables["E-Mail"].get().strip()
-    age_text = variables["Alter"].get().strip()
+    values = read_form_values(variables, comments_frame)
 
-    # Retrieve the multi-line text widget that we stored on the frame earlier.
-    comments_widget = comments_frame.text_widget  # type: ignore[attr-defined]
+    # The compiled validator of the registration schema applies the same rules
+    # as ``validate_record`` and returns the converted values in field order,
+    # which matches the order of the ``RegistrationData`` attributes.
+    return RegistrationData(*REGISTRATION_SCHEMA.validator(values))
 
-    # ``get("1.0", END)`` reads all characters from the first row/column (1.0)
-    # up to the special ``END`` marker. ``strip()`` removes trailing newlines.
-    comments = comments_widget.get("1.0", END).strip()
 
-    # ---------------------------------------------------------------------
-    # Validation
-    # ---------------------------------------------------------------------
-    # Validation is performed step-by-step so the reader understands *what* is
-    # being checked and *why* it might fail.
+def parse_schema_form(
+    variables: dict[str, StringVar],
+    comments_frame: ttk.Frame | None,
+    schema: FormSchema,
+) -> dict[str, Any]:
+    """Validate a form built from any ``schema``; returns ``{name: value}``."""
 
-    # Required fields: all text entries except comments must contain something.
-    if not all([first_name, last_name, email, age_text]):
-        raise ValueError("Bitte füllen Sie alle Pflichtfelder aus.")
+    values = schema.validator(read_form_values(variables, comments_frame, schema))
+    return dict(zip(schema.validator.names, values))
 
-    # A very small email check to demonstrate custom validation logic.
-    if "@" not in email or "." not in email:
-        raise ValueError("Bitte geben Sie eine gültige E-Mail-Adresse ein.")
 
-    try:
-        # Convert the text to an integer. ``int`` will raise ``ValueError`` if
-        # the string does not contain a valid whole number (e.g. letters).
-        age = int(age_text)
-        if age <= 0:
-            # Manually trigger ``ValueError`` for non-positive ages.
-            raise ValueError
-    except ValueError as exc:
-        # ``from exc`` keeps the original stack trace which helps with debugging
-        # if the code is later expanded.
-        raise ValueError("Alter muss eine positive Zahl sein.") from exc
-
-    # Pack the validated values into a ``RegistrationData`` instance. Using a
-    # dataclass keeps related attributes bundled together and provides useful
-    # ``repr``/``eq`` implementations for free.
-    return RegistrationData(
-        first_name=first_name,
-        last_name=last_name,
-        email=email,
-        age=age,
-        comments=comments,
-    )
+def handle_submit(
+    variables: dict[str, StringVar],
+    comments_frame: ttk.Frame,
+    store: RegistrationStore | None = None,
+    duplicates: DuplicateIndex | None = None,
+    parent: Misc | None = None,
+    banner: StatusBanner | None = None,
+) -> None:
+    """Validate the form data and provide feedback to the user.
+
+    When a ``store`` is given, the validated record is handed to it before the
+    confirmation is shown (see section 13). ``duplicates`` lets the operator
+    confirm records that were probably submitted before (see section 17).
+    ``parent`` is the window the message boxes belong to; it only matters when
+    several forms are open at once (see section 26). With a ``banner`` the
+    feedback is shown inside the window instead of in a dialog (section 28).
+    """
 
+    from tkinter import messagebox
 
-def handle_submit(variables: dict[str, StringVar], comments_frame: ttk.Frame) -> None:
-    """Validate the form data and provide feedback to the user."""
+    # Count the attempt and start the clock for the latency histogram (see
+    # section 27). Both cost well under a microsecond.
+    started = perf_counter()
+    SUBMIT_ATTEMPTS.inc()
 
     try:
         # ``parse_form_data`` raises ``ValueError`` for invalid user input. We
         # catch it here and translate the message into a user-friendly dialog.
         data = parse_form_data(variables, comments_frame)
     except ValueError as error:
+        record_validation_failure(error)
+        SUBMIT_LATENCY.observe_since(started)
+        if banner is not None:
+            banner.show(str(error), "error")
+            return
         # ``showerror`` creates a modal dialog that blocks interaction with the
         # main window until the user closes the message box. This ensures that
         # the user sees the error and can correct the input immediately.
-        messagebox.showerror("Fehler", str(error))
+        messagebox.showerror("Fehler", str(error), parent=parent)
         return
 
-    # 7. Provide feedback to the user ------------------------------------------
-    # ``str.format`` fills in the placeholders with the attributes of our
-    # dataclass. Using ``{0.first_name}`` keeps the template easy to read.
-    message = (
-        "Vielen Dank, {0.first_name} {0.last_name}!\n\n"
-        "Wir haben Ihre Daten erhalten und melden uns unter {0.email}."
-    ).format(data)
+    # Ask before accepting a record that looks like a repeat. It is only
+    # remembered once the store has accepted it (below), so retrying after a
+    # failed submission does not trigger the duplicate warning.
+    if not confirm_if_duplicate(data, duplicates, parent):
+        return
+
+    # Most stores only queue the record here and write it in the background,
+    # so the confirmation appears without delay. ``JournalStore.add`` (section
+    # 21) waits until the record is on disk, typically a few milliseconds.
+    if store is not None:
+        sink_started = perf_counter()
+        try:
+            store.add(data)
+        except RuntimeError as error:
+            # Stores that write in the background report an earlier failed
+            # write here (see section 13). The form keeps its contents so the
+            # operator can submit again once the problem is fixed.
+            SUBMIT_LATENCY.observe_since(started)
+            message = f"Übermittlung fehlgeschlagen: {error}"
+            if banner is not None:
+                banner.show(message, "error")
+            else:
+                messagebox.showerror("Fehler", message, parent=parent)
+            return
+        SINK_LATENCY.observe_since(sink_started)
+    SUBMIT_LATENCY.observe_since(started)
+    if duplicates is not None:
+        duplicates.add(data)
 
+    # 7. Provide feedback to the user ------------------------------------------
     # ``showinfo`` displays a green info icon that confirms the success.
-    messagebox.showinfo("Erfolg", message)
+    if banner is not None:
+        banner.show(format_confirmation(data))
+    else:
+        messagebox.showinfo("Erfolg", format_confirmation(data), parent=parent)
 
     # After a successful submission we call ``reset_form`` so the form is ready
     # for the next set of inputs.
     reset_form(variables, comments_frame)
 
 
-def reset_form(variables: dict[str, StringVar], comments_frame: ttk.Frame) -> None:
+def format_confirmation(data: RegistrationData) -> str:
+    """Build the thank-you text shown after a successful submission."""
+
+    # ``str.format`` fills in the placeholders with the attributes of our
+    # dataclass. Using ``{0.first_name}`` keeps the template easy to read.
+    return (
+        "Vielen Dank, {0.first_name} {0.last_name}!\n\n"
+        "Wir haben Ihre Daten erhalten und melden uns unter {0.email}."
+    ).format(data)
+
+
+def reset_form(
+    variables: dict[str, StringVar], comments_frame: ttk.Frame | None
+) -> None:
     """Clear all widgets so the form starts fresh."""
 
+    from tkinter import END
+
     for variable in variables.values():
         # Setting the ``StringVar`` to the empty string automatically clears the
         # corresponding entry field on screen.
         variable.set("")
 
-    # ``delete`` removes characters from the text widget. ``END`` is inclusive,
-    # therefore using ``END`` twice ensures the entire content is removed.
-    comments_frame.text_widget.delete("1.0", END)  # type: ignore[attr-defined]
+    # Schemas without a multi-line field have no comments frame (section 20).
+    if comments_frame is None:
+        return
+
+    # ``delete`` removes characters from a text widget. ``END`` is inclusive,
+    # therefore deleting up to ``END`` ensures the entire content is removed.
+    text_widgets = comments_frame.text_widgets  # type: ignore[attr-defined]
+    for text_widget in text_widgets.values():
+        text_widget.delete("1.0", END)
+
+    # In rapid-entry mode (section 29) the cursor jumps back to the first
+    # field so the next person's data can be typed right away.
+    focus_widget = getattr(comments_frame, "focus_after_reset", None)
+    if focus_widget is not None:
+        focus_widget.focus_set()
 
 
 # 8. Run the Tkinter event loop --------------------------------------------------
-def main() -> None:
-    """Assemble the GUI and start the Tkinter event loop."""
+# ``main`` and the kiosk windows of section 26 build the same form. The two
+# helpers below do the shared work, so every option is available in both.
 
-    # Step 1: create the main window that everything else will live inside of.
-    window = create_main_window()
+
+def start_submission_worker(
+    window: Tk,
+    store: RegistrationStore | None = None,
+    background: bool = False,
+    async_sinks: Sequence[AsyncSink] = (),
+    max_concurrency: int = 8,
+) -> tuple[SubmissionWorker | None, Callable[[RegistrationData], Any] | None]:
+    """Create the worker for background submissions and what it should run.
+
+    Returns ``(worker, process)``. Both are ``None`` when submissions are
+    handled directly on the main thread.
+    """
+
+    if async_sinks:
+        sinks = list(async_sinks)
+        if store is not None:
+            # A tiny coroutine wrapper is enough to include the store in the
+            # fan-out.
+            async def store_sink(data: RegistrationData) -> None:
+                store.add(data)
+
+            sinks.append(store_sink)
+        return AsyncSubmissionWorker(window), fan_out(sinks, max_concurrency)
+    if background and store is not None:
+        return SubmissionWorker(window), store.add
+    return None, None
+
+
+@dataclass
+class AssembledForm:
+    """The widgets of one form created by :func:`assemble_form`.
+
+    ``height`` is the window height the form needs, in pixels.
+    """
+
+    variables: dict[str, StringVar]
+    comments_frame: ttk.Frame
+    submit_button: ttk.Button
+    banner: StatusBanner | None
+    height: int
+
+
+def assemble_form(
+    window: Misc,
+    store: RegistrationStore | None = None,
+    duplicates: DuplicateIndex | None = None,
+    worker: SubmissionWorker | None = None,
+    process: Callable[[RegistrationData], Any] | None = None,
+    live_validation: bool = False,
+    inline_feedback: bool = False,
+    rapid_entry: bool = False,
+    profiler: StartupProfiler | None = None,
+) -> AssembledForm:
+    """Build the fields and buttons in ``window`` and connect the handlers.
+
+    With a ``worker`` the submit button runs ``process`` in the background
+    (see :func:`start_submission_worker`), otherwise the record is handed to
+    ``store`` directly. The options are described in :func:`main`.
+    """
+
+    from tkinter import LEFT, RIGHT, ttk
+
+    if profiler is None:
+        profiler = StartupProfiler(enabled=False)
 
     # Step 2: build the form inputs and keep references to their variables.
     variables = build_form_fields(window)
+    profiler.checkpoint("build_form_fields")
 
     # Step 3: add the multi-line comments field beneath the regular entries.
     comments_frame = build_comments_field(window)
+    profiler.checkpoint("build_comments_field")
 
     # Step 4: create a horizontal frame for the action buttons.
     button_frame = ttk.Frame(window, padding=(20, 0, 20, 20))
     button_frame.pack(fill="x")
 
+    # The optional banner is packed at the bottom edge; the window grows by
+    # two lines of text so the form itself keeps its size.
+    banner = None
+    height = 360
+    if inline_feedback:
+        banner = StatusBanner(window)
+        height += 50
+
     # ``ttk.Button`` is connected to a ``command`` callback. Lambda allows us to
     # pass the current variables without defining a separate function.
     submit_button = ttk.Button(
         button_frame,
         text="Absenden",
-        command=lambda: handle_submit(variables, comments_frame),
+        command=lambda: handle_submit(
+            variables,
+            comments_frame,
+            store,
+            duplicates,
+            parent=window,
+            banner=banner,
+        ),
     )
     submit_button.pack(side=LEFT, expand=True, fill="x", padx=(0, 10))
 
+    # In background mode the button gets a different callback. ``configure``
+    # can replace the ``command`` after the widget exists, which we need here
+    # because ``handle_submit_async`` wants the button itself as an argument.
+    if worker is not None and process is not None:
+        submit_button.configure(
+            command=lambda: handle_submit_async(
+                variables,
+                comments_frame,
+                worker,
+                process,
+                submit_button,
+                duplicates,
+                parent=window,
+                banner=banner,
+            )
+        )
+
     reset_button = ttk.Button(
         button_frame,
         text="Zurücksetzen",
@@ -329,11 +581,1253 @@ def main() -> None:
     )
     reset_button.pack(side=RIGHT, expand=True, fill="x")
 
+    # ``invoke`` runs whichever ``command`` the button currently has, so the
+    # shortcut follows the background mode chosen above.
+    if rapid_entry:
+        RapidEntry(window, variables, comments_frame, submit_button.invoke)
+
+    # Optional live validation shows the latest problem in a label below the
+    # buttons. ``errors`` holds one message per field that is currently wrong.
+    if live_validation:
+        # The window has a fixed size, so make room for the extra line.
+        height += 30
+        status_label = ttk.Label(window, foreground="red", padding=(20, 0, 20, 10))
+        status_label.pack(fill="x")
+
+        def show_live_result(label: str, message: str | None) -> None:
+            # Show the first field that still has a problem, or nothing.
+            problems = live_validator.errors.items()
+            text = next((f"{field}: {problem}" for field, problem in problems), "")
+            status_label.configure(text=text)
+
+        live_validator = LiveValidator(window, variables, show_live_result)
+
+    return AssembledForm(variables, comments_frame, submit_button, banner, height)
+
+
+def main(
+    store: RegistrationStore | None = None,
+    background: bool = False,
+    async_sinks: Sequence[AsyncSink] = (),
+    max_concurrency: int = 8,
+    live_validation: bool = False,
+    duplicates_path: str | PathLike[str] | None = None,
+    metrics_port: int | None = None,
+    metrics_path: str | PathLike[str] | None = None,
+    inline_feedback: bool = False,
+    rapid_entry: bool = False,
+) -> None:
+    """Assemble the GUI and start the Tkinter event loop.
+
+    ``store`` optionally receives every valid submission (see section 13). It
+    is closed, and therefore flushed, when the window is closed. With
+    ``background=True`` the store is called from a worker thread so a slow
+    store never freezes the window (see section 14). ``async_sinks`` sends each
+    submission to asyncio-based clients instead (see section 15). With
+    ``live_validation=True`` fields are checked while typing (section 16).
+    ``duplicates_path`` enables duplicate detection with an index that is
+    loaded from and saved back to that file (section 17). Metrics (section
+    27) are served on ``metrics_port`` and/or written to ``metrics_path``
+    every 15 seconds and on exit. ``inline_feedback=True`` replaces the
+    success and error dialogs with a status banner (section 28).
+    ``rapid_entry=True`` adds the keyboard shortcuts from section 29.
+    """
+
+    # Optional timing of every step below (see section 18). When the
+    # environment variable is not set, ``checkpoint`` does nothing.
+    profiler = StartupProfiler.from_environment()
+    import_tkinter(profiler)
+
+    # Step 1: create the main window that everything else will live inside of.
+    window = create_main_window()
+    profiler.checkpoint("create_main_window")
+
+    # The duplicate index is loaded before any widget can submit a record.
+    duplicates = load_duplicate_index(duplicates_path, profiler)
+
+    # Steps 2-4: the worker that runs submissions in the background (if any)
+    # and every widget of the form, see ``assemble_form``.
+    worker, process = start_submission_worker(
+        window, store, background, async_sinks, max_concurrency
+    )
+    profiler.checkpoint("start_submission_worker")
+    form = assemble_form(
+        window,
+        store,
+        duplicates,
+        worker,
+        process,
+        live_validation=live_validation,
+        inline_feedback=inline_feedback,
+        rapid_entry=rapid_entry,
+        profiler=profiler,
+    )
+    if form.height != 360:
+        window.geometry(f"420x{form.height}")
+
+    # Metrics can be scraped over HTTP and/or written to a file regularly.
+    metrics_server = None
+    if metrics_port is not None:
+        metrics_server = METRICS.serve(metrics_port)
+    if metrics_path is not None:
+
+        def write_metrics() -> None:
+            METRICS.write(metrics_path)
+            window.after(15_000, write_metrics)
+
+        window.after(15_000, write_metrics)
+
+    # ``WM_DELETE_WINDOW`` is sent when the user clicks the window's close
+    # button. We use it to write any buffered submissions before exiting.
+    def close_window() -> None:
+        from tkinter import messagebox
+
+        # ``finally`` makes sure a failing step never keeps the window open.
+        try:
+            if worker is not None:
+                worker.shutdown()
+            if store is not None:
+                try:
+                    store.close()
+                except RuntimeError as error:
+                    # The operator should know that records were not written.
+                    messagebox.showerror("Fehler", str(error), parent=window)
+        finally:
+            try:
+                if duplicates is not None and duplicates_path is not None:
+                    duplicates.save(duplicates_path)
+                if metrics_server is not None:
+                    metrics_server.shutdown()
+                if metrics_path is not None:
+                    METRICS.write(metrics_path)
+            finally:
+                window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", close_window)
+    profiler.checkpoint("buttons_and_options")
+
+    # ``update_idletasks`` computes the layout of all widgets without waiting
+    # for the event loop. The first ``<Expose>`` event tells us that the
+    # window has actually been drawn on screen.
+    if profiler.enabled:
+        window.update_idletasks()
+        profiler.checkpoint("first_update_idletasks")
+        window.bind("<Expose>", lambda event: profiler.first_paint(), add="+")
+
     # ``mainloop`` hands control over to Tkinter. The method keeps running until
     # the user closes the window. All button clicks, key presses and redraws are
     # processed inside this loop.
     window.mainloop()
 
 
+# 14. Process submissions in the background -------------------------------------
+# Tkinter is single-threaded: while a button callback runs, the window cannot
+# redraw or react to input. Slow work (network, disk) therefore belongs in a
+# worker thread. Worker threads must not touch widgets, so results travel back
+# through a queue that the main thread checks regularly with ``window.after``.
+
+
+class SubmissionWorker:
+    """Run submission callbacks in a thread pool and report back via ``after``.
+
+    ``submit`` schedules ``process(data)`` on one of the pool's threads. When
+    it finishes, ``on_done(data, error)`` is called *on the Tk main thread*
+    (``error`` is ``None`` on success), so it may safely update widgets.
+    """
+
+    def __init__(
+        self, window: Tk, max_workers: int = 4, poll_interval_ms: int = 10
+    ) -> None:
+        self.window = window
+        self.max_workers = max_workers
+        self.poll_interval_ms = poll_interval_ms
+        # The pool is created on first use so subclasses that run work
+        # elsewhere (see ``AsyncSubmissionWorker``) never start one.
+        self._executor: ThreadPoolExecutor | None = None
+        self._results: SimpleQueue[tuple[Callable[..., None], Any, Any]] = SimpleQueue()
+        self._after_id: str | None = window.after(poll_interval_ms, self._poll)
+
+    def submit(
+        self,
+        process: Callable[[RegistrationData], Any],
+        data: RegistrationData,
+        on_done: Callable[[RegistrationData, BaseException | None], None],
+    ) -> None:
+        future = self._start(process, data)
+
+        # ``add_done_callback`` runs in the worker thread, so it only puts the
+        # outcome into the queue; ``_poll`` picks it up on the main thread.
+        def report(done: Future[Any]) -> None:
+            if done.cancelled():
+                # ``exception()`` raises for a cancelled future instead of
+                # returning the error, so hand ``on_done`` one explicitly.
+                from concurrent.futures import CancelledError
+
+                self._results.put((on_done, data, CancelledError()))
+            else:
+                self._results.put((on_done, data, done.exception()))
+
+        future.add_done_callback(report)
+
+    def _start(
+        self, process: Callable[[RegistrationData], Any], data: RegistrationData
+    ) -> Future[Any]:
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="submission"
+            )
+        return self._executor.submit(process, data)
+
+    def _poll(self) -> None:
+        # Drain everything that finished since the last tick, then schedule the
+        # next check. An empty queue costs a single ``get_nowait`` call, so the
+        # event loop stays free to handle redraws and key presses.
+        results = self._results
+        while True:
+            try:
+                on_done, data, error = results.get_nowait()
+            except Empty:
+                break
+            try:
+                on_done(data, error)
+            except Exception:
+                # A failing callback must not stop polling, or every other
+                # form sharing this worker would wait forever. Tk prints the
+                # traceback just like for an exception in a button command.
+                self.window.report_callback_exception(*sys.exc_info())
+        self._after_id = self.window.after(self.poll_interval_ms, self._poll)
+
+    def _stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def shutdown(self) -> None:
+        """Wait for running submissions and stop polling."""
+
+        self._stop()
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+            self._after_id = None
+
+
+def handle_submit_async(
+    variables: dict[str, StringVar],
+    comments_frame: ttk.Frame,
+    worker: SubmissionWorker,
+    process: Callable[[RegistrationData], Any],
+    button: ttk.Button,
+    duplicates: DuplicateIndex | None = None,
+    parent: Misc | None = None,
+    banner: StatusBanner | None = None,
+) -> None:
+    """Background variant of :func:`handle_submit`.
+
+    Reading and validating the widgets is quick and must happen on the main
+    thread anyway. Only ``process`` (for example ``store.add``) runs in the
+    worker pool. The submit button is disabled until the result arrives so the
+    same record cannot be sent twice.
+    """
+
+    from tkinter import messagebox
+
+    started = perf_counter()
+    SUBMIT_ATTEMPTS.inc()
+    try:
+        data = parse_form_data(variables, comments_frame)
+    except ValueError as error:
+        record_validation_failure(error)
+        SUBMIT_LATENCY.observe_since(started)
+        if banner is not None:
+            banner.show(str(error), "error")
+        else:
+            messagebox.showerror("Fehler", str(error), parent=parent)
+        return
+    if not confirm_if_duplicate(data, duplicates, parent):
+        return
+
+    # ``state(["disabled"])`` greys out a ttk widget; ``["!disabled"]`` (with
+    # the exclamation mark) turns the flag off again.
+    button.state(["disabled"])
+    # In this mode the sink latency is the time until the worker reports back,
+    # including the wait in its queue.
+    sink_started = perf_counter()
+
+    def on_done(data: RegistrationData, error: BaseException | None) -> None:
+        SINK_LATENCY.observe_since(sink_started)
+        SUBMIT_LATENCY.observe_since(started)
+        # The window may have been closed while the record was on its way
+        # (see section 26); then there is nothing left to update.
+        if not button.winfo_exists():
+            if error is None and duplicates is not None:
+                duplicates.add(data)
+            return
+        button.state(["!disabled"])
+        if error is not None:
+            message = f"Übermittlung fehlgeschlagen: {error}"
+            if banner is not None:
+                banner.show(message, "error")
+            else:
+                messagebox.showerror("Fehler", message, parent=parent)
+            return
+        # Like in ``handle_submit`` only delivered records count as seen.
+        if duplicates is not None:
+            duplicates.add(data)
+        if banner is not None:
+            banner.show(format_confirmation(data))
+        else:
+            messagebox.showinfo("Erfolg", format_confirmation(data), parent=parent)
+        reset_form(variables, comments_frame)
+
+    try:
+        worker.submit(process, data, on_done)
+    except Exception as error:
+        # Starting the job can fail too, e.g. when ``process`` is not a
+        # coroutine function or the worker has already been shut down. Report
+        # it like a failed submission so the button is enabled again.
+        on_done(data, error)
+
+
+# 15. Submit through asyncio-based clients --------------------------------------
+# Many modern HTTP and database libraries are written for ``asyncio``. Their
+# coroutines need a running event loop, while Tkinter needs ``mainloop``. Both
+# loops want to own the main thread, so we give asyncio its own thread and
+# bridge the two with ``asyncio.run_coroutine_threadsafe``: the Tk side hands a
+# coroutine over, the asyncio side runs it, and the result comes back through
+# the same after()-polled queue that ``SubmissionWorker`` uses.
+
+# An async sink receives one validated record, e.g. to POST it to a server.
+AsyncSink = Callable[[RegistrationData], Awaitable[Any]]
+
+
+class AsyncSubmissionWorker(SubmissionWorker):
+    """``SubmissionWorker`` whose jobs are coroutines run on an asyncio loop.
+
+    ``process`` passed to :meth:`submit` must be an ``async`` function. The
+    loop lives in a daemon thread that is started on construction and stopped
+    by :meth:`shutdown`. Pending coroutines get ``shutdown_timeout`` seconds to
+    finish; whatever is still running after that is cancelled.
+    """
+
+    def __init__(
+        self, window: Tk, poll_interval_ms: int = 10, shutdown_timeout: float = 5.0
+    ) -> None:
+        import asyncio
+
+        super().__init__(window, poll_interval_ms=poll_interval_ms)
+        self.shutdown_timeout = shutdown_timeout
+        self.loop = asyncio.new_event_loop()
+        self._pending: set[Future[Any]] = set()
+        self._loop_thread = Thread(
+            target=self.loop.run_forever, name="asyncio-submissions", daemon=True
+        )
+        self._loop_thread.start()
+
+    def _start(
+        self, process: Callable[[RegistrationData], Any], data: RegistrationData
+    ) -> Future[Any]:
+        import asyncio
+
+        future = asyncio.run_coroutine_threadsafe(process(data), self.loop)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def _stop(self) -> None:
+        import asyncio
+        from concurrent.futures import wait
+
+        # Let outstanding submissions finish, then stop and close the loop.
+        # ``shutdown`` runs on the Tk thread, so a sink that never answers must
+        # not hang the window forever: after the timeout it is cancelled.
+        _done, not_done = wait(list(self._pending), timeout=self.shutdown_timeout)
+        if not_done:
+            # Cancelling from here would only *schedule* the ``CancelledError``;
+            # the loop must run once more so the coroutines can clean up.
+            cancelling = asyncio.run_coroutine_threadsafe(
+                _cancel_other_tasks(), self.loop
+            )
+            wait([cancelling], timeout=self.shutdown_timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join()
+        self.loop.close()
+
+
+async def _cancel_other_tasks() -> None:
+    import asyncio
+
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def fan_out(
+    sinks: Sequence[AsyncSink], max_concurrency: int = 8
+) -> Callable[[RegistrationData], Awaitable[None]]:
+    """Combine several async sinks into one async submit hook.
+
+    Every record is sent to all ``sinks`` concurrently. A shared semaphore caps
+    the number of sink calls in flight across *all* submissions, so a burst of
+    records cannot open an unbounded number of connections. If a sink fails,
+    the first error is raised once all sinks for that record have finished.
+    """
+
+    import asyncio
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(sink: AsyncSink, data: RegistrationData) -> Any:
+        async with semaphore:
+            return await sink(data)
+
+    async def submit(data: RegistrationData) -> None:
+        results = await asyncio.gather(
+            *(call(sink, data) for sink in sinks), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    return submit
+
+
+def main_async(
+    sinks: Sequence[AsyncSink],
+    max_concurrency: int = 8,
+    store: RegistrationStore | None = None,
+) -> None:
+    """Start the form with submissions fanned out to async ``sinks``.
+
+    This is :func:`main` with an asyncio loop running next to Tk. ``store`` is
+    optional and, as in ``main``, closed when the window is closed.
+    """
+
+    main(store=store, async_sinks=sinks, max_concurrency=max_concurrency)
+
+
+# 16. Validate while the user types ---------------------------------------------
+# ``StringVar.trace_add("write", callback)`` calls ``callback`` after every
+# change of the variable, i.e. after every keystroke. Validating on each call
+# would be wasteful, so each field gets its own *debounce* timer: a keystroke
+# cancels the field's pending ``after`` job and schedules a new one. Only when
+# the user pauses for ``delay_ms`` does the check run, and only for that field.
+
+
+class LiveValidator:
+    """Debounced per-field validation driven by ``StringVar`` traces.
+
+    ``on_result(label, message)`` is called after a field has been checked;
+    ``message`` is ``None`` when the field is fine. The rules come from
+    ``schema``, the same one the form was built from. Empty fields are not
+    reported while typing: the "required" rule is left to the final check on
+    submit, otherwise clearing the form would flood the user with errors.
+    The current verdicts are also kept in :attr:`errors`.
+    """
+
+    def __init__(
+        self,
+        window: Tk,
+        variables: dict[str, StringVar],
+        on_result: Callable[[str, str | None], None] | None = None,
+        delay_ms: int = 300,
+        schema: FormSchema = REGISTRATION_SCHEMA,
+    ) -> None:
+        self.window = window
+        self.schema = schema
+        self.variables = variables
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.errors: dict[str, str] = {}
+        self._pending: dict[str, str] = {}
+        self._traces: list[tuple[StringVar, str]] = []
+        for label, variable in variables.items():
+            # The lambda binds ``label`` as a default argument so each trace
+            # remembers its own field instead of the loop's last value.
+            callback = variable.trace_add(
+                "write", lambda *_args, label=label: self._on_write(label)
+            )
+            self._traces.append((variable, callback))
+
+    def _on_write(self, label: str) -> None:
+        # This runs on every keystroke, so it only (re)arms the field's timer.
+        pending = self._pending.get(label)
+        if pending is not None:
+            self.window.after_cancel(pending)
+        self._pending[label] = self.window.after(self.delay_ms, self._validate, label)
+
+    def _validate(self, label: str) -> None:
+        del self._pending[label]
+        value = self.variables[label].get().strip()
+        error = self.schema.validator.check(label, value)
+        message = str(error) if error is not None else None
+        if message is None:
+            self.errors.pop(label, None)
+        else:
+            self.errors[label] = message
+        if self.on_result is not None:
+            self.on_result(label, message)
+
+    def detach(self) -> None:
+        """Remove the traces and cancel timers that have not fired yet."""
+
+        for variable, callback in self._traces:
+            variable.trace_remove("write", callback)
+        self._traces.clear()
+        for pending in self._pending.values():
+            self.window.after_cancel(pending)
+        self._pending.clear()
+
+
+# 17. Ask before accepting a probable duplicate --------------------------------
+# ``DuplicateIndex`` (section 17 in ``registrierung``) only answers whether a
+# record was probably seen before; the question to the operator is asked here.
+
+
+def confirm_if_duplicate(
+    data: RegistrationData,
+    duplicates: DuplicateIndex | None,
+    parent: Misc | None = None,
+) -> bool:
+    """Ask the operator before accepting a probable duplicate.
+
+    Returns ``True`` when the record should be accepted. ``askyesno`` is used
+    instead of an error because the index may report false positives.
+    """
+
+    if duplicates is None or data not in duplicates:
+        return True
+
+    from tkinter import messagebox
+
+    return messagebox.askyesno(
+        "Mögliches Duplikat",
+        "{0.first_name} {0.last_name} ({0.email}) wurde vermutlich bereits "
+        "registriert.\n\nTrotzdem absenden?".format(data),
+        parent=parent,
+    )
+
+
+# 18. Measure how long the window takes to appear --------------------------------
+# On slow hardware it is useful to know which part of ``main`` costs the most
+# time. Setting the environment variable ``FORMULAR_PROFILE_STARTUP`` switches
+# on a small profiler: ``1`` prints a JSON report to stderr, any other value is
+# used as a file name to which one JSON line is appended per start, so the
+# numbers of several releases can be compared later.
+#
+# For each step we record two clocks: *wall* time (what the user experiences)
+# and *CPU* time (what our process actually computed). A large gap between the
+# two means the step was waiting, e.g. for the X server or the disk.
+
+PROFILE_ENVIRONMENT_VARIABLE = "FORMULAR_PROFILE_STARTUP"
+
+
+class StartupProfiler:
+    """Records wall-clock and CPU time between named checkpoints.
+
+    When ``enabled`` is ``False`` every method returns immediately, so the
+    profiler can stay in ``main`` without measurable cost.
+    """
+
+    def __init__(self, enabled: bool, destination: str | None = None) -> None:
+        self.enabled = enabled
+        self.destination = destination
+        self.steps: list[dict[str, Any]] = []
+        self.first_paint_ms: float | None = None
+        self._started_wall = self._last_wall = perf_counter()
+        self._started_cpu = self._last_cpu = process_time()
+
+    @classmethod
+    def from_environment(cls) -> StartupProfiler:
+        """Create a profiler configured by ``FORMULAR_PROFILE_STARTUP``."""
+
+        setting = environ.get(PROFILE_ENVIRONMENT_VARIABLE, "")
+        if setting in ("", "0"):
+            return cls(enabled=False)
+        return cls(enabled=True, destination=None if setting == "1" else setting)
+
+    def checkpoint(self, name: str) -> None:
+        """Record the time spent since the previous checkpoint as ``name``."""
+
+        if not self.enabled:
+            return
+        wall, cpu = perf_counter(), process_time()
+        self.steps.append(
+            {
+                "step": name,
+                "wall_ms": (wall - self._last_wall) * 1000,
+                "cpu_ms": (cpu - self._last_cpu) * 1000,
+            }
+        )
+        self._last_wall, self._last_cpu = wall, cpu
+
+    def first_paint(self) -> None:
+        """Call when the window is first drawn; writes the report once."""
+
+        if not self.enabled or self.first_paint_ms is not None:
+            return
+        self.first_paint_ms = (perf_counter() - self._started_wall) * 1000
+        self.write()
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "timestamp": time(),
+            "python": platform.python_version(),
+            "steps": self.steps,
+            "total_wall_ms": (self._last_wall - self._started_wall) * 1000,
+            "total_cpu_ms": (self._last_cpu - self._started_cpu) * 1000,
+            "time_to_first_paint_ms": self.first_paint_ms,
+        }
+
+    def write(self) -> None:
+        line = json.dumps(self.report())
+        if self.destination is None:
+            print(line, file=sys.stderr)
+        else:
+            with open(self.destination, "a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+def import_tkinter(profiler: StartupProfiler) -> None:
+    """Import Tk and record the time as its own step.
+
+    Tk is imported lazily (section 1), so without this the import would be
+    hidden in whichever step first needs it.
+    """
+
+    from importlib import import_module
+
+    import_module("tkinter")
+    import_module("tkinter.ttk")
+    profiler.checkpoint("import_tkinter")
+
+
+def load_duplicate_index(
+    path: str | PathLike[str] | None, profiler: StartupProfiler
+) -> DuplicateIndex | None:
+    """Load the index of section 17 from ``path`` (or start an empty one).
+
+    Loading a large index, or allocating a new one, takes a noticeable part of
+    the startup time, so it is reported as its own step.
+    """
+
+    if path is None:
+        return None
+    if path_exists(path):
+        duplicates = DuplicateIndex.load(path)
+    else:
+        duplicates = DuplicateIndex()
+    profiler.checkpoint("load_duplicate_index")
+    return duplicates
+
+
+# 19. Show very large forms without creating every widget -----------------------
+# Creating a label and an entry for each of several hundred fields takes time
+# and memory, although only a dozen rows fit on screen. A *virtualised* form
+# keeps a ``StringVar`` for every field (cheap) but only creates widgets for
+# the rows that are currently visible. When the user scrolls, the same row
+# widgets are moved and re-labelled to show other fields ("recycling").
+
+
+class VirtualForm:
+    """Scrollable form that only instantiates widgets for visible rows.
+
+    ``variables`` has the same shape as the result of
+    :func:`build_form_fields`, so :func:`read_form_values`,
+    :func:`parse_schema_form` and :func:`reset_form` work unchanged.
+    """
+
+    def __init__(
+        self,
+        parent: Tk,
+        schema: FormSchema,
+        row_height: int = 32,
+        height: int = 320,
+    ) -> None:
+        from tkinter import Canvas, StringVar, ttk
+
+        self.fields = schema.entry_fields
+        self.row_height = row_height
+        self.variables: dict[str, StringVar] = {
+            field.label: StringVar() for field in self.fields
+        }
+        self._labels = [field.label + ":" for field in self.fields]
+        self._values = list(self.variables.values())
+
+        self.frame = ttk.Frame(parent, padding=(20, 20, 20, 0))
+        self.frame.pack(fill="both", expand=True)
+        # ``yscrollincrement`` makes one scroll "unit" exactly one row high.
+        self.canvas = Canvas(
+            self.frame,
+            height=height,
+            highlightthickness=0,
+            yscrollincrement=row_height,
+            scrollregion=(0, 0, 0, len(self.fields) * row_height),
+        )
+        self.scrollbar = ttk.Scrollbar(
+            self.frame, orient="vertical", command=self.canvas.yview
+        )
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.canvas.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.canvas)
+
+        # Each pooled slot is ``[canvas item id, label, entry, shown row]``.
+        self._pool: list[list[Any]] = []
+        self._width = 1
+
+    # -- row pool --------------------------------------------------------------
+    def _create_slot(self) -> list[Any]:
+        from tkinter import ttk
+
+        row_frame = ttk.Frame(self.canvas)
+        label = ttk.Label(row_frame, width=18)
+        label.pack(side="left", padx=(0, 12))
+        entry = ttk.Entry(row_frame)
+        entry.pack(side="left", fill="x", expand=True)
+        slot = [None, label, entry, -1]
+        entry.bind("<Tab>", lambda event: self._focus_next(slot, 1))
+        entry.bind("<Shift-Tab>", lambda event: self._focus_next(slot, -1))
+        entry.bind("<ISO_Left_Tab>", lambda event: self._focus_next(slot, -1))
+        self._bind_wheel(entry)
+        slot[0] = self.canvas.create_window(
+            0, 0, window=row_frame, anchor="nw", width=self._width
+        )
+        return slot
+
+    def _refresh(self) -> None:
+        """Assign the pooled widgets to the rows that are currently visible."""
+
+        top = int(self.canvas.canvasy(0))
+        first = max(0, top // self.row_height)
+        visible = self.canvas.winfo_height() // self.row_height + 2
+        count = max(0, min(len(self.fields) - first, visible))
+        wanted = set(range(first, first + count))
+
+        # The slot with the keyboard focus keeps its row even after it scrolled
+        # out of view. Rebinding its ``textvariable`` would send the next key
+        # presses into whichever row the slot shows now.
+        pinned = self._focused_slot()
+        free = []
+        for slot in self._pool:
+            if slot is pinned or slot[3] in wanted:
+                wanted.discard(slot[3])
+            else:
+                free.append(slot)
+
+        for row in sorted(wanted):
+            if free:
+                slot = free.pop()
+            else:
+                slot = self._create_slot()
+                self._pool.append(slot)
+            # Only rows that changed are re-configured: slots that still show a
+            # visible row keep their label, variable and position untouched.
+            item, label, entry, _shown = slot
+            label.configure(text=self._labels[row])
+            entry.configure(textvariable=self._values[row])
+            self.canvas.coords(item, 0, row * self.row_height)
+            self.canvas.itemconfigure(item, state="normal")
+            slot[3] = row
+
+        for slot in free:
+            self.canvas.itemconfigure(slot[0], state="hidden")
+            slot[3] = -1
+
+    def _focused_slot(self) -> list[Any] | None:
+        try:
+            focused = self.canvas.focus_get()
+        except KeyError:
+            # ``focus_get`` fails for Tk-internal widgets such as the popdown
+            # list of a combobox; none of those is one of our entries.
+            return None
+        for slot in self._pool:
+            if slot[2] is focused and slot[3] >= 0:
+                return slot
+        return None
+
+    # -- events ------------------------------------------------------------------
+    def _on_scroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self._refresh()
+
+    def _on_resize(self, event: Any) -> None:
+        self._width = event.width
+        for item, *_rest in self._pool:
+            self.canvas.itemconfigure(item, width=event.width)
+        self._refresh()
+
+    def _bind_wheel(self, widget: Any) -> None:
+        # Windows and macOS report ``<MouseWheel>`` with a ``delta``; X11 sends
+        # button 4/5 presses instead.
+        widget.bind(
+            "<MouseWheel>",
+            lambda event: self.canvas.yview_scroll(
+                -1 if event.delta > 0 else 1, "units"
+            ),
+        )
+        widget.bind("<Button-4>", lambda event: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda event: self.canvas.yview_scroll(1, "units"))
+
+    def _focus_next(self, slot: list[Any], step: int) -> str:
+        self.focus_row(slot[3] + step)
+        # "break" stops Tk's default Tab handling, which only knows about the
+        # few pooled entries and not about the rows that are not built yet.
+        return "break"
+
+    def focus_row(self, row: int) -> None:
+        """Scroll ``row`` into view and move the keyboard focus to it."""
+
+        if not 0 <= row < len(self.fields):
+            return
+        top = int(self.canvas.canvasy(0)) // self.row_height
+        visible = max(1, self.canvas.winfo_height() // self.row_height)
+        if row < top:
+            self.canvas.yview_moveto(row / len(self.fields))
+        elif row >= top + visible:
+            self.canvas.yview_moveto((row - visible + 1) / len(self.fields))
+        self._refresh()
+        for _item, _label, entry, shown in self._pool:
+            if shown == row:
+                entry.focus_set()
+                return
+
+
+def build_virtual_form_fields(
+    parent: Tk, schema: FormSchema, height: int = 320
+) -> dict[str, StringVar]:
+    """Drop-in alternative to :func:`build_form_fields` for long schemas."""
+
+    return VirtualForm(parent, schema, height=height).variables
+
+
+# 20. Reuse built forms instead of destroying them ------------------------------
+# Creating widgets is the slow part of showing a form: every label and entry is
+# a Tcl command plus a Python wrapper object. A kiosk that switches between
+# several forms therefore builds each form once and afterwards only hides it
+# (``pack_forget``) and shows it again (``pack``), clearing the old input in
+# between just like ``reset_form`` does after a submission.
+
+
+@dataclass
+class PooledForm:
+    """A form built once by :class:`FormPool` and reused afterwards."""
+
+    schema: FormSchema
+    frame: ttk.Frame
+    variables: dict[str, StringVar]
+    comments_frame: ttk.Frame | None
+
+    def values(self) -> dict[str, Any]:
+        """Validate the current input (see :func:`parse_schema_form`)."""
+
+        return parse_schema_form(self.variables, self.comments_frame, self.schema)
+
+
+class FormPool:
+    """Keep the frames of recently shown forms alive for instant switching.
+
+    ``show(schema)`` builds the form on first use and afterwards only packs the
+    hidden frame again. At most ``max_forms`` hidden forms are kept; the one
+    that was shown least recently is destroyed when the pool is full.
+    """
+
+    def __init__(self, parent: Tk, max_forms: int = 8) -> None:
+        self.parent = parent
+        self.max_forms = max_forms
+        # Dictionaries remember insertion order, so re-inserting a form on every
+        # ``show`` keeps the least recently used one at the front.
+        self._forms: dict[FormSchema, PooledForm] = {}
+        self.current: PooledForm | None = None
+
+    def _build(self, schema: FormSchema) -> PooledForm:
+        from tkinter import ttk
+
+        frame = ttk.Frame(self.parent)
+        variables = build_form_fields(frame, schema)
+        comments_frame = None
+        if any(field.kind == "multiline" for field in schema.fields):
+            comments_frame = build_comments_field(frame, schema)
+        return PooledForm(schema, frame, variables, comments_frame)
+
+    def show(self, schema: FormSchema, reset: bool = True) -> PooledForm:
+        """Display the form for ``schema`` and hide the previous one.
+
+        With ``reset=True`` (the default) a reused form is cleared first, so the
+        next user never sees the previous user's input.
+        """
+
+        if self.current is not None:
+            if self.current.schema == schema:
+                if reset:
+                    self.reset(self.current)
+                return self.current
+            self.current.frame.pack_forget()
+
+        form = self._forms.pop(schema, None)
+        if form is None:
+            form = self._build(schema)
+            if len(self._forms) >= self.max_forms:
+                oldest = next(iter(self._forms))
+                self._forms.pop(oldest).frame.destroy()
+        elif reset:
+            self.reset(form)
+        self._forms[schema] = form
+        form.frame.pack(fill="both", expand=True)
+        self.current = form
+        return form
+
+    def hide(self) -> None:
+        """Hide the current form but keep it in the pool."""
+
+        if self.current is not None:
+            self.current.frame.pack_forget()
+            self.current = None
+
+    @staticmethod
+    def reset(form: PooledForm) -> None:
+        """Clear input, undo history and scroll position of a pooled form."""
+
+        reset_form(form.variables, form.comments_frame)
+        if form.comments_frame is not None:
+            texts = form.comments_frame.text_widgets  # type: ignore[attr-defined]
+            for text in texts.values():
+                # Without this, Ctrl+Z in the next session would bring back the
+                # previous user's comments.
+                text.edit_reset()
+                text.yview_moveto(0)
+
+    def clear(self) -> None:
+        """Destroy every pooled form, e.g. when the kiosk shuts down."""
+
+        for form in self._forms.values():
+            form.frame.destroy()
+        self._forms.clear()
+        self.current = None
+
+
+# 26. Run several forms in one process (kiosk mode) -----------------------------
+# A kiosk with several screens used to start one Python process per screen.
+# Every process loads its own Tcl/Tk interpreter, its own copy of this module
+# and its own caches. In kiosk mode a single process opens one ``Toplevel``
+# window per screen instead. All windows share the one Tk interpreter and the
+# caches of the validator and the e-mail check (section 6). They also share a
+# single ``SubmissionWorker``, store and duplicate index, so every record goes
+# through one submission queue. An extra screen then only costs its widgets.
+
+
+class KioskSession:
+    """One registration form in its own ``Toplevel`` window.
+
+    The form is built by :func:`assemble_form`, so the options behave exactly
+    like in :func:`main`. Modal dialogs would block every station of the
+    kiosk, so feedback is shown inside each window by default (section 28).
+    """
+
+    def __init__(
+        self,
+        root: Tk,
+        number: int,
+        store: RegistrationStore | None = None,
+        worker: SubmissionWorker | None = None,
+        duplicates: DuplicateIndex | None = None,
+        geometry: str | None = None,
+        inline_feedback: bool = True,
+        process: Callable[[RegistrationData], Any] | None = None,
+        live_validation: bool = False,
+        rapid_entry: bool = False,
+        profiler: StartupProfiler | None = None,
+    ) -> None:
+        from tkinter import Toplevel
+
+        self.number = number
+        self.window = Toplevel(root)
+        self.window.title(f"Schritt-für-Schritt Formular – Station {number}")
+        self.window.resizable(False, False)
+
+        # Without a ``process`` the worker runs ``store.add``, like in ``main``.
+        if worker is not None and process is None and store is not None:
+            process = store.add
+        form = assemble_form(
+            self.window,
+            store,
+            duplicates,
+            worker,
+            process,
+            live_validation=live_validation,
+            inline_feedback=inline_feedback,
+            rapid_entry=rapid_entry,
+            profiler=profiler,
+        )
+        self.variables = form.variables
+        self.comments_frame = form.comments_frame
+        self.submit_button = form.submit_button
+        self.banner = form.banner
+        # Without an explicit position the windows are placed side by side.
+        self.window.geometry(
+            geometry or f"420x{form.height}+{(number - 1) * 440}+40"
+        )
+
+
+def main_kiosk(
+    sessions: int = 2,
+    store: RegistrationStore | None = None,
+    background: bool = True,
+    duplicates_path: str | PathLike[str] | None = None,
+    geometries: Sequence[str] = (),
+    async_sinks: Sequence[AsyncSink] = (),
+    max_concurrency: int = 8,
+    live_validation: bool = False,
+    inline_feedback: bool = True,
+    rapid_entry: bool = False,
+) -> None:
+    """Open ``sessions`` forms in one process and start the event loop.
+
+    ``geometries`` optionally places each window, e.g. ``"420x360+1920+0"``
+    for the second monitor. The root window itself stays hidden; closing the
+    last form ends the program and closes the shared ``store``. The other
+    options are the same as for :func:`main`.
+    """
+
+    profiler = StartupProfiler.from_environment()
+    import_tkinter(profiler)
+
+    from tkinter import Tk
+
+    root = Tk()
+    root.withdraw()
+    profiler.checkpoint("create_root_window")
+
+    duplicates = load_duplicate_index(duplicates_path, profiler)
+
+    # One worker for all windows: every submission goes through its queue.
+    worker, process = start_submission_worker(
+        root, store, background, async_sinks, max_concurrency
+    )
+    profiler.checkpoint("start_submission_worker")
+
+    open_sessions: list[KioskSession] = []
+
+    def shutdown() -> None:
+        from tkinter import messagebox
+
+        # Same order and error handling as ``close_window`` in ``main``.
+        try:
+            if worker is not None:
+                worker.shutdown()
+            if store is not None:
+                try:
+                    store.close()
+                except RuntimeError as error:
+                    messagebox.showerror("Fehler", str(error), parent=root)
+        finally:
+            try:
+                if duplicates is not None and duplicates_path is not None:
+                    duplicates.save(duplicates_path)
+            finally:
+                root.destroy()
+
+    def close_session(session: KioskSession) -> None:
+        session.window.destroy()
+        open_sessions.remove(session)
+        if not open_sessions:
+            shutdown()
+
+    for number in range(1, sessions + 1):
+        geometry = geometries[number - 1] if number <= len(geometries) else None
+        session = KioskSession(
+            root,
+            number,
+            store,
+            worker,
+            duplicates,
+            geometry,
+            inline_feedback=inline_feedback,
+            process=process,
+            live_validation=live_validation,
+            rapid_entry=rapid_entry,
+            profiler=profiler,
+        )
+        session.window.protocol(
+            "WM_DELETE_WINDOW", lambda session=session: close_session(session)
+        )
+        open_sessions.append(session)
+    profiler.checkpoint("open_sessions")
+
+    if profiler.enabled:
+        root.update_idletasks()
+        profiler.checkpoint("first_update_idletasks")
+        first = open_sessions[0].window if open_sessions else root
+        first.bind("<Expose>", lambda event: profiler.first_paint(), add="+")
+
+    root.mainloop()
+
+
+# 28. Show feedback without blocking the form -----------------------------------
+# ``messagebox`` dialogs are *modal*: they run their own small event loop and
+# the operator has to click "OK" before the next registration can be typed.
+# With a queue of people waiting, those clicks add up. A status banner is a
+# label inside the window that shows the same text in colour and clears itself
+# after a few seconds via ``after``. Typing can continue immediately.
+
+
+class StatusBanner:
+    """Coloured one- or two-line message area at the bottom of a window.
+
+    :meth:`show` replaces the current message and restarts the timer, so a
+    quick series of submissions always shows the latest result.
+    """
+
+    # Foreground and background colour for each kind of message.
+    COLORS = {
+        "info": ("#1e6b2e", "#e3f4e6"),
+        "error": ("#8a1c1c", "#fbe4e4"),
+    }
+
+    def __init__(self, parent: Misc, duration_ms: int = 4000) -> None:
+        from tkinter import ttk
+
+        self.duration_ms = duration_ms
+        # The empty label keeps its space while hidden, so showing a message
+        # never moves the form fields around.
+        self.label = ttk.Label(
+            parent, padding=(20, 6), anchor="w", wraplength=380, text=""
+        )
+        self.label.pack(side="bottom", fill="x")
+        self._job: str | None = None
+
+    def show(self, message: str, kind: str = "info") -> None:
+        """Display ``message`` (``kind`` is ``"info"`` or ``"error"``)."""
+
+        foreground, background = self.COLORS[kind]
+        # The confirmation text contains blank lines meant for a dialog; in
+        # the banner it reads better as one paragraph.
+        self.label.configure(
+            text=" ".join(message.split()), foreground=foreground, background=background
+        )
+        if self._job is not None:
+            self.label.after_cancel(self._job)
+        self._job = self.label.after(self.duration_ms, self.hide)
+
+    def hide(self) -> None:
+        """Remove the message now instead of waiting for the timer."""
+
+        if self._job is not None:
+            self.label.after_cancel(self._job)
+            self._job = None
+        # An empty colour falls back to the theme's default.
+        self.label.configure(text="", background="")
+
+
+# 29. Enter records with the keyboard only ---------------------------------------
+# Operators who type a long stack of paper forms should not need the mouse.
+# ``RapidEntry`` adds three shortcuts to an existing form:
+#
+# * Enter (or Tab) in an entry moves to the next field; after the last entry
+#   the cursor goes to the comments. Shift+Tab moves back.
+# * Ctrl+Enter submits from anywhere, including the comments, where a plain
+#   Enter still inserts a new line.
+# * After a successful submission ``reset_form`` puts the cursor back into
+#   the first field (see the end of section 7).
+#
+# Every handler returns ``"break"``. That tells Tk to stop processing the
+# event, so the default bindings (such as inserting a tab character into the
+# text widget) do not run as well.
+
+
+class RapidEntry:
+    """Keyboard navigation and submit shortcut for a form from sections 4/5."""
+
+    def __init__(
+        self,
+        window: Misc,
+        variables: dict[str, StringVar],
+        comments_frame: ttk.Frame | None,
+        submit: Callable[[], Any],
+    ) -> None:
+        self.submit = submit
+        self.entries = self._find_entries(window, variables)
+        self.texts = (
+            list(comments_frame.text_widgets.values())  # type: ignore[attr-defined]
+            if comments_frame is not None
+            else []
+        )
+        # Tab order: the entries first, then the text areas below them.
+        self.fields = self.entries + self.texts
+
+        # On Windows and macOS Shift+Tab also matches ``<Tab>``, so the way
+        # back needs its own bindings; X11 reports it as ``<ISO_Left_Tab>``.
+        for position, widget in enumerate(self.fields):
+            # Return inside a text area starts a new line, so there only Tab
+            # moves on (instead of inserting a tab character).
+            if position < len(self.entries):
+                forward = ("<Return>", "<KP_Enter>", "<Tab>")
+            else:
+                forward = ("<Tab>",)
+            for sequence in forward:
+                widget.bind(sequence, partial(self._advance, position))
+            for sequence in ("<Shift-Tab>", "<ISO_Left_Tab>"):
+                widget.bind(sequence, partial(self._retreat, position))
+            for sequence in ("<Control-Return>", "<Control-KP_Enter>"):
+                widget.bind(sequence, self._submit)
+
+        if comments_frame is not None:
+            # ``reset_form`` looks for this attribute on the comments frame.
+            comments_frame.focus_after_reset = (  # type: ignore[union-attr]
+                self.fields[0] if self.fields else None
+            )
+
+        if self.fields:
+            self.fields[0].focus_set()
+
+    @staticmethod
+    def _find_entries(window: Misc, variables: dict[str, StringVar]) -> list[Misc]:
+        """Return the ``Entry`` widgets bound to ``variables``, in their order.
+
+        :func:`build_form_fields` only returns the variables, so the entries
+        are found by walking the widget tree and comparing the names of their
+        ``textvariable`` options.
+        """
+
+        positions = {
+            str(variable): index for index, variable in enumerate(variables.values())
+        }
+        found: dict[int, Misc] = {}
+        pending = list(window.winfo_children())
+        while pending:
+            widget = pending.pop()
+            pending.extend(widget.winfo_children())
+            if widget.winfo_class() not in ("TEntry", "Entry"):
+                continue
+            index = positions.get(str(widget.cget("textvariable")))
+            if index is not None:
+                found[index] = widget
+        return [found[index] for index in sorted(found)]
+
+    def _advance(self, position: int, event: object = None) -> str:
+        """Move the cursor from field ``position`` to the next one."""
+
+        if position + 1 < len(self.fields):
+            self.fields[position + 1].focus_set()
+        else:
+            self.fields[position].tk_focusNext().focus_set()
+        return "break"
+
+    def _retreat(self, position: int, event: object = None) -> str:
+        """Move the cursor from field ``position`` back to the previous one."""
+
+        if position > 0:
+            self.fields[position - 1].focus_set()
+        else:
+            self.fields[position].tk_focusPrev().focus_set()
+        return "break"
+
+    def _submit(self, event: object = None) -> str:
+        self.submit()
+        return "break"
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,1384 @@
+"""Small benchmark runner for ``registrierung.py`` and ``Formular.py``.
+
+Run ``python benchmarks.py`` to execute every benchmark, or pass one or more
+benchmark names (``python benchmarks.py batch_validation``) to run a subset.
+Each benchmark prints how many items it processed and the resulting rate so
+changes to the hot paths can be compared before and after. With
+``--json results.json`` the measurements are also written as JSON, together
+with the Python version and machine, for regression tracking across commits.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from itertools import cycle
+
+import Formular
+import registrierung
+
+# A benchmark returns a dictionary of measurements which the runner prints in
+# a uniform way. ``BENCHMARKS`` maps each benchmark's name to its function.
+Benchmark = Callable[[], dict[str, float]]
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(function: Benchmark) -> Benchmark:
+    """Register ``function`` under its own name."""
+
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def make_records(count: int, invalid_every: int = 20) -> list[tuple[str, ...]]:
+    """Build ``count`` synthetic records; every ``invalid_every``-th is broken."""
+
+    records = []
+    for number in range(count):
+        email = f"person{number}@example.org"
+        if invalid_every and number % invalid_every == 0:
+            email = "kein-at-zeichen"
+        records.append(
+            (f" Vorname{number} ", "Nachname", email, str(18 + number % 60), "")
+        )
+    return records
+
+
+@benchmark
+def batch_validation() -> dict[str, float]:
+    """Throughput of ``validate_records`` on one core."""
+
+    records = make_records(1_000_000)
+    started = time.perf_counter()
+    valid = invalid = 0
+    for result in registrierung.validate_records(records):
+        valid += len(result.valid)
+        invalid += len(result.errors)
+    elapsed = time.perf_counter() - started
+    return {
+        "records": len(records),
+        "valid": valid,
+        "invalid": invalid,
+        "seconds": elapsed,
+        "records_per_second": len(records) / elapsed,
+    }
+
+
+@benchmark
+def columnar_validation() -> dict[str, float]:
+    """Per-row ``validate_chunk`` checks vs. NumPy ``validate_columns``."""
+
+    # NumPy is an optional dependency of ``registrierung``; without it there is no
+    # columnar mode to compare against.
+    try:
+        import numpy as np
+    except ImportError:
+        return {"skipped_no_numpy": 1}
+
+    records = make_records(1_000_000)
+    columns = [list(column) for column in zip(*records)]
+
+    started = time.perf_counter()
+    registrierung.validate_chunk(records)
+    row_seconds = time.perf_counter() - started
+
+    # Partner dumps are loaded straight into arrays, so the conversion from
+    # Python lists is reported separately from the validation itself.
+    started = time.perf_counter()
+    arrays = [np.asarray(column, dtype=str) for column in columns]
+    convert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = registrierung.validate_columns(*arrays)
+    column_seconds = time.perf_counter() - started
+
+    return {
+        "records": len(records),
+        "valid": int(result.valid.sum()),
+        "row_seconds": row_seconds,
+        "list_to_array_seconds": convert_seconds,
+        "column_seconds": column_seconds,
+        "speedup": row_seconds / column_seconds,
+    }
+
+
+def _traced_bytes(build: Callable[[], object]) -> int:
+    """Return how many bytes are still allocated after ``build()`` finishes."""
+
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def _fresh_records(count: int, record_type: type) -> Iterator[object]:
+    """Yield records whose strings are newly created, as a parser would do."""
+
+    first_names = ["Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta"]
+    last_names = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber"]
+    for number in range(count):
+        # ``"".join`` forces a new string object for every field, so repeated
+        # names are *not* shared unless the container interns them.
+        yield record_type(
+            "".join(first_names[number % 7]),
+            "".join(last_names[number % 5]),
+            f"person{number}@example.org",
+            18 + number % 60,
+            "".join(""),
+        )
+
+
+@benchmark
+def record_memory() -> dict[str, float]:
+    """Memory of 1M records: dataclass list vs. slotted list vs. table."""
+
+    count = 1_000_000
+    plain = _traced_bytes(
+        lambda: list(_fresh_records(count, registrierung.RegistrationData))
+    )
+    slotted = _traced_bytes(
+        lambda: list(_fresh_records(count, registrierung.SlottedRegistrationData))
+    )
+    table = _traced_bytes(
+        lambda: registrierung.RegistrationTable(
+            _fresh_records(count, registrierung.SlottedRegistrationData)
+        )
+    )
+    return {
+        "records": count,
+        "dataclass_mib": plain / 2**20,
+        "slotted_mib": slotted / 2**20,
+        "table_mib": table / 2**20,
+        "dataclass_bytes_per_record": plain / count,
+        "table_bytes_per_record": table / count,
+    }
+
+
+def _write_csv(path: str, count: int) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Vorname", "Nachname", "E-Mail", "Alter", "Kommentare"])
+        writer.writerows(make_records(count))
+
+
+@benchmark
+def streaming_import() -> dict[str, float]:
+    """Peak memory and throughput of ``import_records`` for growing files."""
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for count in (100_000, 1_000_000):
+            path = os.path.join(directory, f"{count}.csv")
+            _write_csv(path, count)
+            # Throughput and memory are measured in separate runs because
+            # ``tracemalloc`` slows every allocation down considerably.
+            started = time.perf_counter()
+            reports = registrierung.import_records(path, sink=lambda records: None)
+            total = sum(report.count for report in reports)
+            elapsed = time.perf_counter() - started
+            tracemalloc.start()
+            reports = registrierung.import_records(path, sink=lambda records: None)
+            for _report in reports:
+                pass
+            _size, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[f"records_{count}"] = total
+            results[f"peak_mib_{count}"] = peak / 2**20
+            results[f"records_per_second_{count}"] = total / elapsed
+    return results
+
+
+@benchmark
+def sqlite_store() -> dict[str, float]:
+    """Write-behind ``SQLiteStore`` vs. one INSERT + COMMIT per submission."""
+
+    count = 50_000
+    records = [
+        registrierung.RegistrationData(*record[:3], 30, "")
+        for record in make_records(count, invalid_every=0)
+    ]
+    results: dict[str, float] = {"records": count}
+    with tempfile.TemporaryDirectory() as directory:
+        # Baseline: what a naive per-submit integration does.
+        connection = sqlite3.connect(os.path.join(directory, "naive.db"))
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE registrations (first_name, last_name, email, age, comments)"
+        )
+        naive_count = 2_000
+        started = time.perf_counter()
+        for record in records[:naive_count]:
+            connection.execute(
+                "INSERT INTO registrations VALUES (?, ?, ?, ?, ?)",
+                (record.first_name, record.last_name, record.email, record.age, ""),
+            )
+            connection.commit()
+        results["naive_records_per_second"] = naive_count / (
+            time.perf_counter() - started
+        )
+        connection.close()
+
+        store = registrierung.SQLiteStore(os.path.join(directory, "store.db"))
+        started = time.perf_counter()
+        for record in records:
+            store.add(record)
+        queued = time.perf_counter() - started
+        store.close()
+        total = time.perf_counter() - started
+        results["add_microseconds"] = queued / count * 1e6
+        results["store_records_per_second"] = count / total
+    return results
+
+
+def _tk_window():
+    """Return a hidden Tk root window, or ``None`` when no display is available."""
+
+    import tkinter
+
+    try:
+        window = Formular.create_main_window()
+    except tkinter.TclError:
+        return None
+    window.withdraw()
+    return window
+
+
+@benchmark
+def background_submission() -> dict[str, float]:
+    """Event-loop latency while a slow backend runs in ``SubmissionWorker``."""
+
+    window = _tk_window()
+    if window is None:
+        return {"skipped_no_display": 1}
+
+    record = registrierung.RegistrationData(
+        "Anna", "Müller", "anna@example.org", 30, ""
+    )
+    submissions = 20
+    finished: list[float] = []
+    gaps: list[float] = []
+
+    def slow_backend(data: object) -> None:
+        time.sleep(0.5)
+
+    def heartbeat(previous: float) -> None:
+        # A 5 ms heartbeat measures how late the event loop gets to it. Any
+        # blocking work on the main thread would show up as a large gap.
+        now = time.perf_counter()
+        gaps.append((now - previous) * 1000 - 5)
+        if len(finished) < submissions:
+            window.after(5, heartbeat, now)
+        else:
+            window.quit()
+
+    worker = Formular.SubmissionWorker(window)
+    started = time.perf_counter()
+    def on_done(data: object, error: BaseException | None) -> None:
+        finished.append(time.perf_counter())
+
+    for _ in range(submissions):
+        worker.submit(slow_backend, record, on_done)
+    window.after(5, heartbeat, time.perf_counter())
+    window.mainloop()
+    worker.shutdown()
+    window.destroy()
+    return {
+        "submissions": submissions,
+        "backend_seconds_each": 0.5,
+        "total_seconds": max(finished) - started,
+        "max_event_loop_lag_ms": max(gaps),
+        "mean_event_loop_lag_ms": sum(gaps) / len(gaps),
+    }
+
+
+class _StubVariable:
+    """Minimal ``StringVar`` stand-in that runs write traces like Tk does."""
+
+    def __init__(self) -> None:
+        self.value = ""
+        self.callbacks: list[Callable[..., None]] = []
+
+    def trace_add(self, mode: str, callback: Callable[..., None]) -> str:
+        self.callbacks.append(callback)
+        return str(len(self.callbacks))
+
+    def get(self) -> str:
+        return self.value
+
+    def set(self, value: str) -> None:
+        self.value = value
+        for callback in self.callbacks:
+            callback("var", "", "write")
+
+
+class _StubWindow:
+    """Records ``after`` jobs without running them."""
+
+    def __init__(self) -> None:
+        self.jobs = 0
+
+    def after(self, delay: int, *args: object) -> str:
+        self.jobs += 1
+        return str(self.jobs)
+
+    def after_cancel(self, job: str) -> None:
+        pass
+
+
+@benchmark
+def live_validation() -> dict[str, float]:
+    """Cost of one keystroke with ``LiveValidator`` attached."""
+
+    keystrokes = 100_000
+    results: dict[str, float] = {"keystrokes": keystrokes}
+
+    # Python-side cost: trace dispatch plus re-arming the debounce timer.
+    variable = _StubVariable()
+    Formular.LiveValidator(_StubWindow(), {"E-Mail": variable})
+    started = time.perf_counter()
+    for number in range(keystrokes):
+        variable.set("a" * (number % 30))
+    results["python_callback_us"] = (time.perf_counter() - started) / keystrokes * 1e6
+
+    # The real thing: ``StringVar.set`` through Tcl, with and without traces.
+    window = _tk_window()
+    if window is None:
+        results["tk_skipped_no_display"] = 1
+        return results
+    variables = Formular.build_form_fields(window)
+    email = variables["E-Mail"]
+    for label, attach in (("tk_plain_us", False), ("tk_traced_us", True)):
+        validator = Formular.LiveValidator(window, variables) if attach else None
+        started = time.perf_counter()
+        for number in range(keystrokes):
+            email.set("a" * (number % 30))
+        results[label] = (time.perf_counter() - started) / keystrokes * 1e6
+        if validator is not None:
+            validator.detach()
+    window.destroy()
+    return results
+
+
+@benchmark
+def email_validation() -> dict[str, float]:
+    """Old substring check vs. the regex grammar, uncached and cached."""
+
+    addresses = [f"person{number}@example.org" for number in range(200_000)]
+    results: dict[str, float] = {"addresses": len(addresses)}
+
+    def timed(check: Callable[[str], object], values: list[str]) -> float:
+        started = time.perf_counter()
+        for value in values:
+            check(value)
+        return (time.perf_counter() - started) / len(values) * 1e9
+
+    results["substring_ns"] = timed(
+        lambda email: "@" in email and "." in email, addresses
+    )
+    results["grammar_ns"] = timed(registrierung.match_email, addresses)
+
+    # The columnar mode checks ASCII addresses with array operations instead.
+    try:
+        import numpy as np
+    except ImportError:
+        results["columnar_skipped_no_numpy"] = 1
+    else:
+        column = np.asarray(addresses, dtype=str)
+        started = time.perf_counter()
+        # ``np.strings`` is new in NumPy 2; ``registrierung`` falls back to
+        # the older ``np.char`` functions in the same way.
+        strings = getattr(np, "strings", np.char)
+        registrierung._match_emails_ascii(np, strings, column)
+        elapsed = time.perf_counter() - started
+        results["columnar_ns"] = elapsed / len(addresses) * 1e9
+    # Live validation re-checks the same address on every pause in typing,
+    # which is the case the cache is meant for.
+    registrierung.is_valid_email.cache_clear()
+    repeated = addresses[:100] * 2_000
+    results["cached_repeat_ns"] = timed(registrierung.is_valid_email, repeated)
+    return results
+
+
+@benchmark
+def duplicate_index() -> dict[str, float]:
+    """Insert/lookup cost of ``DuplicateIndex`` and its fixed memory footprint."""
+
+    count = 200_000
+    records = [
+        registrierung.RegistrationData(
+            f"Vorname{n}", "Nachname", f"p{n}@example.org", 30, ""
+        )
+        for n in range(count)
+    ]
+    index = registrierung.DuplicateIndex()
+    started = time.perf_counter()
+    for record in records:
+        index.add(record)
+    add_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    hits = sum(record in index for record in records)
+    lookup_seconds = time.perf_counter() - started
+    return {
+        "records": count,
+        "hits": hits,
+        "add_us": add_seconds / count * 1e6,
+        "lookup_us": lookup_seconds / count * 1e6,
+        "memory_mib": 2 * index.bits / 8 / 2**20,
+        "capacity_per_generation": index.capacity,
+    }
+
+
+def _import_microseconds(code: str) -> dict[str, int]:
+    """Run ``code`` in a fresh interpreter with ``-X importtime``.
+
+    Returns the cumulative import time in microseconds of every top-level
+    import the code triggered (nested imports are included in their parent).
+    """
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+@benchmark
+def import_time() -> dict[str, float]:
+    """Cold-start import cost of the headless and the GUI code paths."""
+
+    runs = 5
+    headless = []
+    gui = []
+    for _ in range(runs):
+        timings = _import_microseconds("import registrierung")
+        headless.append(timings["registrierung"])
+        # The GUI path additionally loads the Tk modules that ``main`` uses.
+        timings = _import_microseconds(
+            "import Formular, tkinter, tkinter.ttk, tkinter.messagebox"
+        )
+        gui_modules = ("Formular", "tkinter", "tkinter.ttk", "tkinter.messagebox")
+        gui.append(sum(timings.get(name, 0) for name in gui_modules))
+    return {
+        "runs": runs,
+        "headless_ms": min(headless) / 1000,
+        "gui_ms": min(gui) / 1000,
+    }
+
+
+@benchmark
+def schema_validation() -> dict[str, float]:
+    """Compiled validator on a 120-field onboarding-sized schema."""
+
+    kinds = ("text", "email", "integer")
+    schema = registrierung.FormSchema(
+        tuple(
+            registrierung.FieldSpec(f"field_{n}", f"Feld {n}", kind=kinds[n % 3])
+            for n in range(120)
+        )
+    )
+    values = [("Wert", "person@example.org", "42")[n % 3] for n in range(120)]
+    validator = schema.validator
+    validator(values)  # warm the e-mail cache like repeated submissions do
+    runs = 20_000
+    started = time.perf_counter()
+    for _ in range(runs):
+        validator(values)
+    elapsed = time.perf_counter() - started
+    return {
+        "fields": 120,
+        "runs": runs,
+        "us_per_record": elapsed / runs * 1e6,
+        "ns_per_field": elapsed / runs / 120 * 1e9,
+    }
+
+
+def _count_widgets(widget) -> int:
+    """Return the number of Tk widgets below ``widget`` (recursively)."""
+
+    return sum(1 + _count_widgets(child) for child in widget.winfo_children())
+
+
+@benchmark
+def virtual_form() -> dict[str, float]:
+    """Time to build an eager versus a virtualised form for long schemas."""
+
+    window = _tk_window()
+    if window is None:
+        return {"skipped_no_display": 1}
+
+    from tkinter import ttk
+
+    results: dict[str, float] = {}
+    for size in (50, 500, 2000):
+        schema = registrierung.FormSchema(
+            tuple(
+                registrierung.FieldSpec(f"field_{n}", f"Feld {n}") for n in range(size)
+            )
+        )
+        for name, build in (
+            ("eager", Formular.build_form_fields),
+            ("virtual", Formular.build_virtual_form_fields),
+        ):
+            container = ttk.Frame(window)
+            container.pack()
+            started = time.perf_counter()
+            build(container, schema)
+            window.update_idletasks()
+            elapsed = time.perf_counter() - started
+            widgets = _count_widgets(container)
+            container.destroy()
+            results[f"{name}_{size}_ms"] = elapsed * 1000
+            results[f"{name}_{size}_widgets"] = widgets
+    window.destroy()
+    return results
+
+
+@benchmark
+def form_switching() -> dict[str, float]:
+    """Switching between forms: rebuilding every time versus ``FormPool``."""
+
+    window = _tk_window()
+    if window is None:
+        return {"skipped_no_display": 1}
+
+    from tkinter import ttk
+
+    schemas = [registrierung.REGISTRATION_SCHEMA] + [
+        registrierung.FormSchema(
+            tuple(
+                registrierung.FieldSpec(f"f{form}_{n}", f"Feld {n}") for n in range(30)
+            )
+        )
+        for form in range(3)
+    ]
+    switches = 200
+
+    started = time.perf_counter()
+    for index in range(switches):
+        frame = ttk.Frame(window)
+        frame.pack()
+        Formular.build_form_fields(frame, schemas[index % len(schemas)])
+        Formular.build_comments_field(frame)
+        window.update_idletasks()
+        frame.destroy()
+    rebuild = (time.perf_counter() - started) / switches
+
+    pool = Formular.FormPool(window)
+    for schema in schemas:
+        pool.show(schema)  # first build is not part of the switch latency
+    window.update_idletasks()
+    started = time.perf_counter()
+    for index in range(switches):
+        pool.show(schemas[index % len(schemas)])
+        window.update_idletasks()
+    pooled = (time.perf_counter() - started) / switches
+    pool.clear()
+    window.destroy()
+    return {
+        "switches": switches,
+        "rebuild_ms_per_switch": rebuild * 1000,
+        "pooled_ms_per_switch": pooled * 1000,
+        "speedup": rebuild / pooled,
+    }
+
+
+@benchmark
+def journal() -> dict[str, float]:
+    """Durable ``JournalStore``: fsync group commit, replay and crash recovery."""
+
+    import threading
+
+    count = 50_000
+    records = [
+        registrierung.RegistrationData(*record[:3], 30, "")
+        for record in make_records(count, invalid_every=0)
+    ]
+    results: dict[str, float] = {"records": count}
+    with tempfile.TemporaryDirectory() as directory:
+        journal = registrierung.JournalStore(directory)
+        # One submission at a time: every ``add`` pays for its own fsync.
+        single = 500
+        started = time.perf_counter()
+        for record in records[:single]:
+            journal.add(record)
+        results["single_adds_per_second"] = single / (time.perf_counter() - started)
+
+        # Eight submitting threads share each fsync (group commit).
+        threads = [
+            threading.Thread(
+                target=lambda part: [journal.add(record) for record in part],
+                args=(records[n * 1000 : (n + 1) * 1000],),
+            )
+            for n in range(8)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results["concurrent_adds_per_second"] = 8000 / (
+            time.perf_counter() - started
+        )
+
+        started = time.perf_counter()
+        for start in range(0, count, 1000):
+            journal.add_many(records[start : start + 1000])
+        results["bulk_records_per_second"] = count / (time.perf_counter() - started)
+        journal.close()
+
+        # Reopening only scans the newest segment, however long the journal is.
+        started = time.perf_counter()
+        registrierung.JournalStore(directory).close()
+        results["recovery_ms"] = (time.perf_counter() - started) * 1000
+
+        class CountingSink(registrierung.RegistrationStore):
+            def __init__(self) -> None:
+                self.count = 0
+
+            def add(self, record: registrierung.RegistrationData) -> None:
+                self.count += 1
+
+        sink = CountingSink()
+        started = time.perf_counter()
+        registrierung.JournalReplayer(directory, sink).replay_pending()
+        results["replay_records_per_second"] = sink.count / (
+            time.perf_counter() - started
+        )
+    return results
+
+
+@benchmark
+def binary_codec() -> dict[str, float]:
+    """Binary codec vs. JSON and pickle for 1M registrations: size and speed."""
+
+    import gc
+    import json
+    import pickle
+
+    count = 1_000_000
+    # Every tenth record carries umlauts and a comment, like real submissions.
+    records = [
+        registrierung.RegistrationData(
+            "Jürgen" if number % 10 == 0 else f"Vorname{number}",
+            "Müller" if number % 10 == 0 else "Nachname",
+            f"person{number}@example.org",
+            18 + number % 60,
+            "Rückruf erwünscht" if number % 10 == 0 else "",
+        )
+        for number in range(count)
+    ]
+
+    def to_json(records: list[registrierung.RegistrationData]) -> bytes:
+        rows = [
+            [r.first_name, r.last_name, r.email, r.age, r.comments] for r in records
+        ]
+        return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def from_json(data: bytes) -> list[registrierung.RegistrationData]:
+        return [registrierung.RegistrationData(*row) for row in json.loads(data)]
+
+    codecs = {
+        "binary": (
+            registrierung.encode_registrations,
+            registrierung.decode_registrations,
+        ),
+        "json": (to_json, from_json),
+        "pickle": (lambda records: pickle.dumps(records, 5), pickle.loads),
+    }
+    results: dict[str, float] = {"records": count}
+    # The garbage collector would otherwise run at random points while a
+    # million objects are created and distort the comparison.
+    gc.disable()
+    try:
+        for name, (encode, decode) in codecs.items():
+            started = time.perf_counter()
+            data = encode(records)
+            encoded = time.perf_counter()
+            decoded = decode(data)
+            finished = time.perf_counter()
+            assert decoded[-1] == records[-1]
+            del decoded
+            results[f"{name}_bytes_per_record"] = len(data) / count
+            results[f"{name}_encode_ns_per_record"] = (encoded - started) / count * 1e9
+            results[f"{name}_decode_ns_per_record"] = (finished - encoded) / count * 1e9
+    finally:
+        gc.enable()
+    return results
+
+
+@benchmark
+def archive() -> dict[str, float]:
+    """Memory-mapped archive: write, open, random lookups and a full scan."""
+
+    import random
+
+    count = 1_000_000
+    records = (
+        registrierung.RegistrationData(
+            f"Vorname{n}", "Müller", f"p{n}@example.org", 30, ""
+        )
+        for n in range(count)
+    )
+    results: dict[str, float] = {"records": count}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "registrations.archive")
+        started = time.perf_counter()
+        registrierung.write_archive(path, records)
+        results["write_records_per_second"] = count / (time.perf_counter() - started)
+        results["file_mib"] = os.path.getsize(path) / 2**20
+
+        started = time.perf_counter()
+        archive = registrierung.RegistrationArchive(path)
+        results["open_us"] = (time.perf_counter() - started) * 1e6
+
+        lookups = [random.randrange(count) for _ in range(100_000)]
+        started = time.perf_counter()
+        for index in lookups:
+            archive[index]
+        results["random_lookup_us"] = (
+            (time.perf_counter() - started) / len(lookups) * 1e6
+        )
+
+        started = time.perf_counter()
+        scanned = sum(1 for _ in archive)
+        results["scan_records_per_second"] = scanned / (time.perf_counter() - started)
+        archive.close()
+    return results
+
+
+@benchmark
+def parallel_validation() -> dict[str, float]:
+    """Scaling of ``validate_records_parallel`` from one worker to all cores."""
+
+    records = make_records(1_000_000)
+    results: dict[str, float] = {"records": len(records)}
+
+    started = time.perf_counter()
+    for _ in registrierung.validate_records(records):
+        pass
+    serial = time.perf_counter() - started
+    results["serial_records_per_second"] = len(records) / serial
+
+    # ``process_time`` only counts this process, not the workers. The work
+    # left in the main process bounds the speedup on any number of cores.
+    for collect_valid in (True, False):
+        started = time.process_time()
+        for _ in registrierung.validate_records_parallel(
+            records, collect_valid=collect_valid
+        ):
+            pass
+        main_cpu = time.process_time() - started
+        label = "collect" if collect_valid else "count_only"
+        results[f"{label}_main_process_us_per_record"] = main_cpu / len(records) * 1e6
+        results[f"{label}_max_speedup"] = serial / main_cpu
+
+    # For a file the workers read their own byte ranges, so the main process
+    # only decodes the valid records that come back.
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "records.csv")
+        _write_csv(path, len(records))
+        started = time.perf_counter()
+        for _ in registrierung.import_records(path, lambda valid: None):
+            pass
+        file_serial = time.perf_counter() - started
+        results["file_serial_records_per_second"] = len(records) / file_serial
+        for collect_valid in (True, False):
+            started = time.process_time()
+            for _ in registrierung.validate_file_parallel(
+                path, collect_valid=collect_valid
+            ):
+                pass
+            main_cpu = time.process_time() - started
+            label = "file_collect" if collect_valid else "file_count_only"
+            results[f"{label}_main_process_us_per_record"] = (
+                main_cpu / len(records) * 1e6
+            )
+            results[f"{label}_max_speedup"] = file_serial / main_cpu
+
+    cores = os.cpu_count() or 1
+    workers = 1
+    while True:
+        started = time.perf_counter()
+        for _ in registrierung.validate_records_parallel(records, max_workers=workers):
+            pass
+        elapsed = time.perf_counter() - started
+        results[f"workers_{workers}_records_per_second"] = len(records) / elapsed
+        results[f"workers_{workers}_speedup"] = serial / elapsed
+        if workers >= cores:
+            break
+        workers = min(workers * 2, cores)
+    return results
+
+
+class _StubText:
+    """``Text`` stand-in for the comments widget used by the form helpers."""
+
+    def __init__(self) -> None:
+        self.value = ""
+
+    def get(self, start: str, end: str) -> str:
+        return self.value + "\n"
+
+    def delete(self, start: str, end: str) -> None:
+        self.value = ""
+
+
+class _StubCommentsFrame:
+    def __init__(self) -> None:
+        self.text_widget = _StubText()
+        self.text_widgets = {"Kommentare": self.text_widget}
+
+
+def _nanoseconds_per_call(function: Callable[[], object], runs: int) -> float:
+    """Best of three timings of ``runs`` calls, in nanoseconds per call."""
+
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(runs):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / runs * 1e9
+
+
+@benchmark
+def form_submission() -> dict[str, float]:
+    """Per-call cost of the submit path: parse, construct, format and reset.
+
+    ``handle_submit`` itself is timed with the message boxes replaced by a
+    no-op, so the numbers show the Python work around the dialog.
+    """
+
+    labels = [field.label for field in registrierung.REGISTRATION_SCHEMA.entry_fields]
+    variables = {label: _StubVariable() for label in labels}
+    comments = _StubCommentsFrame()
+
+    def fill(values: tuple[str, ...]) -> None:
+        for variable, value in zip(variables.values(), values):
+            variable.value = value
+        comments.text_widget.value = "Bitte per E-Mail antworten."
+
+    def parse_invalid() -> None:
+        try:
+            Formular.parse_form_data(variables, comments)  # type: ignore[arg-type]
+        except registrierung.ValidationError:
+            pass
+
+    runs = 100_000
+    results: dict[str, float] = {"runs": runs}
+    fill(("Anna", "Müller", "anna@example.org", "30"))
+    parse = Formular.parse_form_data
+    # The same address every time is answered from the ``lru_cache`` of the
+    # e-mail helpers, which is what a user fixing a typo in another field sees.
+    results["parse_valid_cached_ns"] = _nanoseconds_per_call(
+        lambda: parse(variables, comments), runs  # type: ignore[arg-type]
+    )
+    # Cycling through more addresses than the caches hold (4096) makes every
+    # call a miss; the cost of picking the next address is subtracted.
+    email = variables["E-Mail"]
+    addresses = cycle([f"person{number}@example.org" for number in range(10_000)])
+
+    def next_address() -> None:
+        email.value = next(addresses)
+
+    def parse_new_address() -> None:
+        email.value = next(addresses)
+        parse(variables, comments)  # type: ignore[arg-type]
+
+    results["parse_valid_uncached_ns"] = _nanoseconds_per_call(
+        parse_new_address, runs
+    ) - _nanoseconds_per_call(next_address, runs)
+    fill(("Anna", "Müller", "anna-at-example.org", "30"))
+    results["parse_invalid_email_ns"] = _nanoseconds_per_call(parse_invalid, runs)
+    fill(("Anna", "", "anna@example.org", "30"))
+    results["parse_missing_field_ns"] = _nanoseconds_per_call(parse_invalid, runs)
+    fill(("Anna", "Müller", "anna@example.org", "dreißig"))
+    results["parse_invalid_age_ns"] = _nanoseconds_per_call(parse_invalid, runs)
+
+    results["construct_record_ns"] = _nanoseconds_per_call(
+        lambda: registrierung.RegistrationData(
+            "Anna", "Müller", "anna@example.org", 30, ""
+        ),
+        runs,
+    )
+    data = registrierung.RegistrationData("Anna", "Müller", "anna@example.org", 30, "")
+    results["format_confirmation_ns"] = _nanoseconds_per_call(
+        lambda: Formular.format_confirmation(data), runs
+    )
+
+    def reset_populated() -> None:
+        fill(("Anna", "Müller", "anna@example.org", "30"))
+        Formular.reset_form(variables, comments)  # type: ignore[arg-type]
+
+    results["reset_populated_form_ns"] = _nanoseconds_per_call(reset_populated, runs)
+
+    from tkinter import messagebox
+
+    def submit_valid() -> None:
+        fill(("Anna", "Müller", "anna@example.org", "30"))
+        Formular.handle_submit(variables, comments)  # type: ignore[arg-type]
+
+    def submit_invalid() -> None:
+        fill(("Anna", "Müller", "anna-at-example.org", "30"))
+        Formular.handle_submit(variables, comments)  # type: ignore[arg-type]
+
+    # Like ``reset_populated_form_ns`` both timings include refilling the form.
+    dialogs = messagebox.showinfo, messagebox.showerror
+    messagebox.showinfo = messagebox.showerror = lambda *args, **kwargs: "ok"
+    try:
+        results["handle_submit_valid_ns"] = _nanoseconds_per_call(submit_valid, runs)
+        results["handle_submit_invalid_ns"] = _nanoseconds_per_call(
+            submit_invalid, runs
+        )
+    finally:
+        messagebox.showinfo, messagebox.showerror = dialogs
+    return results
+
+
+@benchmark
+def window_assembly() -> dict[str, float]:
+    """Build the complete window like ``main`` does, then reset a real form.
+
+    The window is put together by the same ``create_main_window`` and
+    ``assemble_form`` calls as in ``main``, once with the default options and
+    once with the in-window banner, live validation and rapid entry enabled.
+    """
+
+    import tkinter
+
+    runs = 20
+    results: dict[str, float] = {"runs": runs}
+    options = {
+        "default": {},
+        "all_options": {
+            "inline_feedback": True,
+            "live_validation": True,
+            "rapid_entry": True,
+        },
+    }
+    for name, extra in options.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            try:
+                window = Formular.create_main_window()
+            except tkinter.TclError:
+                return {"skipped_no_display": 1}
+            window.withdraw()
+            form = Formular.assemble_form(window, **extra)
+            window.update_idletasks()
+            timings.append(time.perf_counter() - started)
+            window.destroy()
+        results[f"{name}_ms_min"] = min(timings) * 1000
+        results[f"{name}_ms_median"] = sorted(timings)[runs // 2] * 1000
+
+    # Resetting real widgets includes the Tcl round trips of ``StringVar.set``
+    # and ``Text.delete``, which the stubs in ``form_submission`` leave out.
+    window = Formular.create_main_window()
+    window.withdraw()
+    form = Formular.assemble_form(window)
+    variables = form.variables
+    comments_frame = form.comments_frame
+
+    def reset_populated() -> None:
+        for variable in variables.values():
+            variable.set("Anna")
+        text = comments_frame.text_widgets["Kommentare"]  # type: ignore[attr-defined]
+        text.insert("1.0", "Kommentar")
+        Formular.reset_form(variables, comments_frame)
+
+    results["reset_populated_form_ns"] = _nanoseconds_per_call(reset_populated, 2_000)
+    window.destroy()
+    return results
+
+
+def _stand_in_server(fail_first: int = 0):
+    """Start a local HTTP server that accepts ``HTTPStore`` batches.
+
+    It counts connections, requests and records and answers the first
+    ``fail_first`` requests with ``503`` so retries can be exercised. Call
+    ``shutdown()`` on the returned server when done.
+    """
+
+    import gzip
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep connections open between requests
+
+        def setup(self) -> None:
+            super().setup()
+            with server.lock:
+                server.connections += 1
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            with server.lock:
+                server.requests += 1
+                failing = server.requests <= fail_first
+                if not failing:
+                    server.records += len(json.loads(body)["registrations"])
+            self.send_response(503 if failing else 204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()  # type: ignore[attr-defined]
+    for counter in ("connections", "requests", "records"):
+        setattr(server, counter, 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@benchmark
+def http_sink() -> dict[str, float]:
+    """``HTTPStore`` batching and keep-alive vs. one connection per record."""
+
+    import http.client
+    import json
+
+    record = registrierung.RegistrationData(
+        "Anna", "Müller", "anna@example.org", 30, ""
+    )
+    results: dict[str, float] = {}
+
+    # Baseline: what the kiosks did so far, one fresh connection per click.
+    server = _stand_in_server()
+    host, port = server.server_address
+    naive = 300
+    body = json.dumps({"registrations": [record.__dict__]}).encode()
+    started = time.perf_counter()
+    for _ in range(naive):
+        connection = http.client.HTTPConnection(host, port)
+        connection.request("POST", "/", body, {"Content-Type": "application/json"})
+        connection.getresponse().read()
+        connection.close()
+    results["naive_ms_per_record"] = (time.perf_counter() - started) / naive * 1000
+    server.shutdown()
+
+    server = _stand_in_server()
+    count = 50_000
+    store = registrierung.HTTPStore(f"http://{host}:{server.server_address[1]}/")
+    started = time.perf_counter()
+    for _ in range(count):
+        store.add(record)
+    store.flush()
+    elapsed = time.perf_counter() - started
+    store.close()
+    results["batched_records_per_second"] = count / elapsed
+    results["batched_requests"] = server.requests  # type: ignore[attr-defined]
+    results["batched_connections"] = server.connections  # type: ignore[attr-defined]
+    results["batched_records_received"] = server.records  # type: ignore[attr-defined]
+    server.shutdown()
+
+    # The first three requests fail with 503; backoff retries deliver anyway.
+    server = _stand_in_server(fail_first=3)
+    store = registrierung.HTTPStore(
+        f"http://{host}:{server.server_address[1]}/", retry_delay=0.01
+    )
+    for _ in range(100):
+        store.add(record)
+    store.close()
+    results["retry_records_received"] = server.records  # type: ignore[attr-defined]
+    results["retries"] = store.retries
+    server.shutdown()
+    return results
+
+
+_RSS_SNIPPET = """
+import os, Formular
+window = Formular.create_main_window()
+Formular.build_form_fields(window)
+Formular.build_comments_field(window)
+window.update()
+print(int(open('/proc/self/statm').read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+"""
+
+
+def _rss_bytes() -> int | None:
+    """Resident memory of this process (Linux only, ``None`` elsewhere)."""
+
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@benchmark
+def kiosk_memory() -> dict[str, float]:
+    """Memory of one form process vs. each extra ``KioskSession`` window."""
+
+    import tkinter
+
+    if _rss_bytes() is None:
+        return {"skipped_no_proc": 1}
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        return {"skipped_no_display": 1}
+    root.withdraw()
+
+    completed = subprocess.run(
+        [sys.executable, "-c", _RSS_SNIPPET], capture_output=True, text=True
+    )
+    results: dict[str, float] = {
+        "full_process_mib": int(completed.stdout) / 2**20,
+    }
+
+    sessions = 8
+    first = Formular.KioskSession(root, 1)
+    root.update()
+    before = _rss_bytes() or 0
+    started = time.perf_counter()
+    for number in range(2, sessions + 1):
+        Formular.KioskSession(root, number)
+    root.update()
+    elapsed = time.perf_counter() - started
+    after = _rss_bytes() or 0
+    first.window.destroy()
+    root.destroy()
+    results["extra_session_mib"] = (after - before) / (sessions - 1) / 2**20
+    results["extra_session_ms"] = elapsed / (sessions - 1) * 1000
+    return results
+
+
+@benchmark
+def metrics_overhead() -> dict[str, float]:
+    """Cost of recording one metrics event and of one Prometheus export."""
+
+    registry = registrierung.MetricsRegistry()
+    counter = registry.counter("benchmark_events_total", "Test counter")
+    histogram = registry.histogram("benchmark_duration_seconds", "Test histogram")
+    runs = 1_000_000
+    started = time.perf_counter()
+    results: dict[str, float] = {
+        "counter_inc_ns": _nanoseconds_per_call(counter.inc, runs),
+        "histogram_observe_ns": _nanoseconds_per_call(
+            lambda: histogram.observe(0.0123), runs
+        ),
+        "histogram_observe_since_ns": _nanoseconds_per_call(
+            lambda: histogram.observe_since(started), runs
+        ),
+        # The ``lambda`` wrappers above add this much to their numbers.
+        "empty_lambda_ns": _nanoseconds_per_call(lambda: None, runs),
+    }
+    exports = 200
+    started = time.perf_counter()
+    for _ in range(exports):
+        registrierung.METRICS.export()
+    results["export_us"] = (time.perf_counter() - started) / exports * 1e6
+    return results
+
+
+@benchmark
+def operator_throughput() -> dict[str, float]:
+    """Scripted data entry with modal dialogs vs. the inline status banner.
+
+    The script fills in the form and clicks "Absenden" for each record. A
+    modal dialog is replaced by a stand-in that, like the real one, runs a
+    nested event loop until the operator clicks "OK" ``dismiss_seconds``
+    later. Records per minute assume ``typing_seconds`` per record.
+    """
+
+    import tkinter
+    from tkinter import messagebox
+
+    window = _tk_window()
+    if window is None:
+        return {"skipped_no_display": 1}
+
+    typing_seconds = 6.0
+    dismiss_seconds = 0.6
+    records = 20
+
+    def modal_stand_in(title: str, message: str, **options: object) -> str:
+        deadline = time.perf_counter() + dismiss_seconds
+        while time.perf_counter() < deadline:
+            window.update()
+        return "ok"
+
+    def run(inline: bool) -> float:
+        frame = tkinter.Frame(window)
+        frame.pack()
+        variables = Formular.build_form_fields(frame)
+        comments_frame = Formular.build_comments_field(frame)
+        banner = Formular.StatusBanner(frame) if inline else None
+        started = time.perf_counter()
+        for number in range(records):
+            values = ("Anna", "Müller", f"anna{number}@example.org", "30")
+            if number % 5 == 4:
+                values = ("Anna", "Müller", "anna-at-example.org", "30")
+            for variable, value in zip(variables.values(), values):
+                variable.set(value)
+            Formular.handle_submit(variables, comments_frame, banner=banner)
+            window.update()
+        elapsed = time.perf_counter() - started
+        frame.destroy()
+        return elapsed / records
+
+    original = messagebox.showinfo, messagebox.showerror
+    messagebox.showinfo = messagebox.showerror = modal_stand_in
+    try:
+        modal = run(inline=False)
+        inline = run(inline=True)
+    finally:
+        messagebox.showinfo, messagebox.showerror = original
+    window.destroy()
+    return {
+        "records": records,
+        "modal_overhead_ms_per_record": modal * 1000,
+        "inline_overhead_ms_per_record": inline * 1000,
+        "modal_records_per_minute": 60 / (typing_seconds + modal),
+        "inline_records_per_minute": 60 / (typing_seconds + inline),
+    }
+
+
+@benchmark
+def rapid_entry() -> dict[str, float]:
+    """Records per minute for a scripted keystroke stream, Tk events included.
+
+    Every character is sent to the focused widget with ``event_generate``.
+    Without rapid entry the script moves on with Tab (Tk's default binding)
+    and submits with ``invoke``, standing in for a mouse click. With rapid
+    entry it uses Enter and Ctrl+Enter and relies on the focus returning to
+    the first field. Feedback goes to the status banner in both modes. The
+    numbers show the cost of the software per record, not typing speed.
+    """
+
+    import tkinter
+
+    window = _tk_window()
+    if window is None:
+        return {"skipped_no_display": 1}
+    window.deiconify()
+    window.focus_force()
+    window.update()
+
+    records = 50
+    keysyms = {"@": "at", ".": "period", "-": "minus", " ": "space"}
+
+    def press(keysym: str, state: int = 0) -> None:
+        target = window.focus_get() or window
+        target.event_generate("<KeyPress>", keysym=keysym, state=state)
+
+    def run(rapid: bool) -> float:
+        frame = tkinter.Frame(window)
+        frame.pack()
+        variables = Formular.build_form_fields(frame)
+        comments_frame = Formular.build_comments_field(frame)
+        banner = Formular.StatusBanner(frame)
+
+        def submit() -> None:
+            Formular.handle_submit(variables, comments_frame, banner=banner)
+
+        if rapid:
+            Formular.RapidEntry(frame, variables, comments_frame, submit)
+        entries = Formular.RapidEntry._find_entries(frame, variables)
+        entries[0].focus_set()
+        window.update()
+        started = time.perf_counter()
+        for number in range(records):
+            values = ("Anna", "Mueller", f"anna{number}@example.org", "30")
+            for value in values:
+                for character in value:
+                    press(keysyms.get(character, character))
+                press("Return" if rapid else "Tab")
+            if rapid:
+                press("Return", state=4)  # 4 is the Control modifier
+            else:
+                submit()
+                entries[0].focus_set()
+            window.update()
+        elapsed = time.perf_counter() - started
+        frame.destroy()
+        return records / elapsed * 60
+
+    tab_and_click = run(rapid=False)
+    keyboard = run(rapid=True)
+    window.destroy()
+    return {
+        "records": records,
+        "tab_and_click_records_per_minute": tab_and_click,
+        "rapid_entry_records_per_minute": keyboard,
+    }
+
+
+def main(argv: list[str]) -> None:
+    """Run the benchmarks named in ``argv`` (or all of them) and print results.
+
+    ``--json PATH`` additionally writes every measurement to ``PATH`` (``-``
+    for standard output) so results can be stored and compared across runs.
+    """
+
+    json_path = None
+    if "--json" in argv:
+        position = argv.index("--json")
+        json_path = argv[position + 1]
+        argv = argv[:position] + argv[position + 2 :]
+
+    names = argv or list(BENCHMARKS)
+    collected: dict[str, dict[str, float]] = {}
+    for name in names:
+        results = BENCHMARKS[name]()
+        collected[name] = results
+        if json_path == "-":
+            continue
+        print(name)
+        for key, value in results.items():
+            formatted = f"{value:,.3f}" if isinstance(value, float) else f"{value:,}"
+            print(f"  {key:<28} {formatted}")
+
+    if json_path is not None:
+        import json
+        import platform
+
+        report = {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpu_count": os.cpu_count(),
+            "results": collected,
+        }
+        if json_path == "-":
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(json_path, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,3233 @@
+"""Data model, validation and storage of the registration form, without Tk.
+
+``Formular.py`` builds the window; everything in this module works without a
+display. Batch imports, worker processes and servers can therefore
+``import registrierung`` without loading Tkinter, and ``Formular`` imports the
+model, the rules and the stores from here.
+
+The sections are numbered like in ``Formular.py`` and continue its tutorial,
+so a reference such as "see section 13" means the same section in both files:
+
+2. Define a :class:`dataclass` for the form data and describe the fields in a
+   schema.
+6. Validation rules for single records.
+9. Validate large numbers of records without a GUI (batch mode).
+10. Validate whole columns at once with NumPy (optional).
+11. Store many records compactly in memory.
+12. Stream registrations from CSV and JSONL files.
+13. Persist submitted registrations in batches (SQLite).
+17. Detect duplicate submissions.
+21. Keep submissions safe while the backend is unreachable.
+22. Exchange registrations in a compact binary format.
+23. Archive registrations for fast random access.
+24. Validate huge imports on all CPU cores.
+25. Send registrations to a web server efficiently.
+27. Count submissions and measure latencies.
+"""
+
+from __future__ import annotations
+
+# Modules that only a few functions need (``numpy``, ``sqlite3``, ``gzip``,
+# ``mmap``, ``http.client`` and ``concurrent.futures``) are imported inside
+# those functions, so importing this module stays cheap. Python caches
+# imported modules, so repeating the import costs only a dictionary lookup.
+import csv
+import json
+import re
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from hashlib import blake2b
+from itertools import accumulate, chain, count, islice
+from math import log, log2
+from os import (
+    O_RDONLY,
+    SEEK_END,
+    PathLike,
+    close as os_close,
+    cpu_count,
+    fspath,
+    fsync,
+    listdir,
+    makedirs,
+    open as os_open,
+    remove as remove_file,
+    replace as replace_file,
+)
+from os.path import exists as path_exists, join as join_path
+from queue import Empty, SimpleQueue
+from threading import Event, Thread
+from time import monotonic, perf_counter, sleep, time
+from typing import TYPE_CHECKING, Any
+from zlib import crc32
+
+# Static type checkers still need the names of the lazily imported modules for
+# annotations; this block is only evaluated by them, never at run time.
+if TYPE_CHECKING:
+    import sqlite3
+    from concurrent.futures import Future
+
+
+# 2. Define a dataclass to hold the submitted form data --------------------------
+@dataclass
+class RegistrationData:
+    """Simple container for the form data.
+
+    Each attribute mirrors a single form input. Because the fields are type
+    annotated, editors can offer auto-completion and static analysis tools can
+    detect type mismatches early.
+    """
+
+    first_name: str
+    last_name: str
+    email: str
+    age: int
+    comments: str
+
+
+# The form itself is described declaratively: one ``FieldSpec`` per input. The
+# widgets (section 4, in ``Formular.py``) and the validator (section 6) are both
+# generated from this description, so adding a field means adding one line here.
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Description of one form field.
+
+    ``name`` is the attribute/record key, ``label`` the German text shown next
+    to the widget. ``kind`` selects the widget and the built-in check:
+    ``"text"``, ``"email"``, ``"integer"`` (a positive whole number) or
+    ``"multiline"``. ``validators`` are extra checks that receive the stripped
+    text and return an error message, or ``None`` when the value is fine.
+    """
+
+    name: str
+    label: str
+    kind: str = "text"
+    required: bool = True
+    validators: tuple[Callable[[str], str | None], ...] = ()
+
+
+@dataclass(frozen=True)
+class FormSchema:
+    """An ordered collection of :class:`FieldSpec` objects."""
+
+    fields: tuple[FieldSpec, ...]
+
+    @cached_property
+    def validator(self) -> SchemaValidator:
+        """The compiled validator; built on first use and then reused."""
+
+        return SchemaValidator(self.fields)
+
+    @cached_property
+    def entry_fields(self) -> tuple[FieldSpec, ...]:
+        """Fields shown as single-line ``Entry`` widgets, in form order."""
+
+        return tuple(field for field in self.fields if field.kind != "multiline")
+
+
+REGISTRATION_SCHEMA = FormSchema(
+    (
+        FieldSpec("first_name", "Vorname"),
+        FieldSpec("last_name", "Nachname"),
+        FieldSpec("email", "E-Mail", kind="email"),
+        FieldSpec("age", "Alter", kind="integer"),
+        FieldSpec("comments", "Kommentare", kind="multiline", required=False),
+    )
+)
+
+
+# 6. Validation rules ----------------------------------------------------------
+# Machine-readable codes for every rule. The human-readable German messages are
+# what the user sees; the codes let headless callers (batch imports, reports)
+# group failures without parsing message strings.
+ERROR_MISSING_FIELDS = "missing_fields"
+ERROR_INVALID_EMAIL = "invalid_email"
+ERROR_INVALID_AGE = "invalid_age"
+ERROR_INVALID_VALUE = "invalid_value"
+# Only produced by file imports (section 12): the line is not a JSON object.
+ERROR_MALFORMED_RECORD = "malformed_record"
+
+ERROR_MESSAGES: dict[str, str] = {
+    ERROR_MISSING_FIELDS: "Bitte füllen Sie alle Pflichtfelder aus.",
+    ERROR_INVALID_EMAIL: "Bitte geben Sie eine gültige E-Mail-Adresse ein.",
+    ERROR_INVALID_AGE: "Alter muss eine positive Zahl sein.",
+    ERROR_INVALID_VALUE: "Bitte überprüfen Sie Ihre Eingaben.",
+    ERROR_MALFORMED_RECORD: "Die Zeile ist kein gültiger Datensatz.",
+}
+
+
+class ValidationError(ValueError):
+    """``ValueError`` that additionally remembers *which* rule failed.
+
+    Subclassing ``ValueError`` means existing ``except ValueError`` blocks
+    (such as the one in :func:`handle_submit`) keep working unchanged.
+    """
+
+    def __init__(
+        self, code: str, message: str | None = None, field: str | None = None
+    ) -> None:
+        super().__init__(ERROR_MESSAGES[code] if message is None else message)
+        self.code = code
+        # Label of the offending field, when the check knows it.
+        self.field = field
+
+
+# E-mail addresses are checked against a simplified version of the RFC 5322
+# "addr-spec" grammar: a dot-separated local part, an "@" and a domain made of
+# dot-separated labels ending in an alphabetic top-level domain. Quoted local
+# parts, comments and IP-address domains are deliberately not supported.
+# Compiling the patterns once at import time means each check is a single call
+# into the C regex engine. The look-aheads enforce the length limits from
+# RFC 5321: at most 254 characters in total and at most 64 before the "@".
+_EMAIL_LIMITS = r"(?=.{3,254}$)(?=[^@]{1,64}@)"
+
+# Nearly all addresses are plain ASCII, and explicit ASCII character classes
+# are considerably faster to match than their Unicode-aware equivalents.
+_EMAIL_ASCII_ATOM = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+EMAIL_PATTERN = re.compile(
+    rf"{_EMAIL_LIMITS}{_EMAIL_ASCII_ATOM}(?:\.{_EMAIL_ASCII_ATOM})*"
+    r"@(?:[A-Za-z0-9]+(?:-+[A-Za-z0-9]+)*\.)+(?:[A-Za-z]{2,63}|xn--[A-Za-z0-9-]{1,59})"
+)
+
+# Internationalised addresses (RFC 6531) may use letters from any script.
+# ``[^\W_]`` means "a letter or digit" in Unicode-aware patterns.
+EMAIL_PATTERN_UNICODE = re.compile(
+    _EMAIL_LIMITS + r"[\w!#$%&'*+/=?^`{|}~-]+(?:\.[\w!#$%&'*+/=?^`{|}~-]+)*"
+    r"@(?:[^\W_]+(?:-+[^\W_]+)*\.)+(?:[^\W\d_]{2,63}|xn--[A-Za-z0-9-]{1,59})"
+)
+
+
+def match_email(email: str) -> bool:
+    """Return ``True`` when ``email`` follows the e-mail grammar (uncached).
+
+    Bulk code calls this directly: with millions of distinct addresses a cache
+    would only add overhead. Interactive code uses :func:`is_valid_email`.
+    """
+
+    if EMAIL_PATTERN.fullmatch(email) is not None:
+        return True
+    return not email.isascii() and EMAIL_PATTERN_UNICODE.fullmatch(email) is not None
+
+
+@lru_cache(maxsize=4096)
+def is_valid_email(email: str) -> bool:
+    """Cached :func:`match_email` for interactive callers.
+
+    Live validation and the submit button ask about the same few addresses
+    over and over, so remembering recent verdicts makes repeats nearly free.
+    """
+
+    return match_email(email)
+
+
+@lru_cache(maxsize=4096)
+def normalize_email(email: str) -> str:
+    """Return ``email`` with a lower-case, ASCII (IDNA) domain part.
+
+    The local part is left untouched because RFC 5321 allows mail servers to
+    treat it case-sensitively. Internationalised domains such as
+    ``bücher.de`` become their ``xn--`` form so equal addresses compare equal.
+    Raises :class:`ValidationError` when the domain cannot be encoded.
+    """
+
+    local, _at, domain = email.rpartition("@")
+    if domain.isascii():
+        # Plain ASCII domains only need lower-casing; the IDNA codec is slow.
+        return f"{local}@{domain.lower()}"
+    try:
+        domain = domain.encode("idna").decode("ascii").lower()
+    except UnicodeError as exc:
+        raise ValidationError(ERROR_INVALID_EMAIL) from exc
+    return f"{local}@{domain}"
+
+
+def validate_record(
+    first_name: str,
+    last_name: str,
+    email: str,
+    age_text: str,
+    comments: str = "",
+) -> RegistrationData:
+    """Validate already stripped plain strings and build a record.
+
+    The rules are those of :data:`REGISTRATION_SCHEMA`, applied by its
+    compiled validator, exactly as :func:`parse_form_data` does for the
+    widgets. Because it only receives strings it can be reused anywhere: in
+    tests or in scripts.
+    """
+
+    values = (first_name, last_name, email, age_text, comments)
+    return RegistrationData(*REGISTRATION_SCHEMA.validator(values))
+
+
+class SchemaValidator:
+    """Validator compiled from the fields of a :class:`FormSchema`.
+
+    Compiling turns every field into a ``(position, converter, ...)`` tuple
+    once, so validating a record is a single pass over plain tuples: values
+    are addressed by position, never looked up by their label. Errors are
+    reported with the same precedence as :func:`validate_record`: a missing
+    required value wins over any other problem, otherwise the first failing
+    field in form order is reported.
+    """
+
+    def __init__(self, fields: Sequence[FieldSpec]) -> None:
+        converters = {
+            "text": None,
+            "multiline": None,
+            "email": _convert_email,
+            "integer": _convert_positive_int,
+        }
+        self.names = tuple(field.name for field in fields)
+        self._steps: tuple[tuple[Any, ...], ...] = tuple(
+            (
+                position,
+                field.required,
+                converters[field.kind],
+                field.validators,
+                field.label,
+            )
+            for position, field in enumerate(fields)
+        )
+        self._steps_by_label = {step[4]: step for step in self._steps}
+
+    def __call__(self, values: Sequence[str]) -> list[Any]:
+        """Validate stripped ``values`` given in field order.
+
+        Returns the converted values (``int`` for integer fields, ``None`` for
+        empty optional integer fields) or raises :class:`ValidationError`.
+        """
+
+        if len(values) != len(self._steps):
+            raise ValueError(
+                f"{len(self._steps)} Werte erwartet, {len(values)} erhalten."
+            )
+        result = list(values)
+        first_error: ValidationError | None = None
+        for position, required, convert, validators, label in self._steps:
+            value = values[position]
+            if not value:
+                if required:
+                    raise ValidationError(ERROR_MISSING_FIELDS, field=label)
+                if convert is _convert_positive_int:
+                    result[position] = None
+                continue
+            if first_error is not None:
+                # Only a missing field could still change the outcome.
+                continue
+            # Same steps as ``_apply_rules``, written out because this loop
+            # runs for every field of every submission.
+            try:
+                if convert is not None:
+                    result[position] = convert(value, label)
+                for check in validators:
+                    message = check(value)
+                    if message is not None:
+                        raise ValidationError(ERROR_INVALID_VALUE, message, label)
+            except ValidationError as error:
+                first_error = error
+        if first_error is not None:
+            raise first_error
+        return result
+
+    def check(self, label: str, value: str) -> ValidationError | None:
+        """Check a single stripped ``value`` of the field labelled ``label``.
+
+        Returns the problem, or ``None`` when the value is fine. Empty values
+        and unknown labels are always fine: the "required" rule only makes
+        sense for the whole record (see section 16 in ``Formular.py``).
+        """
+
+        step = self._steps_by_label.get(label)
+        if step is None or not value:
+            return None
+        _position, _required, convert, validators, label = step
+        try:
+            _apply_rules(convert, validators, value, label)
+        except ValidationError as error:
+            return error
+        return None
+
+
+def _apply_rules(
+    convert: Callable[[str, str], Any] | None,
+    validators: tuple[Callable[[str], str | None], ...],
+    value: str,
+    label: str,
+) -> Any:
+    """Convert a non-empty ``value`` and run the extra checks; may raise."""
+
+    converted = value if convert is None else convert(value, label)
+    for check in validators:
+        message = check(value)
+        if message is not None:
+            raise ValidationError(ERROR_INVALID_VALUE, message, label)
+    return converted
+
+
+def _convert_email(value: str, label: str) -> str:
+    if not is_valid_email(value):
+        raise ValidationError(ERROR_INVALID_EMAIL, field=label)
+    return value
+
+
+def _convert_positive_int(value: str, label: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise ValidationError(
+            ERROR_INVALID_AGE, f"{label} muss eine positive Zahl sein.", label
+        )
+    return number
+
+
+# 9. Validate records without a GUI (batch mode) ---------------------------------
+# The GUI validates one record at a time. Historical data, however, arrives as
+# millions of rows. The helpers below apply exactly the same rules as
+# ``validate_record`` but are written for throughput: no exceptions on the hot
+# path, local variable aliases and chunked processing so memory stays bounded.
+
+# Order of the values when a record is passed as a tuple/list. It mirrors the
+# field order of ``RegistrationData``.
+RECORD_FIELDS = tuple(field.name for field in REGISTRATION_SCHEMA.fields)
+
+# For speed, ``validate_chunk`` and ``validate_columns`` (section 10) spell out
+# the rules of the registration fields instead of reading them from the
+# schema. This flag records whether they still describe the schema. When a
+# field or rule is added there, ``validate_chunk`` uses the schema's
+# validator instead (slower, but correct) until the fast path is updated.
+_FAST_PATH_RULES = (
+    ("first_name", "text", True, ()),
+    ("last_name", "text", True, ()),
+    ("email", "email", True, ()),
+    ("age", "integer", True, ()),
+    ("comments", "multiline", False, ()),
+)
+_FAST_PATH_MATCHES_SCHEMA = _FAST_PATH_RULES == tuple(
+    (field.name, field.kind, field.required, field.validators)
+    for field in REGISTRATION_SCHEMA.fields
+)
+
+# How many records ``validate_records`` collects before yielding a result.
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+@dataclass
+class RecordError:
+    """Describes why a single input record was rejected.
+
+    ``index`` is the zero-based position of the record in the input iterable,
+    so callers can map the error back to a line number or database row.
+    """
+
+    index: int
+    code: str
+    message: str
+
+
+@dataclass
+class BatchResult:
+    """Outcome of validating one chunk of records.
+
+    ``start`` is the index of the first record in the chunk and ``count`` the
+    number of input records that were looked at, so ``valid`` and ``errors``
+    together always add up to ``count``.
+    """
+
+    start: int
+    count: int
+    valid: list[RegistrationData]
+    errors: list[RecordError]
+
+
+def validate_chunk(records: Iterable[Any], start: int = 0) -> BatchResult:
+    """Validate a finite group of records in one tight loop.
+
+    Each record may be a ``dict`` keyed by :data:`RECORD_FIELDS` (``comments``
+    is optional) or a tuple/list in the same order. ``age`` may be text or an
+    ``int``. Values are stripped just like :func:`parse_form_data` does.
+    Missing keys, ``None`` and absent trailing fields count as empty, so such
+    records are reported as missing fields instead of aborting the chunk.
+    """
+
+    if not _FAST_PATH_MATCHES_SCHEMA:
+        return _validate_chunk_with_schema(records, start)
+
+    # Binding globals and methods to local names avoids repeated dictionary
+    # lookups inside the loop, which is measurable at millions of iterations.
+    make_record = RegistrationData
+    messages = ERROR_MESSAGES
+    email_ok = match_email
+    valid: list[RegistrationData] = []
+    errors: list[RecordError] = []
+    append_valid = valid.append
+    append_error = errors.append
+
+    for index, record in enumerate(records, start):
+        # Complete records of strings take the straight path. Since Python
+        # 3.11 a ``try`` block costs nothing until it fires, so the rare
+        # incomplete record pays for the fallbacks alone.
+        if type(record) is dict:
+            try:
+                first_name = record["first_name"]
+                last_name = record["last_name"]
+                email = record["email"]
+                age_value = record["age"]
+            except KeyError:
+                get = record.get
+                first_name = get("first_name")
+                last_name = get("last_name")
+                email = get("email")
+                age_value = get("age")
+            comments = record.get("comments", "")
+        else:
+            try:
+                first_name, last_name, email, age_value, *rest = record
+            except ValueError:
+                first_name, last_name, email, age_value = [*record, "", "", "", ""][:4]
+                rest = []
+            comments = rest[0] if rest else ""
+
+        try:
+            first_name = first_name.strip()
+            last_name = last_name.strip()
+            email = email.strip()
+            comments = comments.strip()
+        except AttributeError:
+            first_name = _field_text(first_name)
+            last_name = _field_text(last_name)
+            email = _field_text(email)
+            comments = _field_text(comments)
+        if type(age_value) is str:
+            age_text = age_value.strip()
+        else:
+            age_text = _field_text(age_value)
+
+        if not (first_name and last_name and email and age_text):
+            code = ERROR_MISSING_FIELDS
+        elif not email_ok(email):
+            code = ERROR_INVALID_EMAIL
+        else:
+            # Plain ASCII digits cover almost every real record and can be
+            # converted without the cost of setting up a ``try`` block that
+            # actually fires. Anything else goes through ``int`` just like
+            # ``validate_record`` so the accepted inputs stay identical.
+            if age_text.isascii() and age_text.isdigit():
+                age = int(age_text)
+            else:
+                try:
+                    age = int(age_text)
+                except ValueError:
+                    age = 0
+            if age > 0:
+                append_valid(make_record(first_name, last_name, email, age, comments))
+                continue
+            code = ERROR_INVALID_AGE
+        append_error(RecordError(index, code, messages[code]))
+
+    count = len(valid) + len(errors)
+    return BatchResult(start=start, count=count, valid=valid, errors=errors)
+
+
+def _validate_chunk_with_schema(records: Iterable[Any], start: int) -> BatchResult:
+    """``validate_chunk`` for any :data:`REGISTRATION_SCHEMA`, record by record."""
+
+    validator = REGISTRATION_SCHEMA.validator
+    names = validator.names
+    valid: list[RegistrationData] = []
+    errors: list[RecordError] = []
+    for index, record in enumerate(records, start):
+        if type(record) is dict:
+            raw = [record.get(name, "") for name in names]
+        else:
+            raw = list(record) + [""] * (len(names) - len(record))
+        values = [_field_text(value) for value in raw]
+        try:
+            valid.append(RegistrationData(*validator(values)))
+        except ValidationError as error:
+            errors.append(RecordError(index, error.code, str(error)))
+    return BatchResult(start, len(valid) + len(errors), valid, errors)
+
+
+def validate_records(
+    records: Iterable[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[BatchResult]:
+    """Lazily validate an arbitrarily large iterable in chunks.
+
+    Only one chunk is held in memory at a time, so this works for inputs that
+    do not fit into RAM (for example a generator reading from a file).
+    """
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size muss größer als 0 sein.")
+
+    iterator = iter(records)
+    start = 0
+    while True:
+        # ``islice`` pulls at most ``chunk_size`` items from the iterator
+        # without materialising the remainder of the input.
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield validate_chunk(chunk, start)
+        start += len(chunk)
+
+
+# 10. Validate whole columns at once (optional NumPy mode) -----------------------
+# Partner dumps often arrive column by column (one array per field). Instead of
+# looping over rows in Python we can ask NumPy to apply each rule to an entire
+# column in one call. NumPy is an *optional* dependency: it is imported inside
+# the function so the rest of this module works without it.
+
+# Integer error codes used in the ``error_codes`` array. Index ``n`` of
+# ``COLUMN_ERROR_CODES`` gives the matching string code from section 6.
+COLUMN_OK = 0
+COLUMN_MISSING_FIELDS = 1
+COLUMN_INVALID_EMAIL = 2
+COLUMN_INVALID_AGE = 3
+COLUMN_ERROR_CODES = (
+    None,
+    ERROR_MISSING_FIELDS,
+    ERROR_INVALID_EMAIL,
+    ERROR_INVALID_AGE,
+)
+
+# Ages with more digits than this might not fit into a 64-bit integer. They are
+# parsed one by one with Python's ``int`` instead of the bulk conversion.
+_MAX_FAST_AGE_DIGITS = 18
+
+
+@dataclass
+class ColumnValidation:
+    """Result of :func:`validate_columns`.
+
+    All arrays have one entry per input row. ``valid`` is a boolean mask,
+    ``error_codes`` holds one of the ``COLUMN_*`` constants and ``ages`` the
+    parsed age (``0`` where the row is invalid). The stripped text columns are
+    kept so valid rows can be turned into ``RegistrationData`` later on.
+    """
+
+    valid: Any
+    error_codes: Any
+    ages: Any
+    first_name: Any
+    last_name: Any
+    email: Any
+    comments: Any
+
+    def records(self) -> Iterator[RegistrationData]:
+        """Yield a ``RegistrationData`` instance for every valid row."""
+
+        for row in self.valid.nonzero()[0].tolist():
+            yield RegistrationData(
+                first_name=str(self.first_name[row]),
+                last_name=str(self.last_name[row]),
+                email=str(self.email[row]),
+                age=int(self.ages[row]),
+                comments=str(self.comments[row]),
+            )
+
+    def errors(self) -> list[RecordError]:
+        """Convert the invalid rows into the same structure batch mode uses."""
+
+        invalid = ~self.valid
+        errors = []
+        for row, number in zip(
+            invalid.nonzero()[0].tolist(), self.error_codes[invalid].tolist()
+        ):
+            code = COLUMN_ERROR_CODES[number]
+            errors.append(RecordError(row, code, ERROR_MESSAGES[code]))
+        return errors
+
+
+def _parse_ascii_digits(np: Any, column: Any) -> tuple[Any, Any]:
+    """Convert a column of ASCII digit strings to ``int64`` in bulk.
+
+    NumPy stores ``str`` arrays as fixed-width UTF-32, so viewing the buffer as
+    ``uint32`` gives one code point per character (``0`` for padding). We can
+    then build the numbers column by column with plain integer arithmetic,
+    which is much faster than ``astype(np.int64)``. Returns the parsed values
+    and a mask of the rows that could be handled this way.
+    """
+
+    rows = column.shape[0]
+    width = column.dtype.itemsize // 4
+    ages = np.zeros(rows, dtype=np.int64)
+    if rows == 0 or width == 0:
+        return ages, np.zeros(rows, dtype=bool)
+
+    codes = np.ascontiguousarray(column).view(np.uint32).reshape(rows, width)
+    digits = codes.astype(np.int64) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
+    is_padding = codes == 0
+    fast = (is_digit | is_padding).all(axis=1) & is_digit[:, 0]
+    if width > _MAX_FAST_AGE_DIGITS:
+        fast &= is_padding[:, _MAX_FAST_AGE_DIGITS]
+        width = _MAX_FAST_AGE_DIGITS
+
+    for position in range(width):
+        present = is_digit[:, position]
+        ages = np.where(present, ages * 10 + digits[:, position], ages)
+    ages[~fast] = 0
+    return ages, fast
+
+
+# The ASCII e-mail grammar expressed as array operations. Every character is
+# first mapped to a class code with a lookup table; most rules then become a
+# per-character "is this wrong here?" flag that is combined per row. Rows are
+# processed in blocks so the temporary matrices stay small for large inputs.
+_EMAIL_BLOCK_ROWS = 4_096
+_CHAR_ALPHA = 1
+_CHAR_DIGIT = 2
+_CHAR_SPECIAL = 4  # allowed in the local part only
+_CHAR_DOT = 8
+_CHAR_HYPHEN = 16  # allowed in both parts
+_CHAR_AT = 32
+_CHAR_INVALID = 64  # any other ASCII character
+_CHAR_WIDE = 128  # non-ASCII; such rows are left to the regex
+
+
+def _email_char_classes() -> list[int]:
+    # Index 128 stands for every non-ASCII code point (see ``mode="clip"``).
+    table = [_CHAR_INVALID] * 129
+    table[0] = 0  # padding after the end of the string
+    table[128] = _CHAR_WIDE
+    for char in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz":
+        table[ord(char)] = _CHAR_ALPHA
+    for char in "0123456789":
+        table[ord(char)] = _CHAR_DIGIT
+    for char in "!#$%&'*+/=?^_`{|}~":
+        table[ord(char)] = _CHAR_SPECIAL
+    table[ord(".")] = _CHAR_DOT
+    table[ord("-")] = _CHAR_HYPHEN
+    table[ord("@")] = _CHAR_AT
+    return table
+
+
+_EMAIL_CHAR_CLASSES = _email_char_classes()
+
+
+def _rows_any(np: Any, flags: Any) -> Any:
+    """Fast ``flags.any(axis=1)`` for boolean matrices whose width is a multiple of 8.
+
+    Reducing along short rows is slow in NumPy, so eight flags at a time are
+    reinterpreted as one 64-bit word and the few words per row are OR-ed
+    together column by column.
+    """
+
+    words = flags.view(np.uint64)
+    result = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        result |= words[:, column]
+    return result != 0
+
+
+def _match_emails_ascii(np: Any, strings: Any, column: Any) -> tuple[Any, Any]:
+    """Vectorised equivalent of ``EMAIL_PATTERN`` for ASCII-only rows.
+
+    Works on the UTF-32 code points like :func:`_parse_ascii_digits`. Returns
+    the verdicts and a mask of rows that were decided here; rows with
+    non-ASCII characters are left for :func:`match_email`.
+    """
+
+    rows = column.shape[0]
+    width = column.dtype.itemsize // 4
+    valid = np.zeros(rows, dtype=bool)
+    decided = np.ones(rows, dtype=bool)
+    if width < 3:
+        # Too short to be an address, whatever the characters are.
+        return valid, decided
+
+    # Positions come from the string ufuncs, which scan each string in C.
+    length = strings.str_len(column)
+    at = strings.find(column, "@")
+    at_count = strings.count(column, "@")
+    last_dot = strings.rfind(column, ".")
+
+    table = np.asarray(_EMAIL_CHAR_CLASSES, dtype=np.uint8)
+    codes_all = np.ascontiguousarray(column).view(np.uint32).reshape(rows, width)
+    padded_width = -(-width // 8) * 8
+    positions = np.arange(padded_width)
+    xn_prefix = np.asarray([ord(char) for char in "xn--"], dtype=np.uint32)
+    alnum = _CHAR_ALPHA | _CHAR_DIGIT
+
+    for first in range(0, rows, _EMAIL_BLOCK_ROWS):
+        block = slice(first, first + _EMAIL_BLOCK_ROWS)
+        count = len(range(rows)[block])
+        row_index = np.arange(count)
+        codes = np.zeros((count, padded_width), dtype=np.uint32)
+        codes[:, :width] = codes_all[block]
+        classes = np.take(table, codes, mode="clip")
+        block_at = at[block]
+        block_dot = last_dot[block]
+        block_length = length[block]
+
+        is_dot = classes == _CHAR_DOT
+        is_hyphen = classes == _CHAR_HYPHEN
+        after = positions > block_at[:, None]
+
+        # Characters that are wrong wherever they appear, specials in the
+        # domain, ".." anywhere and "-" next to "." inside the domain.
+        bad = (classes & (_CHAR_INVALID | _CHAR_WIDE)) != 0
+        bad |= (classes == _CHAR_SPECIAL) & after
+        bad[:, 1:] |= is_dot[:, :-1] & is_dot[:, 1:]
+        hyphen_dot = is_hyphen[:, :-1] & is_dot[:, 1:]
+        hyphen_dot |= is_dot[:, :-1] & is_hyphen[:, 1:]
+        bad[:, 1:] |= hyphen_dot & after[:, 1:]
+        ok = ~_rows_any(np, bad)
+
+        # Exactly one "@" with 1..64 characters in front of it, no dot at the
+        # start or right before the "@", and a letter or digit right after it.
+        ok &= (at_count[block] == 1) & (block_at >= 1) & (block_at <= 64)
+        ok &= (block_length >= 3) & (block_length <= 254)
+        ok &= ~is_dot[:, 0] & ~is_dot[row_index, np.maximum(block_at - 1, 0)]
+        ok &= (classes[row_index, np.minimum(block_at + 1, width - 1)] & alnum) != 0
+
+        # Top-level domain: everything after the last dot, which must lie in
+        # the domain. Either 2..63 letters or an IDNA "xn--" label of 5..63
+        # characters (its other characters were already checked above).
+        tld_length = block_length - block_dot - 1
+        ok &= (block_dot > block_at) & (tld_length <= 63)
+        in_tld = (positions > block_dot[:, None]) & (positions < block_length[:, None])
+        alpha_tld = ~_rows_any(np, (classes != _CHAR_ALPHA) & in_tld)
+        alpha_tld &= tld_length >= 2
+        start = np.minimum(block_dot[:, None] + 1 + np.arange(4), width - 1)
+        punycode_tld = (codes[row_index[:, None], start] == xn_prefix).all(axis=1)
+        ok &= alpha_tld | (punycode_tld & (tld_length >= 5))
+
+        wide = _rows_any(np, classes == _CHAR_WIDE)
+        valid[block] = ok & ~wide
+        decided[block] = ~wide
+    return valid, decided
+
+
+def validate_columns(
+    first_name: Iterable[str],
+    last_name: Iterable[str],
+    email: Iterable[str],
+    age_text: Iterable[str],
+    comments: Iterable[str] | None = None,
+) -> ColumnValidation:
+    """Apply the rules of :func:`validate_record` to whole columns.
+
+    Every argument is a sequence (or NumPy array) of strings with the same
+    length. ``comments`` may be omitted. Ages that do not fit into a 64-bit
+    integer are reported as invalid. Raises ``ImportError`` when NumPy is not
+    installed, and ``NotImplementedError`` when :data:`REGISTRATION_SCHEMA`
+    has rules that these column checks do not know (see section 9).
+    """
+
+    if not _FAST_PATH_MATCHES_SCHEMA:
+        raise NotImplementedError(
+            "validate_columns kennt nur die Standardfelder; "
+            "bitte validate_records verwenden."
+        )
+
+    import numpy as np
+
+    # NumPy 2 ships fast string ufuncs in ``numpy.strings``; older versions
+    # only have the slower ``numpy.char`` helpers with the same names.
+    strings = getattr(np, "strings", np.char)
+
+    first = strings.strip(np.asarray(first_name, dtype=str))
+    last = strings.strip(np.asarray(last_name, dtype=str))
+    mail = strings.strip(np.asarray(email, dtype=str))
+    age_column = strings.strip(np.asarray(age_text, dtype=str))
+    if comments is None:
+        notes = np.full(first.shape, "", dtype=str)
+    else:
+        notes = strings.strip(np.asarray(comments, dtype=str))
+
+    # Rule 1: required fields. ``str_len`` returns 0 for empty strings.
+    missing = (
+        (strings.str_len(first) == 0)
+        | (strings.str_len(last) == 0)
+        | (strings.str_len(mail) == 0)
+        | (strings.str_len(age_column) == 0)
+    )
+
+    # Rule 2: the e-mail grammar from section 6. ASCII addresses are checked
+    # with array operations; the rare non-ASCII ones go through the regex.
+    email_ok, decided = _match_emails_ascii(np, strings, mail)
+    undecided = (~decided & ~missing).nonzero()[0]
+    if undecided.size:
+        email_ok[undecided] = np.fromiter(
+            map(match_email, mail[undecided].tolist()),
+            dtype=bool,
+            count=undecided.size,
+        )
+    bad_email = ~email_ok
+
+    # Rule 3: positive whole number. Plain ASCII digits are converted in bulk;
+    # everything else (signs, underscores, other scripts, very long numbers)
+    # falls back to Python's ``int`` so the accepted inputs stay identical.
+    ages, fast = _parse_ascii_digits(np, age_column)
+    slow_rows = (~fast & ~missing).nonzero()[0]
+    for row in slow_rows.tolist():
+        try:
+            value = int(age_column[row])
+        except ValueError:
+            continue
+        if 0 < value <= np.iinfo(np.int64).max:
+            ages[row] = value
+    bad_age = ages <= 0
+
+    # Combine the masks in rule order so each row reports the *first* failing
+    # rule, exactly like the sequential checks in ``validate_record``.
+    error_codes = np.select(
+        [missing, bad_email, bad_age],
+        [COLUMN_MISSING_FIELDS, COLUMN_INVALID_EMAIL, COLUMN_INVALID_AGE],
+        default=COLUMN_OK,
+    ).astype(np.int8)
+    valid = error_codes == COLUMN_OK
+    ages[~valid] = 0
+
+    return ColumnValidation(
+        valid=valid,
+        error_codes=error_codes,
+        ages=ages,
+        first_name=first,
+        last_name=last,
+        email=mail,
+        comments=notes,
+    )
+
+
+# 11. Store many records compactly ----------------------------------------------
+# A regular dataclass instance keeps its attributes in a per-instance ``__dict__``
+# which costs a lot of memory when millions of records are held at once. Two
+# cheaper alternatives follow: a ``__slots__`` dataclass (fixed attribute
+# storage, no ``__dict__``) and a column-wise table that stores each field in
+# its own list or ``array``.
+
+
+@dataclass(slots=True)
+class SlottedRegistrationData:
+    """Drop-in replacement for :class:`RegistrationData` without ``__dict__``.
+
+    ``slots=True`` (Python 3.10+) makes the dataclass reserve exactly one slot
+    per field. New attributes can no longer be added at runtime, which is the
+    price for the smaller footprint.
+    """
+
+    first_name: str
+    last_name: str
+    email: str
+    age: int
+    comments: str
+
+
+class RegistrationRow:
+    """Read-only view of one row of a :class:`RegistrationTable`.
+
+    The view only remembers the table and the row number; the attribute
+    properties fetch the values from the table's columns on access. Creating a
+    view is therefore cheap, and no data is copied until :meth:`to_data` is
+    called.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: RegistrationTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    @property
+    def first_name(self) -> str:
+        return self._table._first_names[self._index]
+
+    @property
+    def last_name(self) -> str:
+        return self._table._last_names[self._index]
+
+    @property
+    def email(self) -> str:
+        return self._table._emails[self._index]
+
+    @property
+    def age(self) -> int:
+        return self._table._ages[self._index]
+
+    @property
+    def comments(self) -> str:
+        return self._table._comments[self._index]
+
+    def to_data(self) -> RegistrationData:
+        """Copy the row into a standalone ``RegistrationData`` instance."""
+
+        return RegistrationData(
+            first_name=self.first_name,
+            last_name=self.last_name,
+            email=self.email,
+            age=self.age,
+            comments=self.comments,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        # Rows compare equal to any object with the same five field values,
+        # including ``RegistrationData`` instances.
+        try:
+            return all(
+                getattr(self, name) == getattr(other, name) for name in RECORD_FIELDS
+            )
+        except AttributeError:
+            return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]  # mutable table, like a dataclass
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in RECORD_FIELDS)
+        return f"RegistrationRow({values})"
+
+
+class RegistrationTable:
+    """Column-wise container for many registrations.
+
+    Names are passed through ``sys.intern`` so repeated values (common first
+    names) share a single string object. E-mail addresses and comments are
+    nearly always unique, so interning them would only grow the interpreter's
+    intern table. Ages live in an ``array('q')`` which needs 8
+    bytes per entry instead of a pointer to a full ``int`` object.
+    """
+
+    def __init__(self, records: Iterable[Any] = ()) -> None:
+        self._first_names: list[str] = []
+        self._last_names: list[str] = []
+        self._emails: list[str] = []
+        self._ages = array("q")
+        self._comments: list[str] = []
+        self.extend(records)
+
+    def append(self, record: Any) -> None:
+        """Add one record (anything with the five ``RegistrationData`` fields)."""
+
+        # Everything that can fail runs before the first column grows, because
+        # a half-appended record would shift all later rows. ``array('q')``
+        # rejects ages outside 64 bits with ``OverflowError``, so it goes first.
+        first_name = sys.intern(record.first_name)
+        last_name = sys.intern(record.last_name)
+        self._ages.append(record.age)
+        self._first_names.append(first_name)
+        self._last_names.append(last_name)
+        self._emails.append(record.email)
+        self._comments.append(record.comments)
+
+    def extend(self, records: Iterable[Any]) -> None:
+        """Add many records; accepts any iterable, including generators."""
+
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self._ages)
+
+    def __getitem__(self, index: int) -> RegistrationRow:
+        # Normalise negative indexes and reject out-of-range ones up front so
+        # the view never points at a row that does not exist.
+        length = len(self._ages)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("RegistrationTable index out of range")
+        return RegistrationRow(self, index)
+
+    def __iter__(self) -> Iterator[RegistrationRow]:
+        for index in range(len(self._ages)):
+            yield RegistrationRow(self, index)
+
+
+# 12. Stream registrations from CSV and JSONL files -----------------------------
+# Bulk exports can be several gigabytes large. Instead of reading a whole file
+# into a list we chain generators: every stage pulls one item at a time from
+# the previous one, so only the current chunk is ever held in memory.
+#
+#     reader  ->  normalizer  ->  validator (chunks)  ->  sink
+#
+# The reader turns lines into dictionaries, the normalizer applies the same
+# ``strip()`` logic as ``parse_form_data``, ``validate_records`` checks the
+# rules chunk by chunk and the sink receives the valid ``RegistrationData``.
+
+# Column headers may use the attribute names from ``RECORD_FIELDS`` or the
+# German labels shown in the form.
+COLUMN_ALIASES: dict[str, str] = {
+    "Vorname": "first_name",
+    "Nachname": "last_name",
+    "E-Mail": "email",
+    "Alter": "age",
+    "Kommentare": "comments",
+}
+
+
+@dataclass
+class ChunkReport:
+    """Progress information emitted after each imported chunk.
+
+    ``errors`` contains the rejected records of *this* chunk only, so the
+    report stays small no matter how large the input file is.
+    """
+
+    chunk: int
+    start: int
+    count: int
+    valid: int
+    errors: list[RecordError]
+    seconds: float
+
+    @property
+    def records_per_second(self) -> float:
+        return self.count / self.seconds if self.seconds else float("inf")
+
+
+# Separators tried when the delimiter of a CSV file is not given. Spreadsheet
+# programs with German settings export with ``;`` because ``,`` is the
+# decimal separator there.
+CSV_DELIMITERS = (",", ";", "\t")
+
+
+def read_csv_records(
+    lines: Iterable[str], delimiter: str | None = None
+) -> Iterator[dict[str, str]]:
+    """Yield one dictionary per CSV row; the first row holds the headers.
+
+    ``lines`` is anything that yields text lines, typically a file opened with
+    ``newline=""`` as the ``csv`` documentation recommends. Without a
+    ``delimiter`` the one of :data:`CSV_DELIMITERS` that occurs most often in
+    the header line is used.
+    """
+
+    lines = iter(lines)
+    first_line = next(lines, None)
+    if first_line is None:
+        return
+    if delimiter is None:
+        delimiter = max(CSV_DELIMITERS, key=first_line.count)
+    reader = csv.reader(chain((first_line,), lines), delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    keys = [COLUMN_ALIASES.get(name.strip(), name.strip()) for name in header]
+    for row in reader:
+        yield dict(zip(keys, row))
+
+
+def read_jsonl_records(
+    lines: Iterable[str], malformed: list[int] | None = None
+) -> Iterator[dict[str, Any]]:
+    """Yield one dictionary per non-empty JSON line.
+
+    A line that is not a JSON object raises ``ValueError``, unless a
+    ``malformed`` list is given: then the line's record position is appended
+    to it and an empty record is yielded instead, so the records after it
+    keep their positions.
+    """
+
+    decode = json.loads
+    position = 0
+    for line in lines:
+        if line.strip():
+            try:
+                record = decode(line)
+                items = record.items()
+            except (ValueError, AttributeError):
+                if malformed is None:
+                    raise ValueError(
+                        f"Datensatz {position} ist kein gültiges JSON-Objekt."
+                    ) from None
+                malformed.append(position)
+                items = ()
+            position += 1
+            yield {COLUMN_ALIASES.get(key, key): value for key, value in items}
+
+
+def _field_text(value: Any) -> str:
+    """Stripped text of one raw field; ``None`` (a missing value) becomes ``""``."""
+
+    if type(value) is str:
+        return value.strip()
+    return "" if value is None else str(value).strip()
+
+
+def normalize_records(records: Iterable[dict[str, Any]]) -> Iterator[tuple[str, ...]]:
+    """Turn raw dictionaries into stripped tuples in ``RECORD_FIELDS`` order.
+
+    Missing keys and ``None`` become empty strings so that the validator
+    reports them as missing fields instead of crashing with ``KeyError``.
+    """
+
+    text = _field_text
+    # Spelling the five fields out (instead of looping over ``RECORD_FIELDS``)
+    # avoids creating a generator object for every record.
+    for record in records:
+        get = record.get
+        yield (
+            text(get("first_name")),
+            text(get("last_name")),
+            text(get("email")),
+            text(get("age")),
+            text(get("comments")),
+        )
+
+
+def _mark_malformed(
+    errors: list[RecordError], malformed: list[int]
+) -> list[RecordError]:
+    """Report the records at the ``malformed`` positions as unreadable.
+
+    :func:`read_jsonl_records` yields an empty record for a broken line, so
+    the validator reported it as missing fields; this puts the real reason in
+    place. ``malformed`` is emptied for the next chunk.
+    """
+
+    if not malformed:
+        return errors
+    broken = set(malformed)
+    malformed.clear()
+    message = ERROR_MESSAGES[ERROR_MALFORMED_RECORD]
+    return [
+        RecordError(error.index, ERROR_MALFORMED_RECORD, message)
+        if error.index in broken
+        else error
+        for error in errors
+    ]
+
+
+def import_records(
+    source: str | PathLike[str],
+    sink: Callable[[list[RegistrationData]], None],
+    file_format: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    delimiter: str | None = None,
+) -> Iterator[ChunkReport]:
+    """Stream a CSV or JSONL file through the validator into ``sink``.
+
+    ``file_format`` is ``"csv"`` or ``"jsonl"``; when omitted it is derived
+    from the file extension. ``delimiter`` is passed on to
+    :func:`read_csv_records`. The function is a generator: iterate over it to
+    drive the import and receive one :class:`ChunkReport` per chunk. JSON
+    lines that cannot be parsed are reported as ``malformed_record`` errors.
+    """
+
+    if file_format is None:
+        file_format = "csv" if fspath(source).lower().endswith(".csv") else "jsonl"
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Unbekanntes Dateiformat: {file_format!r}")
+
+    # ``utf-8-sig`` removes the byte order mark that many Windows programs
+    # put at the start of the file; with plain ``utf-8`` it would stick to
+    # the first column header.
+    with open(source, encoding="utf-8-sig", newline="") as handle:
+        malformed: list[int] = []
+        if file_format == "csv":
+            raw = read_csv_records(handle, delimiter)
+        else:
+            raw = read_jsonl_records(handle, malformed)
+        records = normalize_records(raw)
+        started = perf_counter()
+        for number, result in enumerate(validate_records(records, chunk_size)):
+            sink(result.valid)
+            errors = _mark_malformed(result.errors, malformed)
+            finished = perf_counter()
+            yield ChunkReport(
+                chunk=number,
+                start=result.start,
+                count=result.count,
+                valid=len(result.valid),
+                errors=errors,
+                seconds=finished - started,
+            )
+            started = perf_counter()
+
+
+# 13. Persist submitted registrations -------------------------------------------
+# Writing every submission to disk with its own transaction is slow: each
+# ``COMMIT`` forces the database to sync its journal. A *write-behind* store
+# instead accepts records instantly, collects them in a queue and lets a
+# background thread insert them in batches. The GUI never waits for the disk.
+
+
+class RegistrationStore(ABC):
+    """Base class for places that keep submitted registrations.
+
+    Subclasses implement :meth:`add`; :meth:`flush` and :meth:`close` are
+    optional hooks for stores that buffer records. Stores are context
+    managers, so ``with SQLiteStore(...) as store:`` closes them reliably.
+    Stores that write in the background raise ``RuntimeError`` from
+    :meth:`add` and :meth:`close` once a write has failed.
+    """
+
+    @abstractmethod
+    def add(self, record: RegistrationData) -> None:
+        """Keep ``record``; may only queue it until :meth:`flush`."""
+
+    def flush(self) -> None:
+        """Block until every record passed to :meth:`add` has been written."""
+
+    def close(self) -> None:
+        """Write outstanding records and release all resources."""
+
+    def __enter__(self) -> RegistrationStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class SQLiteStore(RegistrationStore):
+    """Write-behind SQLite store that inserts records in batches.
+
+    A dedicated thread owns the ``sqlite3`` connection (connections must not be
+    shared between threads). Records are written with one ``executemany`` and
+    one ``COMMIT`` as soon as ``batch_size`` records are waiting or
+    ``flush_interval`` seconds have passed since the first waiting record.
+    The database runs in WAL mode, so readers are never blocked by the writer.
+    """
+
+    _INSERT = (
+        "INSERT INTO registrations "
+        "(first_name, last_name, email, age, comments, submitted_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    )
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: SimpleQueue[Any] = SimpleQueue()
+        self._error: BaseException | None = None
+        self._closed = False
+        # The connection is opened inside the thread; ``ready`` lets the
+        # constructor report errors such as an unwritable path immediately.
+        ready = Event()
+        self._thread = Thread(
+            target=self._run, args=(ready,), name="SQLiteStore", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        self._raise_pending_error()
+
+    # -- public API ---------------------------------------------------------------
+    def add(self, record: RegistrationData) -> None:
+        """Queue ``record`` for writing; returns without touching the disk."""
+
+        self._raise_pending_error()
+        if self._closed:
+            raise RuntimeError("SQLiteStore ist bereits geschlossen.")
+        self._queue.put(
+            (
+                record.first_name,
+                record.last_name,
+                record.email,
+                record.age,
+                record.comments,
+                time(),
+            )
+        )
+
+    def flush(self) -> None:
+        if self._closed:
+            return
+        done = Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_pending_error()
+
+    # -- background thread -------------------------------------------------------
+    def _run(self, ready: Event) -> None:
+        import sqlite3
+
+        try:
+            connection = sqlite3.connect(self.path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # ``NORMAL`` only syncs at WAL checkpoints, which is safe in WAL
+            # mode: a crash can lose the last commits but never corrupts data.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS registrations ("
+                "id INTEGER PRIMARY KEY, first_name TEXT NOT NULL, "
+                "last_name TEXT NOT NULL, email TEXT NOT NULL, "
+                "age INTEGER NOT NULL, comments TEXT NOT NULL, "
+                "submitted_at REAL NOT NULL)"
+            )
+            connection.commit()
+        except BaseException as error:  # reported to the caller by __init__
+            self._error = error
+            ready.set()
+            return
+        ready.set()
+
+        try:
+            self._write_loop(connection)
+        except BaseException as error:
+            self._error = error
+            # Keep draining the queue so ``flush``/``close`` never wait forever
+            # on a thread that has stopped writing.
+            self._drain_after_error()
+        finally:
+            connection.close()
+
+    def _write_loop(self, connection: sqlite3.Connection) -> None:
+        queue = self._queue
+        batch: list[tuple[Any, ...]] = []
+        deadline = 0.0
+
+        def write() -> None:
+            # ``executemany`` prepares the INSERT statement once and reuses it
+            # for every row; sqlite3 also caches it across calls.
+            if batch:
+                connection.executemany(self._INSERT, batch)
+                connection.commit()
+                batch.clear()
+
+        while True:
+            timeout = None if not batch else max(0.0, deadline - monotonic())
+            try:
+                item = queue.get(timeout=timeout)
+            except Empty:
+                write()
+                continue
+            if type(item) is tuple:
+                if not batch:
+                    deadline = monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    write()
+            elif item is None:
+                try:
+                    write()
+                except BaseException as error:
+                    # The close sentinel has been taken off the queue already,
+                    # so there is nothing left to drain: report and stop.
+                    self._error = error
+                return
+            else:
+                try:
+                    write()
+                except BaseException as error:
+                    # Wake the ``flush`` that asked for this write, or it would
+                    # wait for an event nobody sets any more.
+                    self._error = error
+                    item.set()
+                    raise
+                item.set()
+
+    def _drain_after_error(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if type(item) is not tuple:
+                item.set()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            message = "Speichern der Registrierungen fehlgeschlagen."
+            raise RuntimeError(message) from self._error
+
+
+# 17. Detect duplicate submissions ----------------------------------------------
+# Operators sometimes press "Absenden" twice or register the same person again.
+# Remembering every submission exactly would need a lot of memory, so we use a
+# *Bloom filter*: a fixed-size bit array in which each key sets a handful of
+# bits. If any of a key's bits is unset, the key was definitely never added;
+# if all are set, it was *probably* added (false positives are possible, false
+# negatives are not). That is why a hit only triggers a confirmation question
+# instead of rejecting the record outright.
+#
+# Bloom filters cannot forget single keys. To let entries expire we keep two
+# filters ("generations"): new keys go into the current one and, every ``ttl``
+# seconds, the older generation is dropped. A key is therefore remembered for
+# at least ``ttl`` and at most ``2 * ttl`` seconds.
+
+
+def registration_key(data: RegistrationData) -> bytes:
+    """Return a 16-byte fingerprint of the person behind ``data``.
+
+    Names are compared case-insensitively (``casefold`` also handles "ß") and
+    the e-mail address is normalised as in :func:`normalize_email`, so small
+    spelling variations of the same registration produce the same key.
+    """
+
+    try:
+        email = normalize_email(data.email)
+    except ValidationError:
+        email = data.email
+    parts = (data.first_name.casefold(), data.last_name.casefold(), email.casefold())
+    text = "\x1f".join(parts)
+    return blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class DuplicateIndex:
+    """Memory-bounded, expiring index of recently submitted registrations.
+
+    ``memory_budget`` is the total size in bytes of both generations and
+    ``error_rate`` the accepted false-positive probability when a generation
+    holds :attr:`capacity` keys. Lookups and inserts cost a fixed number of bit
+    operations regardless of how many keys were added.
+    """
+
+    _MAGIC = b"FDUP1\0"
+    _HEADER = struct.Struct("<6sQIdd")
+
+    def __init__(
+        self,
+        ttl: float = 24 * 60 * 60,
+        memory_budget: int = 32 * 2**20,
+        error_rate: float = 0.001,
+    ) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate muss zwischen 0 und 1 liegen.")
+        self.ttl = ttl
+        # Optimal Bloom filter parameters: k = -log2(p) hash functions and
+        # m / n = -ln(p) / ln(2)^2 bits per stored key.
+        self.bits = max(64, memory_budget // 2 * 8)
+        self.hashes = max(1, round(-log2(error_rate)))
+        self.capacity = int(self.bits * log(2) ** 2 / -log(error_rate))
+        self._current = bytearray(self.bits // 8)
+        self._previous = bytearray(self.bits // 8)
+        self._rotated_at = time()
+
+    def _positions(self, key: bytes) -> list[int]:
+        # "Double hashing": two 64-bit halves of the key generate all k bit
+        # positions, so only one real hash function is needed.
+        first = int.from_bytes(key[:8], "little")
+        second = int.from_bytes(key[8:], "little") | 1
+        bits = self.bits
+        return [(first + number * second) % bits for number in range(self.hashes)]
+
+    def _rotate_if_expired(self) -> None:
+        now = time()
+        if now - self._rotated_at < self.ttl:
+            return
+        if now - self._rotated_at >= 2 * self.ttl:
+            # Nothing was added for two periods: both generations are stale.
+            self._previous = bytearray(len(self._current))
+        else:
+            self._previous = self._current
+        self._current = bytearray(len(self._previous))
+        self._rotated_at = now
+
+    def __contains__(self, data: RegistrationData) -> bool:
+        self._rotate_if_expired()
+        positions = self._positions(registration_key(data))
+        for generation in (self._current, self._previous):
+            if all(generation[bit >> 3] & (1 << (bit & 7)) for bit in positions):
+                return True
+        return False
+
+    def add(self, data: RegistrationData) -> None:
+        self._rotate_if_expired()
+        current = self._current
+        for bit in self._positions(registration_key(data)):
+            current[bit >> 3] |= 1 << (bit & 7)
+
+    def save(self, path: str | PathLike[str]) -> None:
+        """Write the index to ``path`` so it survives a restart.
+
+        The data is written to a temporary file first and then renamed, so a
+        crash while saving never leaves a half-written index behind.
+        """
+
+        temporary = f"{fspath(path)}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(
+                self._HEADER.pack(
+                    self._MAGIC, self.bits, self.hashes, self.ttl, self._rotated_at
+                )
+            )
+            handle.write(self._current)
+            handle.write(self._previous)
+        replace_file(temporary, path)
+
+    @classmethod
+    def load(cls, path: str | PathLike[str]) -> DuplicateIndex:
+        """Read an index written by :meth:`save`."""
+
+        with open(path, "rb") as handle:
+            magic, bits, hashes, ttl, rotated_at = cls._HEADER.unpack(
+                handle.read(cls._HEADER.size)
+            )
+            if magic != cls._MAGIC:
+                raise ValueError(f"{fspath(path)} ist kein Duplikat-Index.")
+            # These arguments reproduce exactly the saved ``bits``/``hashes``.
+            index = cls(ttl, memory_budget=bits // 8 * 2, error_rate=2.0**-hashes)
+            index._current = bytearray(handle.read(bits // 8))
+            index._previous = bytearray(handle.read(bits // 8))
+            index._rotated_at = rotated_at
+        return index
+
+
+# 21. Keep submissions safe while the backend is unreachable --------------------
+# A *journal* is a file that is only ever appended to. Every validated record
+# is written to it, and ``fsync`` forces it onto the disk, before the user sees
+# the confirmation. A separate *replayer* later sends the journalled records to
+# the real store and remembers how far it got, so nothing is lost when the
+# backend is down or the program crashes.
+#
+# On disk the journal is a directory of numbered segment files. Each record is
+# stored as ``length, crc32, JSON payload``: the length tells the reader where
+# the next record starts and the checksum detects a record that was only half
+# written when the computer lost power. Full segments are never changed again,
+# so recovering after a crash only needs to scan the newest segment.
+
+_JOURNAL_SUFFIX = ".journal"
+_JOURNAL_CHECKPOINT = "checkpoint.json"
+_JOURNAL_HEADER = struct.Struct("<II")
+
+
+def _journal_segments(directory: str) -> list[int]:
+    """Return the numbers of all segment files in ``directory``, oldest first."""
+
+    return sorted(
+        int(name[: -len(_JOURNAL_SUFFIX)])
+        for name in listdir(directory)
+        if name.endswith(_JOURNAL_SUFFIX)
+    )
+
+
+def _journal_path(directory: str, segment: int) -> str:
+    return join_path(directory, f"{segment:08d}{_JOURNAL_SUFFIX}")
+
+
+def _encode_journal_record(record: RegistrationData) -> bytes:
+    fields = [record.first_name, record.last_name, record.email, record.age]
+    payload = json.dumps(
+        fields + [record.comments],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return _JOURNAL_HEADER.pack(len(payload), crc32(payload)) + payload
+
+
+def _read_journal_records(
+    handle: Any, limit: int
+) -> tuple[list[RegistrationData], int]:
+    """Read up to ``limit`` complete records from the current position.
+
+    Returns the records and the offset just after the last complete one. A
+    record that is cut off or fails its checksum ends the scan: it is either
+    still being written or the remains of a crash.
+    """
+
+    records: list[RegistrationData] = []
+    end = handle.tell()
+    while len(records) < limit:
+        header = handle.read(_JOURNAL_HEADER.size)
+        if len(header) < _JOURNAL_HEADER.size:
+            break
+        length, checksum = _JOURNAL_HEADER.unpack(header)
+        payload = handle.read(length)
+        if len(payload) < length or crc32(payload) != checksum:
+            break
+        records.append(RegistrationData(*json.loads(payload)))
+        end = handle.tell()
+    handle.seek(end)
+    return records, end
+
+
+class JournalStore(RegistrationStore):
+    """Durable append-only store: :meth:`add` returns once the record is on disk.
+
+    A background thread writes whatever records are waiting with a single
+    ``write`` and a single ``fsync`` (*group commit*). One submission costs
+    one ``fsync``, and many concurrent or bulk submissions share one. Segment
+    files are rotated after ``segment_size`` bytes; smaller segments make the
+    scan after a crash shorter (4 MiB take about 0.1 s).
+
+    With a ``sink`` a :class:`JournalReplayer` forwards the journalled records
+    to it in the background; closing the journal also closes the sink.
+    """
+
+    def __init__(
+        self,
+        directory: str | PathLike[str],
+        sink: RegistrationStore | None = None,
+        segment_size: int = 4 * 1024 * 1024,
+        max_batch: int = 4096,
+    ) -> None:
+        self.directory = fspath(directory)
+        self.segment_size = segment_size
+        self.max_batch = max_batch
+        makedirs(self.directory, exist_ok=True)
+        self._segment, self._size = self._recover()
+        self._handle = open(_journal_path(self.directory, self._segment), "ab")
+        self._queue: SimpleQueue[Any] = SimpleQueue()
+        self._error: BaseException | None = None
+        self._closed = False
+        self.replayer: JournalReplayer | None = None
+        if sink is not None:
+            self.replayer = JournalReplayer(self.directory, sink)
+            self.replayer.start()
+        self._thread = Thread(target=self._run, name="JournalStore", daemon=True)
+        self._thread.start()
+
+    # -- public API ---------------------------------------------------------------
+    def add(self, record: RegistrationData) -> None:
+        """Write ``record`` to the journal and wait until it is on disk."""
+
+        self._commit(_encode_journal_record(record))
+
+    def add_many(self, records: Iterable[RegistrationData]) -> None:
+        """Journal many records at once with a single ``fsync``."""
+
+        self._commit(b"".join(map(_encode_journal_record, records)))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._handle.close()
+        if self.replayer is not None:
+            self.replayer.close()
+            self.replayer.sink.close()
+        self._raise_pending_error()
+
+    # -- writing -------------------------------------------------------------------
+    def _commit(self, data: bytes) -> None:
+        self._raise_pending_error()
+        if self._closed:
+            raise RuntimeError("JournalStore ist bereits geschlossen.")
+        done = Event()
+        self._queue.put((data, done))
+        done.wait()
+        self._raise_pending_error()
+
+    def _recover(self) -> tuple[int, int]:
+        """Find the newest segment and cut off a half-written last record."""
+
+        segments = _journal_segments(self.directory)
+        if not segments:
+            return 1, 0
+        segment = segments[-1]
+        with open(_journal_path(self.directory, segment), "r+b") as handle:
+            data = handle.read()
+            # Only lengths and checksums are checked; decoding the JSON is left
+            # to the replayer.
+            end = 0
+            unpack_from = _JOURNAL_HEADER.unpack_from
+            while end + _JOURNAL_HEADER.size <= len(data):
+                length, checksum = unpack_from(data, end)
+                start = end + _JOURNAL_HEADER.size
+                if start + length > len(data):
+                    break
+                if crc32(memoryview(data)[start : start + length]) != checksum:
+                    break
+                end = start + length
+            if end != len(data):
+                handle.truncate(end)
+        return segment, end
+
+    def _run(self) -> None:
+        try:
+            self._write_loop()
+        except BaseException as error:
+            self._error = error
+            # Keep answering so ``add``/``close`` never wait forever.
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                item[1].set()
+
+    def _write_loop(self) -> None:
+        queue = self._queue
+        while True:
+            # Block for the first item, then take whatever else has arrived in
+            # the meantime: all of it shares the following ``fsync``.
+            batch = [queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(queue.get_nowait())
+                except Empty:
+                    break
+            stop = None in batch
+            waiting = [item for item in batch if item is not None]
+            if waiting:
+                try:
+                    self._append(b"".join([data for data, _done in waiting]))
+                except BaseException as error:
+                    # The events of this batch are off the queue already, so
+                    # ``_run`` cannot answer them: wake every waiting ``add``
+                    # here (it then raises) and stop at once if ``close`` is
+                    # among them.
+                    self._error = error
+                    for _data, done in waiting:
+                        done.set()
+                    if stop:
+                        return
+                    raise
+                for _data, done in waiting:
+                    done.set()
+                if self.replayer is not None:
+                    self.replayer.wake()
+            if stop:
+                return
+
+    def _append(self, data: bytes) -> None:
+        if self._size and self._size + len(data) > self.segment_size:
+            # The full segment is synced before the next one is created, so
+            # only the newest segment can ever contain a torn record.
+            self._handle.close()
+            self._segment += 1
+            self._size = 0
+            self._handle = open(_journal_path(self.directory, self._segment), "ab")
+            _fsync_directory(self.directory)
+        self._handle.write(data)
+        self._handle.flush()
+        fsync(self._handle.fileno())
+        self._size += len(data)
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            message = "Schreiben des Journals fehlgeschlagen."
+            raise RuntimeError(message) from self._error
+
+
+def _fsync_directory(directory: str) -> None:
+    """Make a newly created file's directory entry durable (POSIX only)."""
+
+    try:
+        descriptor = os_open(directory, O_RDONLY)
+    except OSError:  # Windows cannot open directories; NTFS needs no sync.
+        return
+    try:
+        fsync(descriptor)
+    finally:
+        os_close(descriptor)
+
+
+class JournalReplayer:
+    """Forward journalled records to ``sink`` in batches, retrying on failure.
+
+    The position of the next unsent record is kept in a small checkpoint file
+    that is replaced atomically after each batch the sink has flushed. Fully
+    sent segments are deleted. A crash between ``sink.flush()`` and saving the
+    checkpoint sends that batch again, so sinks see every record *at least*
+    once.
+    """
+
+    def __init__(
+        self,
+        directory: str | PathLike[str],
+        sink: RegistrationStore,
+        batch_size: int = 500,
+        poll_interval: float = 1.0,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30.0,
+    ) -> None:
+        self.directory = fspath(directory)
+        self.sink = sink
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.last_error: BaseException | None = None
+        self._checkpoint_path = join_path(self.directory, _JOURNAL_CHECKPOINT)
+        self._segment, self._offset = self._load_checkpoint()
+        self._handle: Any = None
+        self._wakeup = Event()
+        self._stopping = False
+        self._thread: Thread | None = None
+
+    # -- replaying ----------------------------------------------------------------
+    def replay_pending(self) -> int:
+        """Send every record that is in the journal right now; returns the count.
+
+        Exceptions raised by the sink propagate; the checkpoint then still
+        points at the first record of the failed batch.
+        """
+
+        sent = 0
+        while True:
+            records, offset = self._read_batch()
+            if not records:
+                return sent
+            try:
+                for record in records:
+                    self.sink.add(record)
+                self.sink.flush()
+            except BaseException:
+                # Rewind, so the next attempt reads the failed batch again.
+                self._handle.seek(self._offset)
+                raise
+            self._offset = offset
+            self._save_checkpoint()
+            sent += len(records)
+
+    def _read_batch(self) -> tuple[list[RegistrationData], int]:
+        while True:
+            if self._handle is None:
+                path = _journal_path(self.directory, self._segment)
+                if not path_exists(path):
+                    return [], self._offset
+                self._handle = open(path, "rb")
+                self._handle.seek(self._offset)
+            records, offset = _read_journal_records(self._handle, self.batch_size)
+            if records:
+                return records, offset
+            # The segment is used up. If the writer has already moved on to a
+            # newer one, this segment is complete and can be removed.
+            newer = [n for n in _journal_segments(self.directory) if n > self._segment]
+            if not newer:
+                return [], offset
+            # The writer may have appended to this segment after the read
+            # above and rotated before the directory listing. It never writes
+            # to a segment again once a newer one exists, so a second read
+            # now is guaranteed to see everything.
+            records, offset = _read_journal_records(self._handle, self.batch_size)
+            if records:
+                return records, offset
+            self._handle.close()
+            self._handle = None
+            finished = self._segment
+            self._segment, self._offset = newer[0], 0
+            self._save_checkpoint()
+            remove_file(_journal_path(self.directory, finished))
+
+    def _load_checkpoint(self) -> tuple[int, int]:
+        try:
+            with open(self._checkpoint_path, encoding="utf-8") as handle:
+                checkpoint = json.load(handle)
+        except FileNotFoundError:
+            segments = _journal_segments(self.directory)
+            return (segments[0] if segments else 1), 0
+        return checkpoint["segment"], checkpoint["offset"]
+
+    def _save_checkpoint(self) -> None:
+        temporary = f"{self._checkpoint_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump({"segment": self._segment, "offset": self._offset}, handle)
+            handle.flush()
+            fsync(handle.fileno())
+        replace_file(temporary, self._checkpoint_path)
+
+    # -- background thread -------------------------------------------------------
+    def start(self) -> None:
+        """Replay continuously in a daemon thread until :meth:`close`."""
+
+        self._thread = Thread(target=self._run, name="JournalReplayer", daemon=True)
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Tell the thread that new records are waiting."""
+
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Stop the thread after a last attempt to send what is waiting.
+
+        Records the sink does not accept stay in the journal and are sent the
+        next time a replayer is started for the same directory.
+        """
+
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            stopping = self._stopping
+            self._wakeup.clear()
+            try:
+                self.replay_pending()
+            except Exception as error:  # the backend is down: back off, retry
+                self.last_error = error
+                if stopping:
+                    return
+                # Exponential backoff: 0.5 s, 1 s, 2 s, ... up to the maximum,
+                # but a new submission or ``close`` ends the wait early.
+                self._wakeup.wait(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+            self.last_error = None
+            delay = self.retry_delay
+            if stopping:
+                return
+            self._wakeup.wait(self.poll_interval)
+
+
+# 22. Exchange registrations in a compact binary format -------------------------
+# JSON repeats the structure of every record (brackets, quotes, commas) and has
+# to escape text. The binary format below stores only the data, and it stores
+# it *column by column*: a block of records holds all first names, then all
+# last names, e-mails, comments and finally all ages.
+#
+#     count                                     uint32
+#     first names, last names, e-mails, comments  one text column each
+#     ages                                      one number column
+#
+# A text column is a kind byte, its size in bytes (uint32) and its content.
+# Normally the content is the UTF-8 text of all values joined with a NUL
+# character, so decoding a column is one ``decode`` and one ``split``, both
+# running in C. A value that itself contains NUL would break the split; a
+# column with such a value stores the length of every value instead. The ages
+# are a plain little-endian integer array with the smallest item size that
+# fits (usually one byte), read straight from the buffer via
+# ``memoryview.cast``. Blocks can simply be written one after another.
+#
+# Looking at a single record would mean decoding whole columns. The archive of
+# section 23 needs exactly that, so it uses a second layout further below, in
+# which every record stands on its own.
+
+_BLOCK_COUNT = struct.Struct("<I")
+_COLUMN_HEADER = struct.Struct("<BI")
+# Kinds of text columns.
+_COLUMN_JOINED = 0
+_COLUMN_SIZED = 1
+# Kind byte of an age column that holds decimal texts (ages beyond 64 bits).
+_AGES_AS_TEXT = ord("s")
+_SEPARATOR = "\x00"
+
+
+def _append_text_column(out: bytearray, values: list[str]) -> None:
+    joined = _SEPARATOR.join(values)
+    if joined.count(_SEPARATOR) == len(values) - 1 or not values:
+        data = joined.encode("utf-8")
+        out += _COLUMN_HEADER.pack(_COLUMN_JOINED, len(data))
+        out += data
+        return
+    lengths = array("I", [len(value) for value in values])
+    if sys.byteorder == "big":  # the format is little-endian
+        lengths.byteswap()
+    data = "".join(values).encode("utf-8")
+    out += _COLUMN_HEADER.pack(_COLUMN_SIZED, len(lengths) * 4 + len(data))
+    out += lengths.tobytes()
+    out += data
+
+
+def _read_text_column(
+    view: memoryview, position: int, count: int
+) -> tuple[list[str], int]:
+    """Return the ``count`` values at ``position`` and the position after them."""
+
+    kind, size = _COLUMN_HEADER.unpack_from(view, position)
+    position += _COLUMN_HEADER.size
+    if position + size > len(view):
+        raise ValueError("Der Datenblock endet mitten in einer Spalte.")
+    # ``str(view, "utf-8")`` decodes straight from the buffer; there is no
+    # intermediate ``bytes`` copy.
+    if kind == _COLUMN_JOINED:
+        values = str(view[position : position + size], "utf-8").split(_SEPARATOR)
+        if count == 0:
+            values = []
+    elif kind == _COLUMN_SIZED:
+        lengths = array("I")
+        lengths.frombytes(view[position : position + count * 4])
+        if sys.byteorder == "big":
+            lengths.byteswap()
+        text = str(view[position + count * 4 : position + size], "utf-8")
+        ends = list(accumulate(lengths))
+        values = [text[end - length : end] for end, length in zip(ends, lengths)]
+    else:
+        raise ValueError(f"Unbekannter Spaltentyp {kind}.")
+    if len(values) != count:
+        raise ValueError("Die Spalte passt nicht zur Anzahl der Datensätze.")
+    return values, position + size
+
+
+def encode_registrations(
+    records: Iterable[RegistrationData], out: bytearray | None = None
+) -> bytearray:
+    """Append ``records`` as one block to ``out`` (a new buffer by default)."""
+
+    if out is None:
+        out = bytearray()
+    records = list(records)
+    out += _BLOCK_COUNT.pack(len(records))
+    _append_text_column(out, [record.first_name for record in records])
+    _append_text_column(out, [record.last_name for record in records])
+    _append_text_column(out, [record.email for record in records])
+    _append_text_column(out, [record.comments for record in records])
+
+    ages = [record.age for record in records]
+    typecode = None
+    if not ages or min(ages) >= 0:
+        largest = max(ages, default=0)
+        for typecode in ("B", "H", "I", "Q"):
+            if largest < 1 << (8 * array(typecode).itemsize):
+                break
+        else:
+            typecode = None
+    if typecode is None:
+        data = _SEPARATOR.join(map(str, ages)).encode("ascii")
+        out += _COLUMN_HEADER.pack(_AGES_AS_TEXT, len(data))
+        out += data
+    else:
+        numbers = array(typecode, ages)
+        if sys.byteorder == "big":
+            numbers.byteswap()
+        out += _COLUMN_HEADER.pack(ord(typecode), len(numbers) * numbers.itemsize)
+        out += numbers.tobytes()
+    return out
+
+
+def decode_registrations(
+    buffer: bytes | bytearray | memoryview, start: int = 0, end: int | None = None
+) -> list[RegistrationData]:
+    """Decode every block stored in ``buffer[start:end]``.
+
+    ``buffer`` may be anything that supports the buffer protocol, including an
+    ``mmap``. Text is decoded directly from a ``memoryview`` of it and the
+    ages are read from the buffer without copying.
+    """
+
+    view = memoryview(buffer).cast("B")
+    if end is None:
+        end = len(view)
+    view = view[start:end]
+    records: list[RegistrationData] = []
+    position = 0
+    try:
+        while position < len(view):
+            (count,) = _BLOCK_COUNT.unpack_from(view, position)
+            position += _BLOCK_COUNT.size
+            first_names, position = _read_text_column(view, position, count)
+            last_names, position = _read_text_column(view, position, count)
+            emails, position = _read_text_column(view, position, count)
+            comments, position = _read_text_column(view, position, count)
+
+            kind, size = _COLUMN_HEADER.unpack_from(view, position)
+            position += _COLUMN_HEADER.size
+            data = view[position : position + size]
+            if len(data) < size:
+                raise ValueError("Der Datenblock endet mitten in einer Spalte.")
+            position += size
+            ages: Any
+            if kind == _AGES_AS_TEXT:
+                ages = [int(age) for age in str(data, "ascii").split(_SEPARATOR)]
+                if count == 0:
+                    ages = []
+            elif sys.byteorder == "little":
+                ages = data.cast(chr(kind))
+            else:
+                ages = array(chr(kind))
+                ages.frombytes(data)
+                ages.byteswap()
+            if len(ages) != count:
+                raise ValueError("Die Spalte passt nicht zur Anzahl der Datensätze.")
+
+            # ``map`` calls the dataclass constructor from C for every record.
+            records.extend(
+                map(RegistrationData, first_names, last_names, emails, ages, comments)
+            )
+    except struct.error:
+        raise ValueError("Der Datenblock endet mitten in einem Datensatz.") from None
+    return records
+
+
+# Single records: every field is its UTF-8 length followed by the UTF-8 bytes;
+# the age is a number. Lengths and the age are *varints*: seven bits per byte,
+# with the high bit set on every byte except the last. Numbers below 128,
+# which is nearly every length and every age, therefore take a single byte.
+
+
+def _append_varint(out: bytearray, number: int) -> None:
+    if number < 0:
+        raise ValueError("Varints können keine negativen Zahlen speichern.")
+    while number >= 0x80:
+        out.append(number & 0x7F | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_varint(buffer: Any, position: int) -> tuple[int, int]:
+    """Return the number starting at ``position`` and the position after it."""
+
+    result = shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _append_record(out: bytearray, record: RegistrationData) -> None:
+    """Append ``record`` in the single-record layout."""
+
+    append = out.append
+    # The common one-byte varints are written inline; calling a function for
+    # every field would cost more than the encoding itself.
+    for text in (record.first_name, record.last_name, record.email):
+        data = text.encode("utf-8")
+        if len(data) < 0x80:
+            append(len(data))
+        else:
+            _append_varint(out, len(data))
+        out += data
+    if 0 <= record.age < 0x80:
+        append(record.age)
+    else:
+        _append_varint(out, record.age)
+    data = record.comments.encode("utf-8")
+    if len(data) < 0x80:
+        append(len(data))
+    else:
+        _append_varint(out, len(data))
+    out += data
+
+
+def encode_registration(record: RegistrationData) -> bytes:
+    """Return the single-record layout of ``record``."""
+
+    out = bytearray()
+    _append_record(out, record)
+    return bytes(out)
+
+
+def _decode_records(buffer: Any, start: int, end: int | None) -> list[RegistrationData]:
+    """Decode consecutive single records stored in ``buffer[start:end]``.
+
+    Rather than creating a ``bytes`` object per field and decoding each one,
+    the whole range is decoded once as Latin-1, where every byte becomes
+    exactly one character. Fields are then plain string slices at the same
+    offsets; only fields with non-ASCII characters (umlauts, for example) are
+    converted back to bytes and decoded as UTF-8.
+    """
+
+    view = memoryview(buffer).cast("B")
+    if end is None:
+        end = len(view)
+    view = view[start:end]
+    text = str(view, "latin-1")
+    records: list[RegistrationData] = []
+    append = records.append
+    position = 0
+    end = len(view)
+    try:
+        # The five fields are decoded by repeating the same few lines instead
+        # of looping over them: this loop runs millions of times and a nested
+        # loop or a helper function call per field would double its cost.
+        while position < end:
+            length = view[position]
+            if length < 0x80:
+                position += 1
+            else:
+                length, position = _read_varint(view, position)
+            first_name = text[position : position + length]
+            if not first_name.isascii():
+                first_name = first_name.encode("latin-1").decode("utf-8")
+            position += length
+
+            length = view[position]
+            if length < 0x80:
+                position += 1
+            else:
+                length, position = _read_varint(view, position)
+            last_name = text[position : position + length]
+            if not last_name.isascii():
+                last_name = last_name.encode("latin-1").decode("utf-8")
+            position += length
+
+            length = view[position]
+            if length < 0x80:
+                position += 1
+            else:
+                length, position = _read_varint(view, position)
+            email = text[position : position + length]
+            if not email.isascii():
+                email = email.encode("latin-1").decode("utf-8")
+            position += length
+
+            age = view[position]
+            if age < 0x80:
+                position += 1
+            else:
+                age, position = _read_varint(view, position)
+
+            length = view[position]
+            if length < 0x80:
+                position += 1
+            else:
+                length, position = _read_varint(view, position)
+            comments = text[position : position + length]
+            if not comments.isascii():
+                comments = comments.encode("latin-1").decode("utf-8")
+            position += length
+
+            if position > end:
+                raise IndexError
+            append(RegistrationData(first_name, last_name, email, age, comments))
+    except IndexError:
+        raise ValueError("Der Datenblock endet mitten in einem Datensatz.") from None
+    return records
+
+
+def decode_registration(
+    buffer: bytes | bytearray | memoryview, start: int = 0, end: int | None = None
+) -> RegistrationData:
+    """Decode ``buffer[start:end]``, which must hold exactly one single record."""
+
+    records = _decode_records(buffer, start, end)
+    if len(records) != 1:
+        raise ValueError("Erwartet genau einen Datensatz.")
+    return records[0]
+
+
+# 23. Archive registrations for fast random access -----------------------------
+# An archive file stores many records in the single-record layout of section
+# 22 so that any single record can be read without loading the others:
+#
+#     [record 0][record 1] ... [record n-1]   packed records
+#     [offset 0][offset 1] ... [offset n]     index: 8 bytes per entry
+#     [magic, index position, n]              footer: fixed size, at the end
+#
+# Record ``i`` lies between ``offset i`` and ``offset i+1``. Because every index
+# entry has the same width, the position of ``offset i`` is simple arithmetic.
+# The file is opened with ``mmap``: the operating system maps it into memory
+# and reads pages from disk only when they are touched, so opening even a huge
+# archive costs the same and a lookup touches two or three pages.
+
+_ARCHIVE_FOOTER = struct.Struct("<8sQQ")
+_ARCHIVE_MAGIC = b"FRMARCH1"
+
+
+class ArchiveWriter:
+    """Write records to a new archive file; use as a context manager.
+
+    Records are buffered and written in large blocks. Their offsets go to a
+    second temporary file along with each block, so memory use stays the same
+    for archives of any size; :meth:`close` copies that index behind the
+    records and adds the footer. Until then the data lives in temporary files,
+    so an interrupted export never leaves a broken archive behind. When the
+    ``with`` block raises, :meth:`discard` deletes them and an existing archive
+    at ``path`` stays untouched.
+    """
+
+    def __init__(self, path: str | PathLike[str], buffer_size: int = 1 << 20) -> None:
+        self.path = fspath(path)
+        self.buffer_size = buffer_size
+        self._temporary = f"{self.path}.tmp"
+        self._index_temporary = f"{self.path}.index.tmp"
+        self._handle = open(self._temporary, "wb")
+        self._index_handle = open(self._index_temporary, "w+b")
+        self._buffer = bytearray()
+        self._written = 0
+        # Offsets not yet written to the index file, and how many were.
+        self._offsets = array("Q", [0])
+        self._spilled = 0
+
+    @property
+    def count(self) -> int:
+        """Number of records appended so far."""
+
+        return self._spilled + len(self._offsets) - 1
+
+    def append(self, record: RegistrationData) -> None:
+        _append_record(self._buffer, record)
+        self._offsets.append(self._written + len(self._buffer))
+        if len(self._buffer) >= self.buffer_size:
+            self._flush_buffer()
+
+    def extend(self, records: Iterable[RegistrationData]) -> None:
+        for record in records:
+            self.append(record)
+
+    def _flush_buffer(self) -> None:
+        self._handle.write(self._buffer)
+        self._written += len(self._buffer)
+        self._buffer.clear()
+        offsets = self._offsets
+        self._spilled += len(offsets)
+        if sys.byteorder == "big":  # the file format is little-endian
+            offsets.byteswap()
+        self._index_handle.write(offsets.tobytes())
+        self._offsets = array("Q")
+
+    def close(self) -> None:
+        if self._handle.closed:
+            return
+        count = self.count
+        self._flush_buffer()
+        index = self._index_handle
+        index.seek(0)
+        while block := index.read(1 << 20):
+            self._handle.write(block)
+        self._handle.write(_ARCHIVE_FOOTER.pack(_ARCHIVE_MAGIC, self._written, count))
+        self._handle.close()
+        index.close()
+        remove_file(self._index_temporary)
+        replace_file(self._temporary, self.path)
+
+    def discard(self) -> None:
+        """Abandon the export: close and delete the temporary files."""
+
+        if self._handle.closed:
+            return
+        self._handle.close()
+        self._index_handle.close()
+        remove_file(self._temporary)
+        remove_file(self._index_temporary)
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if exc_info[0] is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+def write_archive(
+    path: str | PathLike[str], records: Iterable[RegistrationData]
+) -> int:
+    """Write ``records`` to a new archive at ``path``; returns their number."""
+
+    with ArchiveWriter(path) as writer:
+        writer.extend(records)
+        return writer.count
+
+
+class RegistrationArchive:
+    """Read-only view of an archive written by :class:`ArchiveWriter`.
+
+    ``archive[i]`` decodes one record, ``len(archive)`` is the number of
+    records and iterating scans the archive in chunks. Nothing is read until
+    it is accessed.
+    """
+
+    def __init__(self, path: str | PathLike[str]) -> None:
+        import mmap
+
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._map)
+        if size < _ARCHIVE_FOOTER.size:
+            self._map.close()
+            raise ValueError(f"{fspath(path)} ist kein Registrierungsarchiv.")
+        magic, index_start, count = _ARCHIVE_FOOTER.unpack_from(
+            self._map, size - _ARCHIVE_FOOTER.size
+        )
+        if magic != _ARCHIVE_MAGIC:
+            self._map.close()
+            raise ValueError(f"{fspath(path)} ist kein Registrierungsarchiv.")
+        self._count = count
+        index = memoryview(self._map)[index_start : index_start + (count + 1) * 8]
+        if sys.byteorder == "little":
+            # ``cast`` reinterprets the mapped bytes as 64-bit integers without
+            # copying them: ``self._offsets[i]`` reads straight from the file.
+            self._offsets: Any = index.cast("Q")
+        else:
+            # ``array("Q", index)`` would make one item per *byte*; the raw
+            # bytes have to be loaded with ``frombytes`` instead.
+            self._offsets = array("Q")
+            self._offsets.frombytes(index)
+            self._offsets.byteswap()
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> RegistrationData:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("RegistrationArchive index out of range")
+        offsets = self._offsets
+        return decode_registration(self._map, offsets[index], offsets[index + 1])
+
+    def scan(
+        self, start: int = 0, stop: int | None = None, chunk_size: int = 10_000
+    ) -> Iterator[RegistrationData]:
+        """Yield records ``start`` to ``stop`` in order.
+
+        Each chunk of ``chunk_size`` records is decoded with one call, which is
+        much faster than indexing record by record, and only one chunk is held
+        in memory at a time.
+        """
+
+        stop = self._count if stop is None else min(stop, self._count)
+        offsets = self._offsets
+        for first in range(start, stop, chunk_size):
+            last = min(first + chunk_size, stop)
+            yield from _decode_records(self._map, offsets[first], offsets[last])
+
+    def __iter__(self) -> Iterator[RegistrationData]:
+        return self.scan()
+
+    def close(self) -> None:
+        # The memoryviews must be released first; ``mmap`` refuses to close
+        # while views of it still exist.
+        if isinstance(self._offsets, memoryview):
+            self._offsets.release()
+        self._index.release()
+        self._map.close()
+
+    def __enter__(self) -> RegistrationArchive:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# 24. Validate huge imports on all CPU cores -----------------------------------
+# Python runs the bytecode of one process on one core at a time, so threads do
+# not make the CPU-bound loop of ``validate_chunk`` faster. Separate *processes*
+# do: each has its own interpreter. ``ProcessPoolExecutor`` starts a few worker
+# processes, sends them chunks of records and returns the results.
+#
+# Everything sent between processes is pickled, and that work happens in the
+# main process, one record after another. It limits how many cores can be kept
+# busy, so both directions are kept cheap:
+#
+# * For a file, ``validate_file_parallel`` only sends each worker a byte range.
+#   The worker reads and parses that part of the file itself, so the main
+#   process never touches the records on the way in.
+# * Records that are already in memory have to be sent. A chunk of tuples is
+#   sent as one string, with the ASCII "unit separator" between fields and
+#   the "record separator" between records. Building it costs less than half
+#   as much as pickling the tuples, and the worker splits it in C.
+# * The valid records come back as one block of the binary format from
+#   section 22, which the main process decodes faster than it could unpickle
+#   them. Callers that only need the counts and errors can skip them entirely
+#   with ``collect_valid=False``.
+#
+# This module never imports Tk and loads its other heavy modules lazily, so
+# starting a worker only loads what validation needs.
+
+_FIELD_SEPARATOR = "\x1f"
+_RECORD_SEPARATOR = "\x1e"
+
+
+def _pack_chunk(chunk: list[Any]) -> str | list[Any]:
+    """Join a chunk of five-string tuples into one string, if that is safe.
+
+    Anything else (dicts, integer ages, missing comments, text that contains a
+    separator itself) is returned unchanged and pickled as it is.
+    """
+
+    parts = []
+    for record in chunk:
+        if type(record) is not tuple:
+            return chunk
+        try:
+            part = _FIELD_SEPARATOR.join(record)
+        except TypeError:
+            return chunk
+        # A separator inside a field shows up as one separator too many. This
+        # is checked per record: a four-field tuple with a separator in one
+        # field would otherwise split into five fields and pass the totals.
+        if part.count(_FIELD_SEPARATOR) != len(record) - 1:
+            return chunk
+        parts.append(part)
+    text = _RECORD_SEPARATOR.join(parts)
+    if text.count(_RECORD_SEPARATOR) != len(chunk) - 1:
+        return chunk
+    return text
+
+
+def _validate_chunk_in_worker(
+    payload: str | list[Any], start: int, collect_valid: bool
+) -> tuple[int, int, bytes, list[RecordError]]:
+    """Run ``validate_chunk`` in a worker process; returns picklable parts."""
+
+    if type(payload) is str:
+        lines = payload.split(_RECORD_SEPARATOR)
+        payload = [line.split(_FIELD_SEPARATOR) for line in lines]
+    result = validate_chunk(payload, start)
+    block = bytes(encode_registrations(result.valid)) if collect_valid else b""
+    return result.start, result.count, block, result.errors
+
+
+def _validate_range_in_worker(
+    path: str,
+    file_format: str,
+    begin: int,
+    end: int,
+    keys: list[str],
+    delimiter: str,
+    collect_valid: bool,
+) -> tuple[int, bytes, list[RecordError]]:
+    """Read, parse and validate bytes ``begin`` to ``end`` of the file at ``path``.
+
+    Record indexes in the returned errors count from the start of the range.
+    """
+
+    from io import StringIO
+
+    with open(path, "rb") as handle:
+        handle.seek(begin)
+        text = handle.read(end - begin).decode("utf-8")
+    malformed: list[int] = []
+    if file_format == "csv":
+        # A quoted field with a line break could be cut in two at the range
+        # boundary. Its quote characters then no longer pair up.
+        if text.count('"') % 2:
+            raise ValueError(
+                "CSV-Felder mit Zeilenumbrüchen werden nur von import_records "
+                "unterstützt."
+            )
+        rows = csv.reader(StringIO(text, newline=""), delimiter=delimiter)
+        raw: Iterator[dict[str, Any]] = (dict(zip(keys, row)) for row in rows)
+    else:
+        # ``str.splitlines`` would also break at U+2028, form feeds and other
+        # separators that may appear inside a JSON string. A ``StringIO`` with
+        # ``newline=""`` splits exactly like the file in ``import_records``.
+        raw = read_jsonl_records(StringIO(text, newline=""), malformed)
+    result = validate_chunk(list(normalize_records(raw)))
+    errors = _mark_malformed(result.errors, malformed)
+    block = bytes(encode_registrations(result.valid)) if collect_valid else b""
+    return result.count, block, errors
+
+
+def validate_records_parallel(
+    records: Iterable[Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int | None = None,
+    collect_valid: bool = True,
+) -> Iterator[BatchResult]:
+    """Like :func:`validate_records`, but spread over several processes.
+
+    Results are yielded in input order. Only about two chunks per worker are
+    read ahead, so memory use stays bounded for inputs of any size.
+    ``max_workers`` defaults to the number of CPU cores. With
+    ``collect_valid=False`` the ``valid`` lists stay empty (``count`` and
+    ``errors`` are still exact), which removes most of the work left in the
+    main process and lets more cores be used.
+
+    Call this from code guarded by ``if __name__ == "__main__"``; on Windows
+    and macOS every worker process imports the main module again.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size muss größer als 0 sein.")
+    workers = max_workers or cpu_count() or 1
+
+    iterator = iter(records)
+    pending: deque[Future[Any]] = deque()
+    start = 0
+    pool = ProcessPoolExecutor(workers)
+    try:
+        while True:
+            # Keep every worker busy: while one chunk's result is handed to the
+            # caller, the next ones are already being validated.
+            while len(pending) < 2 * workers:
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                payload = _pack_chunk(chunk)
+                future = pool.submit(
+                    _validate_chunk_in_worker, payload, start, collect_valid
+                )
+                pending.append(future)
+                start += len(chunk)
+            if not pending:
+                return
+            chunk_start, count, block, errors = pending.popleft().result()
+            yield BatchResult(chunk_start, count, decode_registrations(block), errors)
+    finally:
+        # When the caller stops early, chunks that have not started are dropped.
+        pool.shutdown(cancel_futures=True)
+
+
+def _file_ranges(
+    handle: Any, begin: int, chunk_bytes: int
+) -> Iterator[tuple[int, int]]:
+    """Split the file from ``begin`` on into ranges that end after a newline."""
+
+    size = handle.seek(0, SEEK_END)
+    while begin < size:
+        handle.seek(min(begin + chunk_bytes, size))
+        handle.readline()  # move on to the end of the current line
+        end = handle.tell()
+        yield begin, end
+        begin = end
+
+
+def validate_file_parallel(
+    source: str | PathLike[str],
+    file_format: str | None = None,
+    chunk_bytes: int = 1 << 22,
+    max_workers: int | None = None,
+    collect_valid: bool = True,
+    delimiter: str | None = None,
+) -> Iterator[BatchResult]:
+    """Validate a CSV or JSONL file on several cores; results in file order.
+
+    Gives the same records and errors as :func:`import_records`, but every
+    worker reads its own slice of about ``chunk_bytes`` bytes from the file.
+    The main process only decodes the valid records (see
+    :func:`validate_records_parallel` for ``max_workers`` and
+    ``collect_valid``). CSV fields that contain line breaks are not
+    supported and raise ``ValueError``.
+    """
+
+    from codecs import BOM_UTF8
+    from concurrent.futures import ProcessPoolExecutor
+
+    path = fspath(source)
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Unbekanntes Dateiformat: {file_format!r}")
+    if chunk_bytes <= 0:
+        raise ValueError("chunk_bytes muss größer als 0 sein.")
+    workers = max_workers or cpu_count() or 1
+
+    with open(path, "rb") as handle:
+        # The main process reads only the header line of a CSV file; the
+        # byte order mark, if any, is skipped like in ``import_records``.
+        begin = 3 if handle.read(3) == BOM_UTF8 else 0
+        handle.seek(begin)
+        keys: list[str] = []
+        if file_format == "csv":
+            first_line = handle.readline().decode("utf-8")
+            if delimiter is None:
+                delimiter = max(CSV_DELIMITERS, key=first_line.count)
+            header = next(csv.reader([first_line], delimiter=delimiter), [])
+            keys = [COLUMN_ALIASES.get(name.strip(), name.strip()) for name in header]
+            begin = handle.tell()
+        ranges = _file_ranges(handle, begin, chunk_bytes)
+
+        pending: deque[Future[Any]] = deque()
+        start = 0
+        pool = ProcessPoolExecutor(workers)
+        try:
+            while True:
+                while len(pending) < 2 * workers:
+                    byte_range = next(ranges, None)
+                    if byte_range is None:
+                        break
+                    future = pool.submit(
+                        _validate_range_in_worker,
+                        path,
+                        file_format,
+                        *byte_range,
+                        keys,
+                        delimiter or ",",
+                        collect_valid,
+                    )
+                    pending.append(future)
+                if not pending:
+                    return
+                count, block, errors = pending.popleft().result()
+                # Workers count from the start of their range; only now is the
+                # position of the range's first record known.
+                if start:
+                    errors = [
+                        RecordError(error.index + start, error.code, error.message)
+                        for error in errors
+                    ]
+                yield BatchResult(start, count, decode_registrations(block), errors)
+                start += count
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+# 25. Send registrations to a web server efficiently ---------------------------
+# Opening a new HTTP(S) connection for every submission is slow: TCP and TLS
+# handshakes take several round trips before the first byte of data is sent.
+# ``HTTPStore`` keeps one connection open and reuses it (HTTP keep-alive). It
+# also waits a few milliseconds after a submission so that records arriving
+# close together travel in a single request. Larger request bodies are
+# compressed with gzip. Failed requests are retried with growing pauses
+# (*exponential backoff*), so a briefly unavailable server is not flooded
+# with retries.
+#
+# The server receives ``POST`` requests with a JSON body of the form
+# ``{"registrations": [{"first_name": ..., ...}, ...]}`` and answers any 2xx
+# status on success. Combine the store with ``JournalStore`` (section 21) to
+# keep submissions across longer outages and restarts:
+# ``JournalStore("journal", sink=HTTPStore(url))``.
+
+
+class HTTPStore(RegistrationStore):
+    """Write-behind store that POSTs batches of records to ``url``.
+
+    A background thread owns a persistent connection. Records passed to
+    :meth:`add` are collected for up to ``batch_window`` seconds (or until
+    ``max_batch`` are waiting) and sent in one request. Bodies of at least
+    ``compress_min_size`` bytes are gzip-compressed. Connection errors and
+    ``429``/``5xx`` answers are retried up to ``max_retries`` times with
+    exponential backoff. A batch that still fails is dropped, and the error
+    is raised by the next :meth:`add`, :meth:`flush` or :meth:`close`.
+    """
+
+    _RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        url: str,
+        batch_window: float = 0.05,
+        max_batch: int = 500,
+        compress_min_size: int = 1024,
+        timeout: float = 10.0,
+        max_retries: int = 5,
+        retry_delay: float = 0.25,
+        max_retry_delay: float = 8.0,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Ungültige URL für HTTPStore: {url!r}")
+        self.url = url
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.compress_min_size = compress_min_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.retries = 0  # total number of retried requests, for monitoring
+        self._parts = parts
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._connection: Any = None
+        self._queue: SimpleQueue[Any] = SimpleQueue()
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = Thread(target=self._run, name="HTTPStore", daemon=True)
+        self._thread.start()
+
+    # -- public API ---------------------------------------------------------------
+    def add(self, record: RegistrationData) -> None:
+        """Queue ``record`` for sending; returns without waiting for the server."""
+
+        self._raise_pending_error()
+        if self._closed:
+            raise RuntimeError("HTTPStore ist bereits geschlossen.")
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Send everything queued so far and wait for the server's answer."""
+
+        if self._closed:
+            return
+        done = Event()
+        self._queue.put(done)
+        done.wait()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_pending_error()
+
+    # -- background thread -------------------------------------------------------
+    def _run(self) -> None:
+        queue = self._queue
+        batch: list[Any] = []
+        deadline = 0.0
+        try:
+            while True:
+                timeout = None if not batch else max(0.0, deadline - monotonic())
+                try:
+                    item = queue.get(timeout=timeout)
+                except Empty:
+                    self._send(batch)
+                    continue
+                if item is None:
+                    self._send(batch)
+                    return
+                if isinstance(item, Event):
+                    self._send(batch)
+                    item.set()
+                    continue
+                if not batch:
+                    deadline = monotonic() + self.batch_window
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    self._send(batch)
+        finally:
+            if self._connection is not None:
+                self._connection.close()
+
+    def _send(self, batch: list[Any]) -> None:
+        """POST ``batch`` (then empty it); failures are kept in ``_error``."""
+
+        if not batch:
+            return
+        rows = [
+            {
+                "first_name": record.first_name,
+                "last_name": record.last_name,
+                "email": record.email,
+                "age": record.age,
+                "comments": record.comments,
+            }
+            for record in batch
+        ]
+        batch.clear()
+        body = json.dumps({"registrations": rows}, ensure_ascii=False).encode()
+        headers = dict(self.headers)
+        if len(body) >= self.compress_min_size:
+            import gzip
+
+            # Level 6 compresses JSON nearly as well as level 9 at a fraction
+            # of the CPU time.
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                status = self._post(body, headers)
+            except OSError as error:  # includes timeouts and ``HTTPException``
+                failure: BaseException = error
+            else:
+                if 200 <= status < 300:
+                    return
+                failure = RuntimeError(f"Server antwortete mit Status {status}.")
+                if status not in self._RETRY_STATUSES:
+                    break
+            if attempt < self.max_retries:
+                self.retries += 1
+                sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+        self._error = failure
+
+    def _post(self, body: bytes, headers: dict[str, str]) -> int:
+        from http.client import HTTPConnection, HTTPException, HTTPSConnection
+
+        if self._connection is None:
+            secure = self._parts.scheme == "https"
+            factory = HTTPSConnection if secure else HTTPConnection
+            self._connection = factory(
+                self._parts.hostname, self._parts.port, timeout=self.timeout
+            )
+        connection = self._connection
+        try:
+            connection.request("POST", self._path, body, headers)
+            response = connection.getresponse()
+            # The answer must be read completely before the connection can be
+            # used for the next request.
+            response.read()
+        except (OSError, HTTPException) as error:
+            # The server may have closed an idle keep-alive connection; the
+            # next attempt opens a fresh one.
+            connection.close()
+            self._connection = None
+            raise OSError(f"Senden an {self.url} fehlgeschlagen: {error}") from error
+        if response.will_close:
+            connection.close()
+            self._connection = None
+        return response.status
+
+    def _raise_pending_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            message = "Senden der Registrierungen an den Server fehlgeschlagen."
+            raise RuntimeError(message) from error
+
+
+# 27. Count submissions and measure latencies -----------------------------------
+# To see how the form is used in practice we count events (submit attempts,
+# failed rules) and record durations (how long a submission takes). Recording
+# has to be cheap because it happens on every click:
+#
+# * A counter is an ``itertools.count`` object. ``next()`` on it is a single C
+#   call, and the GIL makes that call atomic, so threads can count without a
+#   lock.
+# * A histogram stores durations in buckets. Like an HDR histogram it splits
+#   every power of two microseconds into 16 equal sub-buckets, so each value is
+#   kept with 3 to 6 % precision from one microsecond up to an hour in a few
+#   hundred buckets. Each bucket is again an ``itertools.count``.
+# * These fine buckets do not end exactly on the Prometheus ``le`` bounds: 1000
+#   µs (``le="0.001"``) falls inside the bucket for 992 to 1023 µs. The bucket
+#   that holds a bound therefore gets a second counter for the durations up to
+#   and including the bound. That check compares seconds, not the truncated
+#   microseconds, so the exported ``le`` counts are exact.
+#
+# ``MetricsRegistry.export`` produces the Prometheus text format. It can be
+# written to a file (for the node exporter's textfile collector) or served
+# over HTTP for Prometheus to scrape.
+
+_HISTOGRAM_SUB_BITS = 5
+_HISTOGRAM_HALF = 1 << (_HISTOGRAM_SUB_BITS - 1)
+
+# ``le`` boundaries (in seconds) reported to Prometheus; the fine-grained
+# buckets are summed up into these.
+PROMETHEUS_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _count_value(counter: Any) -> int:
+    """Read an ``itertools.count`` without advancing it (``repr`` is ``count(n)``)."""
+
+    return int(repr(counter)[6:-1])
+
+
+def _bucket_index(micros: int) -> int:
+    exponent = micros.bit_length() - _HISTOGRAM_SUB_BITS
+    if exponent <= 0:
+        return micros
+    return exponent * _HISTOGRAM_HALF + (micros >> exponent)
+
+
+def _bucket_bounds(index: int) -> tuple[int, int]:
+    """Smallest value of bucket ``index`` and the first value after it (µs)."""
+
+    if index < 2 * _HISTOGRAM_HALF:
+        return index, index + 1
+    exponent = index // _HISTOGRAM_HALF - 1
+    mantissa = index - exponent * _HISTOGRAM_HALF
+    return mantissa << exponent, (mantissa + 1) << exponent
+
+
+class Counter:
+    """Monotonic event counter; call ``inc()`` to count one event."""
+
+    def __init__(self, name: str, help: str, labels: dict[str, str]) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._count = count()
+        # Binding the C method directly skips a Python-level call per event.
+        self.inc = self._count.__next__
+
+    @property
+    def value(self) -> int:
+        return _count_value(self._count)
+
+
+class Histogram:
+    """Latency histogram with log-linear buckets (see the comment above)."""
+
+    def __init__(
+        self, name: str, help: str, labels: dict[str, str], max_seconds: float = 3600
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._max_micros = int(max_seconds * 1_000_000)
+        self._buckets = [count() for _ in range(_bucket_index(self._max_micros) + 1)]
+        # Bucket index -> (``le`` bound in seconds, count of durations <= the
+        # bound) for the bucket that holds each bound. Durations between the
+        # bound and the next whole microsecond land in that bucket too, so it
+        # is split even when its last microsecond is the bound itself.
+        self._splits: dict[int, tuple[float, Any]] = {}
+        for boundary in PROMETHEUS_BUCKETS:
+            limit = round(boundary * 1_000_000)
+            if limit < self._max_micros:
+                self._splits[_bucket_index(limit)] = (boundary, count())
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration; larger values than ``max_seconds`` are capped."""
+
+        micros = int(seconds * 1_000_000)
+        if micros > self._max_micros:
+            micros = self._max_micros
+        elif micros < 0:
+            micros = 0
+        exponent = micros.bit_length() - _HISTOGRAM_SUB_BITS
+        if exponent <= 0:
+            index = micros
+        else:
+            index = exponent * _HISTOGRAM_HALF + (micros >> exponent)
+        next(self._buckets[index])
+        split = self._splits.get(index)
+        if split is not None and seconds <= split[0]:
+            next(split[1])
+
+    def observe_since(self, started: float) -> None:
+        """Record the time since ``started``, a ``perf_counter()`` value."""
+
+        self.observe(perf_counter() - started)
+
+    def snapshot(self) -> list[int]:
+        """Return the current count of every bucket."""
+
+        return [_count_value(bucket) for bucket in self._buckets]
+
+    def quantile(self, fraction: float) -> float:
+        """Return an upper bound of the ``fraction`` quantile, in seconds."""
+
+        counts = self.snapshot()
+        target = fraction * sum(counts)
+        seen = 0
+        for index, number in enumerate(counts):
+            seen += number
+            if number and seen >= target:
+                return _bucket_bounds(index)[1] / 1_000_000
+        return 0.0
+
+
+def _format_labels(labels: dict[str, str], **extra: str) -> str:
+    merged = {**labels, **extra}
+    if not merged:
+        return ""
+    escaped = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in merged.values()
+    )
+    pairs = ",".join(f'{key}="{value}"' for key, value in zip(merged, escaped))
+    return "{" + pairs + "}"
+
+
+class MetricsRegistry:
+    """Creates counters and histograms and exports them for Prometheus."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[tuple[str, tuple[tuple[str, str], ...]], Any] = {}
+
+    def _get(self, factory: Any, name: str, help: str, labels: dict[str, str]) -> Any:
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics[key] = factory(name, help, labels)
+        return metric
+
+    def counter(self, name: str, help: str, **labels: str) -> Counter:
+        """Return the counter ``name`` with ``labels``, creating it if needed."""
+
+        return self._get(Counter, name, help, labels)
+
+    def histogram(self, name: str, help: str, **labels: str) -> Histogram:
+        """Return the histogram ``name`` with ``labels``, creating it if needed."""
+
+        return self._get(Histogram, name, help, labels)
+
+    def export(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        described: set[str] = set()
+        for metric in self._metrics.values():
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            if metric.name not in described:
+                described.add(metric.name)
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {kind}")
+            if kind == "counter":
+                labels = _format_labels(metric.labels)
+                lines.append(f"{metric.name}{labels} {metric.value}")
+                continue
+            counts = metric.snapshot()
+            total = sum(counts)
+            # The exact values are not kept, so the sum uses bucket midpoints.
+            midpoint_sum = 0.0
+            for index, number in enumerate(counts):
+                if number:
+                    lower, upper = _bucket_bounds(index)
+                    midpoint_sum += number * (lower + upper) / 2
+            cumulative = index = 0
+            for boundary in PROMETHEUS_BUCKETS:
+                limit = round(boundary * 1_000_000)
+                # Buckets that end before the bound's microsecond hold only
+                # shorter durations; the bound's own bucket is split (above).
+                while index < len(counts) and _bucket_bounds(index)[1] <= limit:
+                    cumulative += counts[index]
+                    index += 1
+                below = cumulative
+                split = metric._splits.get(index)
+                if split is not None:
+                    below += _count_value(split[1])
+                labels = _format_labels(metric.labels, le=repr(boundary))
+                lines.append(f"{metric.name}_bucket{labels} {below}")
+            labels = _format_labels(metric.labels, le="+Inf")
+            lines.append(f"{metric.name}_bucket{labels} {total}")
+            labels = _format_labels(metric.labels)
+            lines.append(f"{metric.name}_sum{labels} {midpoint_sum / 1_000_000}")
+            lines.append(f"{metric.name}_count{labels} {total}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | PathLike[str]) -> None:
+        """Write :meth:`export` to ``path``, replacing the file atomically."""
+
+        temporary = f"{fspath(path)}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.export())
+        replace_file(temporary, path)
+
+    def serve(self, port: int = 9464, host: str = "127.0.0.1") -> Any:
+        """Serve :meth:`export` at ``http://host:port/metrics`` in a thread.
+
+        Returns the server; call its ``shutdown()`` method to stop it. The
+        default host only accepts connections from the same machine.
+        """
+
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.export().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass  # keep the console quiet on every scrape
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+# The form's own metrics. They are created here, at import time, so that every
+# counter is exported (with the value 0) before its first event.
+METRICS = MetricsRegistry()
+SUBMIT_ATTEMPTS = METRICS.counter(
+    "formular_submit_attempts_total", "Klicks auf Absenden."
+)
+VALIDATION_FAILURES = {
+    code: METRICS.counter(
+        "formular_validation_failures_total",
+        "Abgelehnte Eingaben je verletzter Regel.",
+        rule=code,
+    )
+    for code in ERROR_MESSAGES
+}
+SUBMIT_LATENCY = METRICS.histogram(
+    "formular_submit_duration_seconds",
+    "Dauer vom Klick bis zur Rückmeldung an den Benutzer.",
+)
+SINK_LATENCY = METRICS.histogram(
+    "formular_sink_duration_seconds",
+    "Dauer der Übergabe eines Datensatzes an Store oder Hintergrund-Worker.",
+)
+
+
+def record_validation_failure(error: ValueError) -> None:
+    """Count ``error`` under the rule that failed."""
+
+    code = getattr(error, "code", ERROR_INVALID_VALUE)
+    VALIDATION_FAILURES.get(code, VALIDATION_FAILURES[ERROR_INVALID_VALUE]).inc()
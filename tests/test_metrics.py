@@ -0,0 +1,33 @@
+"""Tests for the counters and histograms of ``registrierung.py`` (section 27)."""
+
+from __future__ import annotations
+
+import unittest
+
+import registrierung
+
+
+class HistogramExportTest(unittest.TestCase):
+    def test_le_counts_are_exact_around_every_bound(self) -> None:
+        registry = registrierung.MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Test")
+        durations = [0.0002509, 0.000992, 0.0009999]
+        for bound in registrierung.PROMETHEUS_BUCKETS:
+            durations += [bound, bound - 1e-6, bound + 1e-7, bound + 1e-6]
+        for seconds in durations:
+            histogram.observe(seconds)
+
+        exported = {}
+        for line in registry.export().splitlines():
+            if line.startswith("latency_seconds_bucket"):
+                labels, value = line.split(" ")
+                exported[labels.split('"')[1]] = int(value)
+        for bound in registrierung.PROMETHEUS_BUCKETS:
+            with self.subTest(le=bound):
+                expected = sum(seconds <= bound for seconds in durations)
+                self.assertEqual(exported[repr(bound)], expected)
+        self.assertEqual(exported["+Inf"], len(durations))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,349 @@
+"""Tests for the persistence backends of ``registrierung.py`` (sections 13-25).
+
+Run them with ``python -m unittest`` from the project folder. The stores write
+from background threads, so every call that could block is run through
+:func:`call_with_timeout`: a regression then fails the test instead of hanging
+the whole run.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import tempfile
+import time
+import unittest
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+from os import listdir
+from os.path import join
+from typing import Any
+from unittest import mock
+
+import registrierung
+
+RECORD = registrierung.RegistrationData("Anna", "Müller", "anna@example.org", 30, "")
+
+
+def call_with_timeout(function: Callable[[], Any], timeout: float = 5.0) -> Any:
+    """Run ``function`` in a thread; re-raise its error or fail if it hangs."""
+
+    outcome: dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            outcome["result"] = function()
+        except BaseException as error:
+            outcome["error"] = error
+
+    thread = Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise AssertionError(f"{function!r} did not return within {timeout} s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+class JournalStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_add_waits_for_disk_and_replays(self) -> None:
+        store = registrierung.JournalStore(self.directory)
+        call_with_timeout(lambda: store.add(RECORD))
+        call_with_timeout(store.close)
+        replayed: list[registrierung.RegistrationData] = []
+
+        class Sink(registrierung.RegistrationStore):
+            def add(self, record: registrierung.RegistrationData) -> None:
+                replayed.append(record)
+
+        replayer = registrierung.JournalReplayer(self.directory, Sink())
+        self.addCleanup(replayer.close)
+        self.assertEqual(replayer.replay_pending(), 1)
+        self.assertEqual(replayed, [RECORD])
+
+    def test_failed_write_wakes_add_and_close(self) -> None:
+        store = registrierung.JournalStore(self.directory)
+        # A closed handle fails like a full disk: ``write`` raises.
+        store._handle.close()
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(lambda: store.add(RECORD))
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(lambda: store.add(RECORD))
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.close)
+
+    def test_failed_write_with_close_in_the_same_batch(self) -> None:
+        gate = Event()
+
+        class GatedJournal(registrierung.JournalStore):
+            def _run(self) -> None:
+                gate.wait()
+                super()._run()
+
+        store = GatedJournal(self.directory)
+        store._handle.close()
+        # While the writer waits at the gate, queue a record and the stop
+        # sentinel so both are taken as one batch.
+        done = Event()
+        store._queue.put((registrierung._encode_journal_record(RECORD), done))
+        store._queue.put(None)
+        gate.set()
+        store._thread.join(5.0)
+        self.assertFalse(store._thread.is_alive())
+        self.assertTrue(done.is_set())
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.close)
+
+
+
+class SQLiteStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = f"{directory.name}/registrations.db"
+
+    def _rows(self) -> list[tuple[Any, ...]]:
+        import sqlite3
+
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(
+                "SELECT first_name, last_name, email, age, comments "
+                "FROM registrations"
+            ).fetchall()
+        finally:
+            connection.close()
+
+    def test_flush_writes_queued_records(self) -> None:
+        store = registrierung.SQLiteStore(self.path, flush_interval=60)
+        store.add(RECORD)
+        call_with_timeout(store.flush)
+        self.assertEqual(
+            self._rows(), [("Anna", "Müller", "anna@example.org", 30, "")]
+        )
+        call_with_timeout(store.close)
+
+    def test_failed_write_during_flush(self) -> None:
+        store = registrierung.SQLiteStore(self.path, flush_interval=60)
+        # ``comments`` is NOT NULL, so this row makes the INSERT fail.
+        store.add(registrierung.RegistrationData("Anna", "Müller", "a@b.de", 30, None))
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.flush)
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.close)
+
+    def test_failed_write_during_close(self) -> None:
+        store = registrierung.SQLiteStore(self.path, flush_interval=60)
+        store.add(registrierung.RegistrationData("Anna", "Müller", "a@b.de", 30, None))
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.close)
+
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.path = join(self.directory, "registrations.archive")
+        self.records = [
+            registrierung.RegistrationData(
+                f"Vorname{number}",
+                "Nachname",
+                f"p{number}@example.org",
+                number + 1,
+                "Kommentar" * (number % 3),
+            )
+            for number in range(1000)
+        ]
+
+    def _round_trip(self) -> None:
+        # A tiny buffer spills the offsets to the index file many times.
+        with registrierung.ArchiveWriter(self.path, buffer_size=256) as writer:
+            writer.extend(self.records)
+            self.assertEqual(writer.count, len(self.records))
+        self.assertEqual(listdir(self.directory), ["registrations.archive"])
+        with registrierung.RegistrationArchive(self.path) as archive:
+            self.assertEqual(len(archive), len(self.records))
+            self.assertEqual(archive[0], self.records[0])
+            self.assertEqual(archive[-1], self.records[-1])
+            self.assertEqual(archive[617], self.records[617])
+            self.assertEqual(list(archive.scan(chunk_size=64)), self.records)
+
+    def test_round_trip(self) -> None:
+        self._round_trip()
+
+    def test_round_trip_on_big_endian_machines(self) -> None:
+        # Pretending to be big-endian swaps the offsets on the way in and out,
+        # which exercises the copy that big-endian readers make of the index.
+        with mock.patch.object(sys, "byteorder", "big"):
+            self._round_trip()
+
+    def test_failed_export_leaves_no_files(self) -> None:
+        with self.assertRaises(ZeroDivisionError):
+            with registrierung.ArchiveWriter(self.path, buffer_size=256) as writer:
+                writer.extend(self.records)
+                1 / 0
+        self.assertEqual(listdir(self.directory), [])
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local server that answers ``HTTPStore`` requests with scripted statuses.
+
+    The n-th request is answered with ``statuses[n]``; once the list is used up
+    every request gets ``204``. Received bodies, their encodings and the number
+    of connections are recorded for the assertions.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, statuses: list[int] | None = None) -> None:
+        self.statuses = list(statuses or [])
+        self.lock = Lock()
+        self.connections = 0
+        self.encodings: list[str | None] = []
+        self.batches: list[list[dict[str, Any]]] = []
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/registrations"
+
+    @property
+    def requests(self) -> int:
+        return len(self.encodings)
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    server: StandInServer
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        with self.server.lock:
+            self.server.encodings.append(encoding)
+            statuses = self.server.statuses
+            status = statuses.pop(0) if statuses else 204
+            if status == 204:
+                self.server.batches.append(json.loads(body)["registrations"])
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class HTTPStoreTest(unittest.TestCase):
+    def _server(self, statuses: list[int] | None = None) -> StandInServer:
+        server = StandInServer(statuses)
+        self.addCleanup(server.stop)
+        return server
+
+    def _store(self, server: StandInServer, **options: Any) -> registrierung.HTTPStore:
+        options.setdefault("retry_delay", 0.001)
+        return registrierung.HTTPStore(server.url, **options)
+
+    def test_batches_share_one_connection(self) -> None:
+        server = self._server()
+        store = self._store(server, batch_window=60, max_batch=10)
+        for _ in range(25):
+            store.add(RECORD)
+        call_with_timeout(store.flush)
+        call_with_timeout(store.close)
+        self.assertEqual([len(batch) for batch in server.batches], [10, 10, 5])
+        self.assertEqual(server.batches[0][0]["email"], "anna@example.org")
+        self.assertEqual(server.connections, 1)
+
+    def test_large_bodies_are_gzipped(self) -> None:
+        server = self._server()
+        store = self._store(server, batch_window=60, compress_min_size=200)
+        store.add(RECORD)
+        call_with_timeout(store.flush)
+        for _ in range(10):
+            store.add(RECORD)
+        call_with_timeout(store.close)
+        self.assertEqual(server.encodings, [None, "gzip"])
+        self.assertEqual(len(server.batches[1]), 10)
+
+    def test_retries_server_errors_and_rate_limits(self) -> None:
+        server = self._server([503, 429, 500])
+        store = self._store(server)
+        store.add(RECORD)
+        call_with_timeout(store.flush)
+        call_with_timeout(store.close)
+        self.assertEqual(server.requests, 4)
+        self.assertEqual(store.retries, 3)
+        self.assertEqual(len(server.batches), 1)
+
+    def test_client_errors_are_not_retried(self) -> None:
+        server = self._server([400])
+        store = self._store(server)
+        store.add(RECORD)
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.flush)
+        self.assertEqual(server.requests, 1)
+        self.assertEqual(store.retries, 0)
+        # The error is reported once; the store keeps working afterwards.
+        store.add(RECORD)
+        call_with_timeout(store.close)
+        self.assertEqual(len(server.batches), 1)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        server = self._server([503] * 10)
+        store = self._store(server, max_retries=2)
+        store.add(RECORD)
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.flush)
+        self.assertEqual(server.requests, 3)
+        call_with_timeout(store.close)
+
+    def test_failure_surfaces_through_add_and_close(self) -> None:
+        server = self._server([400, 400])
+        store = self._store(server, batch_window=0.0)
+        store.add(RECORD)
+        deadline = time.monotonic() + 5
+        while store._error is None and time.monotonic() < deadline:
+            time.sleep(0.001)
+        with self.assertRaises(RuntimeError):
+            store.add(RECORD)
+        store.add(RECORD)
+        with self.assertRaises(RuntimeError):
+            call_with_timeout(store.close)
+
+    def test_unreachable_server(self) -> None:
+        server = self._server()
+        url = server.url
+        server.stop()
+        store = registrierung.HTTPStore(url, max_retries=1, retry_delay=0.001)
+        store.add(RECORD)
+        with self.assertRaises(RuntimeError) as caught:
+            call_with_timeout(store.flush)
+        self.assertIsInstance(caught.exception.__cause__, OSError)
+        call_with_timeout(store.close)
+
+
+if __name__ == "__main__":
+    unittest.main()
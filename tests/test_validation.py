@@ -0,0 +1,96 @@
+"""Tests for the batch validation helpers of ``registrierung.py`` (sections 9-24)."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from os.path import join
+
+import registrierung
+
+# Incomplete and oddly typed records as they arrive from partner exports.
+RECORDS = [
+    ("Anna", "Müller", "anna@example.org", "30"),
+    {"first_name": None, "last_name": "Müller", "email": "a@b.de", "age": 30},
+    {"last_name": "Müller", "email": "a@b.de", "age": "30"},
+    ("Anna", "Müller"),
+    (),
+    ("Anna", "Müller", "a@b.de", None),
+    ("Anna", "Müller", "a@b.de", 30, None),
+    (None, "Müller", "a@b.de", "30"),
+    ("Anna", "Müller", "kein-at-zeichen", "30"),
+    ("Anna", "Müller", "a@b.de", "0"),
+]
+
+
+class ValidateChunkTest(unittest.TestCase):
+    def test_incomplete_records_are_missing_fields(self) -> None:
+        result = registrierung.validate_chunk(RECORDS)
+        codes = {error.index: error.code for error in result.errors}
+        self.assertEqual(
+            codes,
+            {
+                1: registrierung.ERROR_MISSING_FIELDS,
+                2: registrierung.ERROR_MISSING_FIELDS,
+                3: registrierung.ERROR_MISSING_FIELDS,
+                4: registrierung.ERROR_MISSING_FIELDS,
+                5: registrierung.ERROR_MISSING_FIELDS,
+                7: registrierung.ERROR_MISSING_FIELDS,
+                8: registrierung.ERROR_INVALID_EMAIL,
+                9: registrierung.ERROR_INVALID_AGE,
+            },
+        )
+        self.assertEqual(len(result.valid), 2)
+        self.assertEqual(result.valid[1].comments, "")
+
+    def test_schema_fallback_matches_fast_path(self) -> None:
+        self.assertEqual(
+            registrierung._validate_chunk_with_schema(RECORDS, 5),
+            registrierung.validate_chunk(RECORDS, 5),
+        )
+
+
+
+class ParallelFileValidationTest(unittest.TestCase):
+    def _compare_with_import(self, path: str) -> None:
+        serial_valid: list[registrierung.RegistrationData] = []
+        serial_errors = []
+        for report in registrierung.import_records(path, serial_valid.extend):
+            serial_errors.extend(report.errors)
+
+        parallel_valid: list[registrierung.RegistrationData] = []
+        parallel_errors = []
+        for result in registrierung.validate_file_parallel(
+            path, chunk_bytes=256, max_workers=2
+        ):
+            parallel_valid.extend(result.valid)
+            parallel_errors.extend(result.errors)
+        self.assertEqual(parallel_valid, serial_valid)
+        self.assertEqual(parallel_errors, serial_errors)
+
+    def test_jsonl_with_unicode_line_separators(self) -> None:
+        lines = []
+        for number in range(30):
+            record = {
+                "first_name": f"Anna{number}",
+                "last_name": "Müller",
+                "email": f"anna{number}@example.org",
+                "age": 18 + number,
+                # U+2028, U+2029, \x85, \x1c, \v and \f are line breaks for
+                # ``str.splitlines`` but not for a file.
+                "comments": "erste\u2028zweite\u2029\x85\x1c\v\f Zeile",
+            }
+            if number % 7 == 3:
+                record["email"] = "kein-at-zeichen"
+            lines.append(json.dumps(record, ensure_ascii=False))
+        lines.insert(20, "{kaputt")
+        with tempfile.TemporaryDirectory() as directory:
+            path = join(directory, "registrations.jsonl")
+            with open(path, "w", encoding="utf-8", newline="") as handle:
+                handle.write("\n".join(lines) + "\n")
+            self._compare_with_import(path)
+
+
+if __name__ == "__main__":
+    unittest.main()